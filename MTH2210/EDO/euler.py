@@ -12,7 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
-from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, dense_output, history
 import types
 import numpy as np
 
@@ -22,29 +22,66 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
-def check_parameters_consistency(f, x0, t0, tm, m, output):
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie f(x0,t0), évaluée pour cette vérification (réutilisées par init_algo)
+def check_parameters_consistency(f, x0, t0, tm, m, as_array, out, dense, t_eval, output):
+    # Vérification des types des paramètres reçus
+    params_array = [[f,        "f",        types.FunctionType],
+                    [x0,       "x0",       [np.ndarray, float]],
+                    [t0,       "t0",       float],
+                    [tm,       "tm",       float],
+                    [m,        "m",        int],
+                    [as_array, "as_array", bool],
+                    [dense,    "dense",    bool],
+                    [output,   "output",   str]]
+    if out    is not None: params_array.append([out,    "out",    np.ndarray])
+    if t_eval is not None: params_array.append([t_eval, "t_eval", [list, np.ndarray]])
+    check_type_arguments.check_parameters(params_array)
+    # Vérification de la cohérence des paramètres
+    try:    f_0 = f(x0, t0)
+    except: raise ValueError("Fonction f non définie en (x0,t0)")
+    try:    f_m = f(x0, tm)
+    except: raise ValueError("Fonction f non définie en (x0,tm)")
+    if type(x0) == float:
+        if not(check_type_arguments.check_generic(f_0, float)[0]): raise ValueError("f(x0,t0) n'est pas un float (type reçu :"+check_type_arguments.get_type(f_0)+")")
+        if not(check_type_arguments.check_generic(f_m, float)[0]): raise ValueError("f(x0,tm) n'est pas un float (type reçu :"+check_type_arguments.get_type(f_m)+")")
+    else:
+        if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]): raise ValueError("f(x0,t0) n'est pas un vecteur np.ndarray (type reçu :"+check_type_arguments.get_type(f_0)+")")
+        if not(check_type_arguments.check_generic(f_m, np.ndarray)[0]): raise ValueError("f(x0,tm) n'est pas un vecteur np.ndarray (type reçu :"+check_type_arguments.get_type(f_m)+")")
+        if len(f_0) != len(x0): raise ValueError("les dimensions de f(x0,t0) (= "+str(len(f_0))+") et x0 (= "+str(len(x0))+") diffèrent")
+    if m < 0: raise ValueError("Nombre d'itérations m défini à une valeur négative")
+    check_out_buffer(out, x0, m)
+    if out is not None and t_eval is not None: raise ValueError("Les paramètres out et t_eval ne peuvent pas être utilisés simultanément")
+    return(f_0)
+
+# Vérifie que le tableau out fourni par l'utilisateur peut recevoir les m+1 points x_k
+def check_out_buffer(out, x0, m):
+    if out is None: return
+    if np.shape(out) != (m+1,)+np.shape(x0): raise ValueError("Le tableau out n'a pas la taille attendue (taille reçue : "+str(np.shape(out))+", attendue : "+str((m+1,)+np.shape(x0))+")")
+    if not(np.issubdtype(out.dtype, np.floating)): raise ValueError("Le tableau out doit contenir des flottants (type reçu : "+str(out.dtype)+")")
+
+# Vérifie le jeu de paramètres reçu par la version par lots de la méthode
+def check_parameters_consistency_batch(f, X0, t0, tm, m, params, out, output):
     # Vérification des types des paramètres reçus
     params_array = [[f,      "f",      types.FunctionType],
-                    [x0,     "x0",     [np.ndarray, float]],
+                    [X0,     "X0",     np.ndarray],
                     [t0,     "t0",     float],
                     [tm,     "tm",     float],
                     [m,      "m",      int],
                     [output, "output", str]]
+    if params is not None: params_array.append([params, "params", np.ndarray])
+    if out    is not None: params_array.append([out,    "out",    np.ndarray])
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
-    try:    f(x0, t0)
-    except: raise ValueError("Fonction f non définie en (x0,t0)")
-    try:    f(x0, tm)
-    except: raise ValueError("Fonction f non définie en (x0,tm)")
-    if type(x0) == float:
-        if not(check_type_arguments.check_generic(f(x0,t0), float)[0]): raise ValueError("f(x0,t0) n'est pas un float (type reçu :"+check_type_arguments.get_type(f(x0,t0))+")")
-        if not(check_type_arguments.check_generic(f(x0,tm), float)[0]): raise ValueError("f(x0,tm) n'est pas un float (type reçu :"+check_type_arguments.get_type(f(x0,tm))+")")
-    else:
-        if not(check_type_arguments.check_generic(f(x0,t0), np.ndarray)[0]): raise ValueError("f(x0,t0) n'est pas un vecteur np.ndarray (type reçu :"+check_type_arguments.get_type(f(x0,t0))+")")
-        if not(check_type_arguments.check_generic(f(x0,tm), np.ndarray)[0]): raise ValueError("f(x0,tm) n'est pas un vecteur np.ndarray (type reçu :"+check_type_arguments.get_type(f(x0,tm))+")")
-        if len(f(x0,t0)) != len(x0): raise ValueError("les dimensions de f(x0,t0) (= "+str(len(f(x0,t0)))+") et x0 (= "+str(len(x0))+") diffèrent")
+    if np.ndim(X0) != 2: raise ValueError("X0 doit être une matrice de taille (nb_traj, n) (dimension reçue : "+str(np.shape(X0))+")")
+    if params is not None and (np.ndim(params) == 0 or len(params) != len(X0)): raise ValueError("params doit contenir une valeur par trajectoire (taille reçue : "+str(np.shape(params))+", attendue : "+str(len(X0))+")")
+    try:    F0 = f(X0, t0) if params is None else f(X0, t0, params)
+    except: raise ValueError("Fonction f non définie en (X0,t0)")
+    if not(check_type_arguments.check_generic(F0, np.ndarray)[0]): raise ValueError("f(X0,t0) n'est pas un np.ndarray (type reçu :"+check_type_arguments.get_type(F0)+")")
+    if np.shape(F0) != np.shape(X0): raise ValueError("les dimensions de f(X0,t0) (= "+str(np.shape(F0))+") et X0 (= "+str(np.shape(X0))+") diffèrent")
     if m < 0: raise ValueError("Nombre d'itérations m défini à une valeur négative")
+    check_out_buffer(out, X0, m)
+    return(F0)
 
 
 
@@ -55,7 +92,7 @@ def check_parameters_consistency(f, x0, t0, tm, m, output):
 # Crée la chaîne de caractères qui sera renvoyée pour chaque itération
 def format_iter(k, x_k, t_k):
 
-    if type(x_k) == float:
+    if np.ndim(x_k) == 0:
         if k == 0:
             header  = "{:>4} || {:^11} | {:^9}"
             header  = header.format("k", "x_k", "t_k")
@@ -83,6 +120,21 @@ def format_iter(k, x_k, t_k):
 
     return(header+iter_infos)
 
+# Crée la chaîne de caractères qui sera renvoyée pour chaque itération de la version par lots
+def format_iter_batch(k, X_k, t_k):
+    if k == 0:
+        header  = "{:>4} || {:^9} | {:^11} | {:^11}"
+        header  = header.format("k", "t_k", "min|x_k|", "max|x_k|")
+        header += "\n"
+        header += "-"*(4+9+11+11 + 4+3+3)
+        header += "\n"
+    else:
+        header = ""
+    norms = np.linalg.norm(X_k, axis=1)
+    iter_infos = "{:>4} || {:>+9.4f} | {:>+11.4e} | {:>+11.4e}"
+    iter_infos = iter_infos.format(k, t_k, np.min(norms), np.max(norms))
+    return(header+iter_infos)
+
 
 
 #%%########################################
@@ -110,22 +162,73 @@ def init_algo(x0, t0, tm, m):
     list_t = [t]
     return(k, x, t, h, list_x, list_t)
 
-# Exécute une itération de la méthode
-def iter_algo(f, k, x, t, h, list_x, list_t):
+# Exécute une itération de la méthode (probe contient f(x_k,t_k) si elle est déjà connue)
+def iter_algo(f, k, x, t, h, list_x, list_t, list_d=None, probe=None):
     k += 1
-    x = x + h*f(x,t)
+    d = f(x,t) if probe is None else probe
+    if list_d is not None: list_d.append(d)
+    x = x + h*d
     t += h
     list_x.append(x)
     list_t.append(t)
     return(k, x, t, list_x, list_t)
 
+# Phase d'initialisation de la version à stockage préalloué (aussi utilisée par la version par lots) : les points x_k sont écrits
+# dans un tableau de taille (m+1,)+dim(x0), fourni par l'utilisateur via out ou alloué ici, et les tampons de travail sont alloués une seule fois
+def init_algo_array(x0, t0, tm, m, out=None):
+    k = 0
+    h = (tm-t0)/m
+    list_x = np.empty((m+1,)+np.shape(x0)) if out is None else out
+    list_t = np.empty(m+1)
+    list_x[0] = x0
+    list_t[0] = t0
+    work = []
+    return(k, h, list_x, list_t, work)
+
+# Exécute une itération de la version à stockage préalloué, sans allocation de tableaux intermédiaires hormis les sorties de f
+# (probe contient f(x_k,t_k) si elle est déjà connue)
+def iter_algo_array(f, k, h, list_x, list_t, work, list_d=None, probe=None):
+    x = list_x[k]
+    t = list_t[k]
+    d = f(x,t) if probe is None else probe
+    if list_d is not None: list_d[k] = d
+    if np.ndim(x) == 0:
+        list_x[k+1] = x + h*d
+    else:
+        np.multiply(d, h, out=list_x[k+1])
+        list_x[k+1] += x
+    list_t[k+1] = t + h
+    k += 1
+    return(k, list_x, list_t)
+
+# Phase d'initialisation de la version ne stockant que les instants t_eval demandés (probe contient f(x0,t0) si elle est déjà connue)
+def init_algo_t_eval(f, x0, t0, tm, m, probe):
+    k = 0
+    x = x0
+    t = t0
+    h = (tm-t0)/m
+    d = f(x, t) if probe is None else probe
+    i_eval = 0
+    list_x = []
+    return(k, x, t, h, d, i_eval, list_x)
+
+# Exécute une itération de la version ne stockant que les instants t_eval demandés : d = f(x_k,t_k) est reporté d'une itération à l'autre,
+# et les instants de t_eval compris dans [t_k,t_kp1] sont évalués par interpolation d'Hermite cubique
+def iter_algo_t_eval(f, k, x, t, d, h, t_eval, i_eval, list_x):
+    k += 1
+    x_kp1 = x + h*d
+    t_kp1 = t + h
+    d_kp1 = f(x_kp1, t_kp1)
+    i_eval = dense_output.record_t_eval(t_eval, i_eval, list_x, t, x, d, t_kp1, x_kp1, d_kp1)
+    return(k, x_kp1, t_kp1, d_kp1, i_eval, list_x)
+
 
 
 #%%#####################################
 # Définition de la fonction principale #
 ########################################
 
-def euler(f, x0, t0, tm, m, output=""):
+def euler(f, x0, t0, tm, m, as_array=False, out=None, dense=False, t_eval=None, validate=True, output=""):
     """Méthode de résolution numérique d'une équation (dx/dt)(t) = f(x(t),t) par le schéma d'Euler :
         - x_0 donné, t_0 donné, pas de temps h donné,
         - x_kp1 = x_k + h*f(x_k,t_k),
@@ -137,14 +240,25 @@ def euler(f, x0, t0, tm, m, output=""):
         - deux réels  t0 et tm, les bornes de l'intervalle de temps sur lequel l'équation est appliquée,
         - un entier    m, le pas de discrétisation de [t0,tm], définissant donc h = (tm-t0)/m.
 
-    L'argument optionnel est une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
-        - la sortie standard si output = "pipe",
-        - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
-        - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
-
-    La méthode vérifie les conditions suivantes :
+    Les arguments optionnels sont :
+        - un booléen as_array (défaut = False), qui fait écrire les points x_k dans un np.ndarray préalloué de taille (m+1,)+dim(x0)
+          (les calculs étant faits en place, sans tableau intermédiaire) au lieu de listes Python,
+        - un np.ndarray out (défaut = None) de taille (m+1,)+dim(x0), fourni par l'utilisateur pour recevoir les points x_k (implique as_array = True),
+        - un booléen dense (défaut = False), qui fait renvoyer en plus une sortie dense de la solution (interpolation d'Hermite cubique par morceaux,
+          construite à partir des évaluations f(x_k,t_k) déjà réalisées par le schéma, au prix d'une seule évaluation supplémentaire de f),
+        - un vecteur t_eval (défaut = None) d'instants rangés de t0 vers tm, auxquels seuls les points x(t) sont stockés et renvoyés
+          (par interpolation d'Hermite cubique au fil de l'intégration ; incompatible avec out),
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant f qu'une fois en (x0,t0) et en (x0,tm) ;
+          si False, les vérifications (et ces deux évaluations de f) sont omises, pour des appels répétés avec des paramètres sûrs,
+        - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
+            - la sortie standard si output = "pipe",
+            - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
+            - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
         - la fonction f est définie en (x0,t0) et en (x0,tm),
         - f(x0,t0) renvoie un vecteur de la même dimension et même type que x0,
+        - les instants de t_eval sont rangés de t0 vers tm et compris entre t0 et tm,
         - tous les paramètres reçus ont bien le type attendu.
 
     À noter que si x est un vecteur de dim 1, f doit être implémentée avec parcimonie pour ne pas renvoyer un mauvais type. Par exemple :
@@ -164,8 +278,10 @@ def euler(f, x0, t0, tm, m, output=""):
             - x      de dimension 1 défini par un np.array([valeur]).
 
     Les sorties de la méthode sont :
-        - list_x, la liste des points x(t_k),
-        - list_t, la liste des instants t_k.
+        - list_x, la liste des points x(t_k) (un np.ndarray de taille (m+1,)+dim(x0) si as_array = True ou si out est fourni),
+        - list_t, la liste des instants t_k (un np.ndarray si as_array = True ou si out est fourni),
+          (si t_eval est fourni, list_x et list_t ne contiennent que les points x(t) et les instants t de t_eval),
+        - sol, uniquement si dense = True, un objet DenseOutput tel que sol(t) renvoie une approximation de x(t) pour tout réel ou vecteur t.
 
     Exemples d'appel :
         - euler(lambda x,t : np.cos(t), 0, 0, 2*np.pi, 100),
@@ -174,23 +290,155 @@ def euler(f, x0, t0, tm, m, output=""):
               x0,x1 = 1,1
               return(np.array([x[0]*(x[1]-1),x[1]*(1-x[0])]))
           x = np.array([2,1])
-          list_x, list_t = euler(f, x, 0, 10, 100).
+          list_x, list_t = euler(f, x, 0, 10, 100),
+        - list_x, list_t = euler(f, x, 0, 10, 10**6, as_array=True),
+        - list_x, list_t, sol = euler(f, x, 0, 10, 100, dense=True), puis sol(np.linspace(0,10,1000)),
+        - list_x, list_t = euler(f, x, 0, 10, 10**6, t_eval=[2.5,5,7.5,10]).
     """
 
     # Test des paramètres et définition de la destination de sortie des itérations
     if check_type_arguments.check_real(x0)[0]: x0 = float(x0)
-    check_parameters_consistency(f, x0, t0, tm, m, output)
-    write_iter, write_stopping = writing_function.define_writing_function(format_iter, output)
+    probe = check_parameters_consistency(f, x0, t0, tm, m, as_array, out, dense, t_eval, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        if t_eval is not None: t_eval = dense_output.check_t_eval(t_eval, t0, tm)
+
+        # Initialisation et déroulement de l'algorithme, en ne stockant que les instants t_eval demandés
+        if t_eval is not None and not(dense):
+            k, x, t, h, d, i_eval, list_x = init_algo_t_eval(f, x0, t0, tm, m, probe)
+            write_iter(k, x, t)
+            while not(stopping_criteria(k, m)[0]):
+                k, x, t, d, i_eval, list_x = iter_algo_t_eval(f, k, x, t, d, h, t_eval, i_eval, list_x)
+                write_iter(k, x, t)
+            dense_output.record_t_eval(t_eval, i_eval, list_x, t, x, d, t, x, d, last=True)
+            list_x, list_t = (np.array(list_x), t_eval) if as_array else (list_x, list(t_eval))
+
+        # Initialisation et déroulement de l'algorithme, avec stockage dans un tableau préalloué
+        elif as_array or out is not None:
+            k, h, list_x, list_t, work = init_algo_array(x0, t0, tm, m, out)
+            list_d = np.empty_like(list_x) if dense else None
+            write_iter(k, list_x[k], list_t[k])
+            while not(stopping_criteria(k, m)[0]):
+                k, list_x, list_t = iter_algo_array(f, k, h, list_x, list_t, work, list_d, probe if k == 0 else None)
+                write_iter(k, list_x[k], list_t[k])
+            if dense: list_d[k] = f(list_x[k], list_t[k])
+
+        # Initialisation et déroulement de l'algorithme, avec stockage dans des listes
+        else:
+            k, x, t, h, list_x, list_t = init_algo(x0, t0, tm, m)
+            list_d = [] if dense else None
+            write_iter(k, x, t)
+            while not(stopping_criteria(k, m)[0]):
+                k, x, t, list_x, list_t = iter_algo(f, k, x, t, h, list_x, list_t, list_d, probe if k == 0 else None)
+                write_iter(k, x, t)
+            if dense: list_d.append(f(x, t))
+
+        write_stopping(stopping_criteria(k, m)[1])
+        # Renvoi des points x(t_k) et des instants t_k (ou des seuls instants t_eval), et de la sortie dense de la solution si demandée
+        if dense:
+            sol = dense_output.DenseOutput(list_t, list_x, list_d)
+            if t_eval is not None: list_x, list_t = sol(t_eval), t_eval
+            return(list_x, list_t, sol)
+        return(list_x, list_t)
+    finally:
+        close()
+
+
+def euler_batch(f, X0, t0, tm, m, params=None, out=None, validate=True, output=""):
+    """Version par lots de euler : résout simultanément (dx/dt)(t) = f(x(t),t) pour plusieurs conditions initiales par le schéma d'Euler.
+
+    Toutes les trajectoires sont avancées ensemble, avec un seul appel vectorisé de f par étage du schéma.
+
+    Les arguments attendus sont :
+        - une fonction f, admettant en entrée une matrice X de taille (nb_traj, n) et un réel t, renvoyant une matrice f(X,t) de même taille
+          (ou f(X,t,params) si params est fourni),
+        - une matrice X0 de taille (nb_traj, n), dont chaque ligne est une condition initiale,
+        - deux réels t0 et tm, les bornes de l'intervalle de temps sur lequel l'équation est appliquée,
+        - un entier m, le pas de discrétisation de [t0,tm], définissant donc h = (tm-t0)/m.
+
+    Les arguments optionnels sont :
+        - un np.ndarray params (défaut = None), contenant un paramètre (ou une ligne de paramètres) par trajectoire, transmis à f en troisième argument,
+        - un np.ndarray out (défaut = None) de taille (m+1, nb_traj, n), dans lequel les trajectoires sont écrites au lieu d'allouer un nouveau tableau,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
+        - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
+            - la sortie standard si output = "pipe",
+            - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
+            - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
+        - X0 est une matrice, et params contient autant de lignes que X0,
+        - la fonction f est définie en (X0,t0) et renvoie une matrice de même taille que X0,
+        - tous les paramètres reçus ont bien le type attendu.
+
+    Les sorties de la méthode sont :
+        - list_x, un np.ndarray de taille (m+1, nb_traj, n) tel que list_x[k] contient les points x(t_k) de toutes les trajectoires,
+        - list_t, un np.ndarray contenant les instants t_k.
+
+    Exemples d'appel :
+        - euler_batch(lambda X,t : np.column_stack((X[:,1],-X[:,0])), np.random.rand(1000,2), 0, 2*np.pi, 100),
+        - euler_batch(lambda X,t,a : -a[:,None]*X, np.ones((5,1)), 0, 1, 100, params=np.linspace(0,1,5)).
+    """
 
-    # Initialisation de l'algorithme
-    k, x, t, h, list_x, list_t = init_algo(x0, t0, tm, m)
-    write_iter(k, x, t)
+    # Test des paramètres et définition de la destination de sortie des itérations
+    F0 = check_parameters_consistency_batch(f, X0, t0, tm, m, params, out, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter_batch, output)
+    try:
+        g = f if params is None else (lambda X, t: f(X, t, params))
+
+        # Initialisation de l'algorithme
+        k, h, list_x, list_t, work = init_algo_array(X0, t0, tm, m, out)
+        write_iter(k, list_x[k], list_t[k])
+
+        # Déroulement de l'algorithme
+        while not(stopping_criteria(k, m)[0]):
+            k, list_x, list_t = iter_algo_array(g, k, h, list_x, list_t, work, probe=F0 if k == 0 else None)
+            write_iter(k, list_x[k], list_t[k])
+
+        write_stopping(stopping_criteria(k, m)[1])
+        # Renvoi des trajectoires et des instants associés
+        return(list_x, list_t)
+    finally:
+        close()
+
+
+def euler_iter(f, x0, t0, tm, m, validate=True, output=""):
+    """Version génératrice de euler : les points x_k sont produits un à un au fil des pas de temps, au lieu d'être tous stockés puis renvoyés
+    en fin d'algorithme. Seul le point courant est conservé, la mémoire utilisée est donc constante quel que soit m, et l'appelant peut
+    écrire les points au fur et à mesure, ne garder que les derniers, ou interrompre l'intégration à tout moment.
 
-    # Déroulement de l'algorithme
-    while not(stopping_criteria(k, m)[0]):
-        k, x, t, list_x, list_t = iter_algo(f, k, x, t, h, list_x, list_t)
-        write_iter(k, x, t)
+    Les arguments, les arguments optionnels validate et output et les conditions vérifiées sont ceux de euler (vérifiées dès l'appel de euler_iter).
 
-    write_stopping(stopping_criteria(k, m)[1])
-    # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
-    return(list_x, list_t)
+    La sortie de la méthode est un générateur produisant, pour k = 0, 1, ..., m, le couple (x_k, t_k).
+
+    Exemples d'appel :
+        - for x_k, t_k in euler_iter(lambda x,t : np.array([x[1],-x[0]]), np.array([1,0]), 0, 10, 10**6): fichier.write(...),
+        - list_x, list_t = zip(*euler_iter(lambda x,t : np.cos(t), 0, 0, 2*np.pi, 100)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    if check_type_arguments.check_real(x0)[0]: x0 = float(x0)
+    probe = check_parameters_consistency(f, x0, t0, tm, m, False, None, False, None, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que le dernier point
+            k, x, t, h, list_x, list_t = init_algo(x0, t0, tm, m)
+            list_x, list_t = history.BoundedList(list_x, maxlen=1), history.BoundedList(list_t, maxlen=1)
+            write_iter(k, x, t)
+            yield(x, t)
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, m)[0]):
+                k, x, t, list_x, list_t = iter_algo(f, k, x, t, h, list_x, list_t, probe=probe if k == 0 else None)
+                write_iter(k, x, t)
+                yield(x, t)
+
+            write_stopping(stopping_criteria(k, m)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des points x(t_k) et des instants t_k
+    return(iterates())
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, dense_output, history
+import types
+import numpy as np
+
+
+
+#%%##################################################
+# Coefficients du schéma embarqué de Dormand-Prince #
+#####################################################
+
+# Instants intermédiaires c_i et coefficients a_ij des étages
+DP_C = [0, 1/5, 3/10, 4/5, 8/9, 1, 1]
+DP_A = [[],
+        [1/5],
+        [3/40,       9/40],
+        [44/45,      -56/15,      32/9],
+        [19372/6561, -25360/2187, 64448/6561, -212/729],
+        [9017/3168,  -355/33,     46732/5247, 49/176,  -5103/18656],
+        [35/384,     0,           500/1113,   125/192, -2187/6784,    11/84]]
+# Différence entre les poids de la solution d'ordre 5 (égaux à la dernière ligne de DP_A) et ceux de la solution d'ordre 4
+DP_E = [71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40]
+
+
+
+#%%########################################
+# Fonction de vérification des paramètres #
+###########################################
+
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie f(x0,t0), évaluée pour cette vérification (réutilisées par init_algo)
+def check_parameters_consistency(f, x0, t0, tm, tol_rel, tol_abs, h_init, nb_iter, dense, t_eval, output):
+    # Vérification des types des paramètres reçus
+    params_array = [[f,       "f",       types.FunctionType],
+                    [x0,      "x0",      [np.ndarray, float]],
+                    [t0,      "t0",      float],
+                    [tm,      "tm",      float],
+                    [tol_rel, "tol_rel", float],
+                    [tol_abs, "tol_abs", float],
+                    [nb_iter, "nb_iter", int],
+                    [dense,   "dense",   bool],
+                    [output,  "output",  str]]
+    if h_init is not None: params_array.append([h_init, "h_init", float])
+    if t_eval is not None: params_array.append([t_eval, "t_eval", [list, np.ndarray]])
+    check_type_arguments.check_parameters(params_array)
+    # Vérification de la cohérence des paramètres
+    try:    f_0 = f(x0, t0)
+    except: raise ValueError("Fonction f non définie en (x0,t0)")
+    if type(x0) == float:
+        if not(check_type_arguments.check_generic(f_0, float)[0]): raise ValueError("f(x0,t0) n'est pas un float (type reçu :"+check_type_arguments.get_type(f_0)+")")
+    else:
+        if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]): raise ValueError("f(x0,t0) n'est pas un vecteur np.ndarray (type reçu :"+check_type_arguments.get_type(f_0)+")")
+        if len(f_0) != len(x0): raise ValueError("les dimensions de f(x0,t0) (= "+str(len(f_0))+") et x0 (= "+str(len(x0))+") diffèrent")
+    if tm == t0:                   raise ValueError("L'intervalle de temps [t0,tm] est vide")
+    if tol_rel < 0:                raise ValueError("Tolérance tol_rel définie à une valeur négative")
+    if tol_abs < 0:                raise ValueError("Tolérance tol_abs définie à une valeur négative")
+    if tol_rel == tol_abs == 0:    raise ValueError("Les tolérances tol_rel et tol_abs ne peuvent pas être toutes deux nulles")
+    if nb_iter < 0:                raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
+    if h_init is not None and (h_init == 0 or (h_init > 0) != (tm > t0)): raise ValueError("Le pas initial h_init doit être non nul et orienté de t0 vers tm")
+    return(f_0)
+
+
+
+#%%########################################
+# Fonctions de mise en page des résultats #
+###########################################
+
+# Crée la chaîne de caractères qui sera renvoyée pour chaque itération acceptée
+def format_iter(k, x_k, t_k, h_k):
+
+    if np.ndim(x_k) == 0:
+        if k == 0:
+            header  = "{:>4} || {:^11} | {:^11} | {:^11}"
+            header  = header.format("k", "x_k", "t_k", "h_k")
+            header += "\n"
+            header += "-"*(4+11+11+11 + 4+3+3)
+            header += "\n"
+        else:
+            header = ""
+        iter_infos = "{:>4} || {:>+11.4e} | {:>+11.4e} | {:>+11.4e}"
+        iter_infos = iter_infos.format(k, x_k, t_k, h_k)
+
+    else:
+        if k == 0:
+            n = len(x_k)
+            len_str_xk = 2+11*n+2*(n-1)
+            header  = "{:>4} || " + "{:^"+str(len_str_xk)+"}" + " | {:^11} | {:^11}"
+            header  = header.format("k", "x_k", "t_k", "h_k")
+            header += "\n"
+            header += "-"*(4+len_str_xk+11+11 + 4+3+3)
+            header += "\n"
+        else:
+            header = ""
+        iter_infos  = "{:>4} || ".format(k)
+        iter_infos += "["+", ".join(["{:>+11.4e}".format(xi) for xi in x_k])+"] | "+"{:>+11.4e} | {:>+11.4e}".format(t_k, h_k)
+
+    return(header+iter_infos)
+
+
+
+#%%########################################
+# Fonctions de tests des critères d'arrêt #
+###########################################
+
+# Définit l'ensemble des critères d'arrêt possible, et les teste à chaque itération
+def stopping_criteria(nb_steps, t, h, tm, nb_iter, nb_eval):
+    if t == tm:                                 return(True, "Instant final tm = {:+11.4e} atteint en {} pas acceptés, {} pas rejetés et {} évaluations de f".format(tm, nb_steps[0], nb_steps[1], nb_eval))
+    if nb_steps[0]+nb_steps[1] >= nb_iter:      return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé à t = {:+11.4e}".format(nb_iter, t))
+    if abs(h) <= 16*np.spacing(max(abs(t),1)): return(True, "Pas de temps devenu trop petit (h = {:+11.4e}) à t = {:+11.4e}".format(h, t))
+    return(False, "intégration inachevée")
+
+
+
+#%%#######################################
+# Fonctions d'itérations de l'algorithme #
+##########################################
+
+# Phase d'initialisation de toutes les suites exploitées par la méthode
+# Si t_eval est fourni, seuls les points aux instants de t_eval sont stockés dans list_x ; si dense, les dérivées f(x_k,t_k) sont stockées dans list_d
+# (probe contient f(x0,t0) si elle est déjà connue)
+def init_algo(f, x0, t0, tm, h_init, dense, t_eval, probe):
+    nb_steps = [0, 0]
+    x = x0
+    t = t0
+    h = (tm-t0)/100 if h_init is None else h_init
+    k1 = f(x, t) if probe is None else probe
+    nb_eval = 1
+    i_eval = 0
+    list_x = [x] if t_eval is None else []
+    list_t = [t] if t_eval is None else []
+    list_d = [k1] if dense else None
+    return(nb_steps, x, t, h, k1, nb_eval, i_eval, list_x, list_t, list_d)
+
+# Tente un pas de taille h depuis (x,t) : le pas est accepté si l'erreur estimée respecte les tolérances, sinon il est rejeté et h réduit.
+# La dernière évaluation de f d'un pas accepté est réutilisée comme première évaluation du pas suivant (propriété FSAL).
+def iter_algo(f, nb_steps, x, t, h, k1, nb_eval, tm, tol_rel, tol_abs, t_eval, i_eval, list_x, list_t, list_d):
+    last = (t+h-tm)*(tm-t) >= 0
+    if last: h = tm-t
+    stages = [k1]
+    for i in range(1, 7):
+        x_i = x + h*sum(a*k_j for a, k_j in zip(DP_A[i], stages) if a != 0)
+        stages.append(f(x_i, t+DP_C[i]*h))
+    nb_eval += 6
+    x5 = x_i
+    x4 = x5 - h*sum(e*k_j for e, k_j in zip(DP_E, stages) if e != 0)
+    err = check_relative_tolerance.tol_mixed_error(x5, x4, tol_rel, tol_abs)
+    factor = 5 if err == 0 else 0.9*err**(-1/5)
+    if err <= 1:
+        nb_steps[0] += 1
+        t_kp1 = tm if last else t+h
+        if t_eval is None:
+            list_x.append(x5)
+            list_t.append(t_kp1)
+        else:
+            i_eval = dense_output.record_t_eval(t_eval, i_eval, list_x, t, x, k1, t_kp1, x5, stages[6])
+        if list_d is not None: list_d.append(stages[6])
+        x  = x5
+        t  = t_kp1
+        k1 = stages[6]
+        h *= min(5, max(0.2, factor))
+        accepted = True
+    else:
+        nb_steps[1] += 1
+        h *= max(0.2, min(1, factor))
+        accepted = False
+    return(nb_steps, x, t, h, k1, nb_eval, accepted, i_eval, list_x, list_t, list_d)
+
+
+
+#%%#####################################
+# Définition de la fonction principale #
+########################################
+
+def rk45(f, x0, t0, tm, tol_rel=10**-6, tol_abs=10**-8, h_init=None, nb_iter=10**5, dense=False, t_eval=None, validate=True, output=""):
+    """Méthode de résolution numérique d'une équation (dx/dt)(t) = f(x(t),t) par le schéma de Runge-Kutta embarqué 5(4) de Dormand-Prince, à pas adaptatif :
+        - x_0 donné, t_0 donné, pas de temps initial h donné,
+        - les 7 étages y_k^i = f(x_k + h*somme(j<i)(a_ij*y_k^j), t_k + c_i*h) fournissent une solution x5 d'ordre 5 et une solution x4 d'ordre 4,
+        - le pas est accepté si norm(x5-x4) <= tol_abs + tol_rel*norm(x5), et alors x_kp1 = x5 et t_kp1 = t_k + h,
+        - dans tous les cas, h est ajusté d'un facteur 0.9*err^(-1/5) (borné dans [0.2,5]), où err = norm(x5-x4) / (tol_abs + tol_rel*norm(x5)),
+        - le dernier étage d'un pas accepté est la première évaluation du pas suivant (FSAL) : un pas coûte donc 6 évaluations de f.
+
+    Les arguments attendus sont :
+        - une fonction f, admettant en entrée un vecteur x et un réel t, renvoyant un vecteur f(x,t),
+        - un vecteur x0, condition initiale de l'équation,
+        - deux réels t0 et tm, les bornes de l'intervalle de temps sur lequel l'équation est appliquée.
+
+    Les arguments optionnels sont :
+        - un réel   tol_rel (défaut = 1e-6) définissant la tolérance relative sur l'erreur locale,
+        - un réel   tol_abs (défaut = 1e-8) définissant la tolérance absolue sur l'erreur locale,
+        - un réel   h_init  (défaut = None) définissant le pas initial (si None, h_init = (tm-t0)/100),
+        - un entier nb_iter (défaut = 1e5 ) définissant le nombre maximal de pas (acceptés ou rejetés) alloués à la méthode,
+        - un booléen dense (défaut = False), qui fait renvoyer en plus une sortie dense de la solution (interpolation d'Hermite cubique par morceaux,
+          construite à partir des évaluations f(x_k,t_k) déjà réalisées par le schéma, sans évaluation supplémentaire de f),
+        - un vecteur t_eval (défaut = None) d'instants rangés de t0 vers tm, auxquels seuls les points x(t) sont stockés et renvoyés
+          (par interpolation d'Hermite cubique au fil de l'intégration),
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant f qu'une fois en (x0,t0), valeur ensuite
+          réutilisée comme premier étage du schéma ; si False, les vérifications sont omises, pour des appels répétés avec des paramètres sûrs,
+        - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
+            - la sortie standard si output = "pipe",
+            - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
+            - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
+        - la fonction f est définie en (x0,t0),
+        - f(x0,t0) renvoie un vecteur de la même dimension et même type que x0,
+        - tol_rel et tol_abs sont positives et non toutes deux nulles, nb_iter est positif,
+        - les instants de t_eval sont rangés de t0 vers tm et compris entre t0 et tm,
+        - tous les paramètres reçus ont bien le type attendu.
+
+    Comme pour rk4, si x est de dimension 1, il doit être défini par un float ou un int et f(x,t) doit renvoyer un float.
+
+    Les sorties de la méthode sont :
+        - list_x, la liste des points x(t_k) aux instants acceptés,
+        - list_t, la liste des instants acceptés t_k (grille de temps adaptative),
+          (si t_eval est fourni, list_x et list_t ne contiennent que les points x(t) et les instants t de t_eval ; si l'intégration s'arrête
+          avant tm, seuls les instants de t_eval atteints sont renvoyés, le nombre d'instants manquants étant indiqué dans le message d'arrêt),
+        - sol, uniquement si dense = True, un objet DenseOutput tel que sol(t) renvoie une approximation de x(t) pour tout réel ou vecteur t.
+
+    Exemples d'appel :
+        - rk45(lambda x,t : np.cos(t), 0, 0, 2*np.pi),
+        - rk45(lambda x,t : np.array([x[1],-x[0]]), np.array([1,0]), 0, 10, tol_rel=1e-10, tol_abs=1e-12),
+        - list_x, list_t, sol = rk45(lambda x,t : np.array([x[1],-x[0]]), np.array([1,0]), 0, 10, dense=True), puis sol(np.linspace(0,10,1000)),
+        - list_x, list_t = rk45(lambda x,t : np.array([x[1],-x[0]]), np.array([1,0]), 0, 10, t_eval=np.linspace(0,10,11)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    if check_type_arguments.check_real(x0)[0]: x0 = float(x0)
+    probe = check_parameters_consistency(f, x0, t0, tm, tol_rel, tol_abs, h_init, nb_iter, dense, t_eval, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        if t_eval is not None: t_eval = dense_output.check_t_eval(t_eval, t0, tm)
+        stream = t_eval is not None and not(dense)
+
+        # Initialisation de l'algorithme
+        nb_steps, x, t, h, k1, nb_eval, i_eval, list_x, list_t, list_d = init_algo(f, x0, t0, tm, h_init, dense, t_eval if stream else None, probe)
+        write_iter(0, x, t, 0.0)
+
+        # Déroulement de l'algorithme
+        while not(stopping_criteria(nb_steps, t, h, tm, nb_iter, nb_eval)[0]):
+            t_k = t
+            nb_steps, x, t, h, k1, nb_eval, accepted, i_eval, list_x, list_t, list_d = iter_algo(f, nb_steps, x, t, h, k1, nb_eval, tm, tol_rel, tol_abs, t_eval if stream else None, i_eval, list_x, list_t, list_d)
+            if accepted: write_iter(nb_steps[0], x, t, t-t_k)
+
+        # Si l'intégration s'est arrêtée avant tm, seuls les instants de t_eval effectivement atteints sont renvoyés, et le nombre d'instants
+        # non atteints est signalé dans le message d'arrêt
+        reason = stopping_criteria(nb_steps, t, h, tm, nb_iter, nb_eval)[1]
+        if t_eval is not None and t != tm:
+            nb_reached = np.count_nonzero((t_eval-t)*np.sign(tm-t0) <= 0)
+            reason += " ({} instants de t_eval sur {} non atteints, et donc non renvoyés)".format(len(t_eval)-nb_reached, len(t_eval))
+            t_eval = t_eval[:nb_reached]
+        write_stopping(reason)
+        # Renvoi des points x(t_k) et des instants t_k acceptés (ou des seuls instants t_eval atteints), et de la sortie dense de la solution si demandée
+        if stream:
+            if t == tm: i_eval = dense_output.record_t_eval(t_eval, i_eval, list_x, t, x, k1, t, x, k1, last=True)
+            list_t = list(t_eval)
+        if dense:
+            sol = dense_output.DenseOutput(list_t, list_x, list_d)
+            if t_eval is not None: list_x, list_t = list(sol(t_eval)), list(t_eval)
+            return(list_x, list_t, sol)
+        return(list_x, list_t)
+    finally:
+        close()
+
+
+def rk45_iter(f, x0, t0, tm, tol_rel=10**-6, tol_abs=10**-8, h_init=None, nb_iter=10**5, validate=True, output=""):
+    """Version génératrice de rk45 : les points x_k des pas acceptés sont produits un à un au fil de l'intégration, au lieu d'être tous
+    stockés puis renvoyés en fin d'algorithme. Seul le point courant est conservé, la mémoire utilisée est donc constante, et l'appelant
+    peut écrire les points au fur et à mesure, ne garder que les derniers, ou interrompre l'intégration à tout moment.
+
+    Les arguments, les arguments optionnels (hormis dense et t_eval) et les conditions vérifiées sont ceux de rk45 (vérifiées dès l'appel de rk45_iter).
+
+    La sortie de la méthode est un générateur produisant, pour chaque pas accepté k = 0, 1, ..., le couple (x_k, t_k).
+
+    Exemples d'appel :
+        - for x_k, t_k in rk45_iter(lambda x,t : np.array([x[1],-x[0]]), np.array([1,0]), 0, 10): print(t_k),
+        - list_x, list_t = zip(*rk45_iter(lambda x,t : -x, 1, 0, 5)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    if check_type_arguments.check_real(x0)[0]: x0 = float(x0)
+    probe = check_parameters_consistency(f, x0, t0, tm, tol_rel, tol_abs, h_init, nb_iter, False, None, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que le dernier point accepté
+            nb_steps, x, t, h, k1, nb_eval, i_eval, list_x, list_t, list_d = init_algo(f, x0, t0, tm, h_init, False, None, probe)
+            list_x, list_t = history.BoundedList(list_x, maxlen=1), history.BoundedList(list_t, maxlen=1)
+            write_iter(0, x, t, 0.0)
+            yield(x, t)
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(nb_steps, t, h, tm, nb_iter, nb_eval)[0]):
+                t_k = t
+                nb_steps, x, t, h, k1, nb_eval, accepted, i_eval, list_x, list_t, list_d = iter_algo(f, nb_steps, x, t, h, k1, nb_eval, tm, tol_rel, tol_abs, None, i_eval, list_x, list_t, list_d)
+                if accepted:
+                    write_iter(nb_steps[0], x, t, t-t_k)
+                    yield(x, t)
+
+            write_stopping(stopping_criteria(nb_steps, t, h, tm, nb_iter, nb_eval)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des points x(t_k) et des instants t_k acceptés
+    return(iterates())
@@ -21,24 +21,22 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques, et renvoie x, y
+# et x_e sous forme de np.ndarray
 def check_parameters_consistency(x, y, x_e, output):
     # Vérification des types des paramètres reçus
-    params_array = [[x,       "x",       [list, np.ndarray]],
-                    [y,       "y",       [list, np.ndarray]],
-                    [x_e,     "x_e",     [list, np.ndarray]],
-                    [output,  "output",   str]]
-    if check_type_arguments.check_list(x)[0] == True:
-        for i in range(len(x)): params_array.append([x[i], "xi", float])
-    if check_type_arguments.check_list(y)[0] == True:
-        for i in range(len(y)): params_array.append([y[i], "yi", float])
-    if check_type_arguments.check_list(x_e)[0] == True:
-        for i in range(len(x_e)): params_array.append([x_e[i], "x_evali", float])
-    params_array.append([output, "output", str])
+    params_array = [[x,       "x",       check_type_arguments.RealVector],
+                    [y,       "y",       check_type_arguments.RealVector],
+                    [x_e,     "x_e",     check_type_arguments.RealVector],
+                    [output,  "output",  str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
+    if len(x) == 0:                 raise ValueError("Le vecteur x est vide")
     if len(x) != len(y):            raise ValueError("Les dimensions de x (= "+str(len(x))+") et de y (= "+str(len(y))+") ne concordent pas")
-    if len(x) != len(list(set(x))): raise ValueError("Le vecteur x contient des doublons")
+    # Conversion unique des vecteurs en np.ndarray de flottants, réutilisés ensuite par l'algorithme
+    x, y, x_e = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(x_e, dtype=float)
+    if np.any(np.diff(np.sort(x)) == 0): raise ValueError("Le vecteur x contient des doublons")
+    return(x, y, x_e)
 
 
 
@@ -63,15 +61,47 @@ def format_output(x, y, x_e, y_e):
 # Fonctions d'itérations de l'algorithme #
 ##########################################
 
-# Phase d'initialisation de toutes les suites exploitées par la méthode
+# Nombre maximal de termes des matrices d'écarts (x_j-x_i) construites simultanément, pour borner la mémoire utilisée à O(CHUNK_SIZE)
+CHUNK_SIZE = 2**20
+
+# Calcule les poids barycentriques w_j = 1 / prod(i != j)(x_j-x_i)
+# Les produits sont accumulés en module logarithmique et en signe, puis les poids sont normalisés par le plus grand d'entre eux : aucun
+# produit intermédiaire ne peut donc déborder ou s'annuler, et les poids, définis à une constante multiplicative près qui se simplifie
+# dans la seconde formule barycentrique, sont compris entre -1 et 1. Les lignes sont traitées par blocs de CHUNK_SIZE termes.
+def barycentric_weights(x):
+    n = len(x)
+    if n == 1: return(np.ones(1))
+    log_w = np.empty(n)
+    sign  = np.empty(n)
+    step  = max(1, CHUNK_SIZE // n)
+    for j in range(0, n, step):
+        diff = x[j:j+step,None] - x[None,:]
+        diff[np.arange(np.shape(diff)[0]), np.arange(j, j+np.shape(diff)[0])] = 1
+        log_w[j:j+step] = -np.sum(np.log(np.abs(diff)), axis=1)
+        sign[j:j+step]  = 1 - 2*(np.count_nonzero(diff < 0, axis=1) % 2)
+    return(sign * np.exp(log_w - np.max(log_w)))
+
+# Phase d'initialisation de toutes les suites exploitées par la méthode (x et y sont des np.ndarray de flottants)
 def init_algo(x, y):
-    def interpolation_1_output(x, y, xe): return(np.sum([ y[j]*np.prod([(x[i]-xe)/(x[i]-x[j]) for i in range(len(x)) if i != j]) for j in range(len(y)) ]) )
+    w = barycentric_weights(x)
+    # Seconde formule barycentrique : p(z) = somme(j)(w_j*y_j/(z-x_j)) / somme(j)(w_j/(z-x_j)), p(x_j) = y_j
+    # Les abscisses x_e sont traitées par blocs, de sorte que la matrice des écarts ne dépasse pas CHUNK_SIZE termes
+    def interpolation_n_outputs(x_e):
+        y_e = np.empty(len(x_e))
+        step = max(1, CHUNK_SIZE // len(x))
+        for i in range(0, len(x_e), step):
+            diff = x_e[i:i+step,None] - x[None,:]
+            exact = (diff == 0)
+            diff[exact] = 1
+            coeffs = w / diff
+            y_e[i:i+step] = (coeffs @ y) / np.sum(coeffs, axis=1)
+            i_e, j_e = np.nonzero(exact)
+            y_e[i+i_e] = y[j_e]
+        return(y_e)
     def interpolation(x_e):
-        if check_type_arguments.check_real(x_e)[0] == True: return(interpolation_1_output(x, y, np.array([x_e])))
-        else:
-            result = []
-            for xe in x_e: result.append(interpolation_1_output(x, y, xe))
-            return(np.array(result))
+        if check_type_arguments.check_real(x_e)[0] == True: return(interpolation_n_outputs(np.array([x_e], dtype=float))[0])
+        x_e = np.asarray(x_e, dtype=float)
+        return(interpolation_n_outputs(x_e.ravel()).reshape(x_e.shape))
     return(interpolation)
 
 
@@ -83,7 +113,9 @@ def init_algo(x, y):
 def lagrange(x, y, x_e, output=""):
     """Calcul du polynôme d'interpolation de Lagrange passant par tous les points (x_k,y_k) donnés en paramètres x et y :
         - pour tout z, Lagrange(x,y)(z) = somme(j)(  y_j * prod(i)((x_i-z)/(x_i-x_j))  ).
-    
+    Le polynôme est évalué via la seconde formule barycentrique, dont les poids w_j = 1/prod(i!=j)(x_j-x_i) sont calculés une seule fois :
+        - pour tout z, Lagrange(x,y)(z) = somme(j)(w_j*y_j/(z-x_j)) / somme(j)(w_j/(z-x_j)).
+
     Les arguments attendus sont :
         - un vecteur   x, contenant les abscisses des points d'interpolation,
         - un vecteur   y, contenant les ordonnées des points d'interpolation,
@@ -112,17 +144,19 @@ def lagrange(x, y, x_e, output=""):
     """
     
     # Test des paramètres et définition de la destination de sortie des itérations
-    check_parameters_consistency(x, y, x_e, output)
-    write_output, _ = writing_function.define_writing_function(format_output, output)
-    
-    # Initialisation de l'algorithme
-    interpolation = init_algo(x, y)
+    x, y, x_e = check_parameters_consistency(x, y, x_e, output)
+    write_output, _, close = writing_function.define_writing_function(format_output, output)
+    try:
+        # Initialisation de l'algorithme
+        interpolation = init_algo(x, y)
     
-    # Déroulement de l'algorithme
-    y_e = interpolation(x_e)
-    write_output(x, y, x_e, y_e)
+        # Déroulement de l'algorithme
+        y_e = interpolation(x_e)
+        write_output(x, y, x_e, y_e)
     
-    # Renvoi de la liste des images des points x_e par le polynôme d'interpolation, et le polynôme comme une fonction
-    return(y_e, interpolation)
+        # Renvoi de la liste des images des points x_e par le polynôme d'interpolation, et le polynôme comme une fonction
+        return(y_e, interpolation)
+    finally:
+        close()
 
 
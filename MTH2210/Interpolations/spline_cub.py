@@ -14,6 +14,7 @@ Created on Wed Jul 01 12:00:00 2020
 
 from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
 import numpy as np
+import scipy.linalg
 
 
 
@@ -21,34 +22,35 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
-def check_parameters_consistency(x, y, x_e, cond_g, val_g, cond_d, val_d, output):
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques, et renvoie x, y
+# et x_e sous forme de np.ndarray (x et y étant triés ensemble par abscisses croissantes si sort = True)
+def check_parameters_consistency(x, y, x_e, cond_g, val_g, cond_d, val_d, sort, output):
     # Vérification des types des paramètres reçus
-    params_array = [[x,       "x",       [list, np.ndarray]],
-                    [y,       "y",       [list, np.ndarray]],
-                    [x_e,     "x_e",     [list, np.ndarray]],
-                    [cond_g,  "cond_g",   int],
-                    [val_g,   "val_g",    float],
-                    [cond_d,  "cond_d",   int],
-                    [val_d,   "val_d",    float],
-                    [output,  "output",   str]]
-    if check_type_arguments.check_list(x)[0] == True:
-        for i in range(len(x)): params_array.append([x[i], "xi", float])
-    if check_type_arguments.check_list(y)[0] == True:
-        for i in range(len(y)): params_array.append([y[i], "yi", float])
-    if check_type_arguments.check_list(x_e)[0] == True:
-        for i in range(len(x_e)): params_array.append([x_e[i], "x_evali", float])
-    params_array.append([output, "output", str])
+    params_array = [[x,       "x",       check_type_arguments.RealVector],
+                    [y,       "y",       check_type_arguments.RealVector],
+                    [x_e,     "x_e",     check_type_arguments.RealVector],
+                    [cond_g,  "cond_g",  int],
+                    [val_g,   "val_g",   float],
+                    [cond_d,  "cond_d",  int],
+                    [val_d,   "val_d",   float],
+                    [sort,    "sort",    bool],
+                    [output,  "output",  str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
     if len(x) != len(y):            raise ValueError("Les dimensions de x (= "+str(len(x))+") et de y (= "+str(len(y))+") ne concordent pas")
-    if len(x) != len(list(set(x))): raise ValueError("Le vecteur x contient des doublons")
-    x_sort = [xi for xi in x]
-    x_sort.sort()
-    for i in range(len(x)):
-        if x[i] != x_sort[i]:       raise ValueError("Les éléments du vecteur x ne sont pas dans l'ordre croissant")
+    # Conversion unique des vecteurs en np.ndarray de flottants, réutilisés ensuite par l'algorithme
+    x, y, x_e = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(x_e, dtype=float)
+    if sort:
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    # Abscisses strictement croissantes si et seulement si tous les écarts successifs sont strictement positifs (les doublons ne sont
+    # recherchés, par un tri, que si ce n'est pas le cas)
+    if np.any(np.diff(x) <= 0):
+        if np.any(np.diff(np.sort(x)) == 0): raise ValueError("Le vecteur x contient des doublons")
+        raise ValueError("Les éléments du vecteur x ne sont pas dans l'ordre croissant")
     if cond_g not in [0,1,2,3]:     raise ValueError("La condition limite à gauche n'a pas une valeur recevable (= "+str(cond_g)+"), attendue dans [0,1,2,3]")
     if cond_d not in [0,1,2,3]:     raise ValueError("La condition limite à droite n'a pas une valeur recevable (= "+str(cond_d)+"), attendue dans [0,1,2,3]")
+    return(x, y, x_e)
 
 
 
@@ -71,11 +73,126 @@ def format_output(x, y, x_e, y_e):
 
 
 
+#%%#############################
+# Définition de l'objet spline #
+################################
+
+# Spline cubique par morceaux : sur l'intervalle [x[i],x[i+1]] (et au-delà pour les deux morceaux extrêmes),
+#   S(z) = coeff_0[i] + coeff_1[i]*(z-x[i]) + coeff_2[i]*(z-x[i])^2 + coeff_3[i]*(z-x[i])^3.
+# Les coefficients sont stockés une fois pour toutes dans des tableaux, et toutes les évaluations sont vectorisées.
+class Spline:
+    __slots__ = ("x", "coeff_0", "coeff_1", "coeff_2", "coeff_3")
+
+    def __init__(self, x, coeff_0, coeff_1, coeff_2, coeff_3):
+        self.x       = x
+        self.coeff_0 = coeff_0
+        self.coeff_1 = coeff_1
+        self.coeff_2 = coeff_2
+        self.coeff_3 = coeff_3
+
+    # Permet la sérialisation par pickle (un objet à __slots__ n'a pas de __dict__)
+    def __reduce__(self):
+        return(Spline, (self.x, self.coeff_0, self.coeff_1, self.coeff_2, self.coeff_3))
+
+    def __repr__(self):
+        return("Spline({} morceaux sur [{:+.4e},{:+.4e}])".format(len(self.x)-1, self.x[0], self.x[-1]))
+
+    # Localise par dichotomie l'indice i de l'intervalle [x[i],x[i+1]] de chaque abscisse, et renvoie z-x[i]
+    def locate(self, x_e):
+        i = np.clip(np.searchsorted(self.x, x_e, side="left"), 1, len(self.x)-1) - 1
+        return(i, x_e - self.x[i])
+
+    # Évalue un tableau d'abscisses, ou un réel (renvoie alors un float)
+    def apply_vectorized(self, func, x_e):
+        if check_type_arguments.check_real(x_e)[0] == True: return(float(func(np.array([x_e], dtype=float))[0]))
+        x_e = np.asarray(x_e, dtype=float)
+        return(func(x_e.ravel()).reshape(x_e.shape))
+
+    def evaluate(self, x_e):
+        i, t = self.locate(x_e)
+        return(self.coeff_0[i] + t*(self.coeff_1[i] + t*(self.coeff_2[i] + t*self.coeff_3[i])))
+
+    def __call__(self, x_e):
+        """Renvoie les valeurs de la spline aux abscisses x_e (réel ou vecteur)."""
+        return(self.apply_vectorized(self.evaluate, x_e))
+
+    def derivative(self, order=1):
+        """Renvoie la dérivée d'ordre order (défaut = 1) de la spline, sous la forme d'un nouvel objet Spline."""
+        if not(check_type_arguments.check_int(order)[0]) or order < 0: raise ValueError("L'ordre de dérivation doit être un entier positif (reçu : "+str(order)+")")
+        coeffs = [self.coeff_0, self.coeff_1, self.coeff_2, self.coeff_3]
+        for _ in range(min(order, 4)):
+            coeffs = [coeffs[1], 2*coeffs[2], 3*coeffs[3], np.zeros_like(coeffs[3])]
+        return(Spline(self.x, *coeffs))
+
+    # Primitive de la spline s'annulant en x[0]
+    def primitive(self, x_e):
+        h = np.diff(self.x)
+        integrals = h*(self.coeff_0 + h*(self.coeff_1/2 + h*(self.coeff_2/3 + h*self.coeff_3/4)))
+        cumul = np.concatenate(([0.0], np.cumsum(integrals)))
+        i, t = self.locate(x_e)
+        return(cumul[i] + t*(self.coeff_0[i] + t*(self.coeff_1[i]/2 + t*(self.coeff_2[i]/3 + t*self.coeff_3[i]/4))))
+
+    def integrate(self, a, b):
+        """Renvoie l'intégrale de la spline entre a et b (réels ou vecteurs de même dimension)."""
+        return(self.apply_vectorized(self.primitive, b) - self.apply_vectorized(self.primitive, a))
+
+    def roots(self):
+        """Renvoie le vecteur trié des racines réelles de la spline dans [x[0],x[-1]].
+
+        Chaque morceau est découpé en sous-intervalles de monotonie (racines de la dérivée), puis les sous-intervalles
+        présentant un changement de signe sont réduits simultanément par bissection vectorisée.
+        """
+        h = np.diff(self.x)
+        c0, c1, c2, c3 = self.coeff_0, self.coeff_1, self.coeff_2, self.coeff_3
+        # Points critiques de chaque morceau : racines de c1 + 2*c2*t + 3*c3*t^2 dans ]0,h[
+        with np.errstate(divide="ignore", invalid="ignore"):
+            disc  = np.sqrt(np.maximum(c2**2 - 3*c3*c1, 0))
+            crit  = np.where(c3[:,None] != 0, (-c2[:,None] + np.array([-1,1])*disc[:,None]) / (3*c3[:,None]), (-c1/(2*c2))[:,None])
+            crit[(c2**2 - 3*c3*c1 < 0)] = np.nan
+            crit[~((crit > 0) & (crit < h[:,None]))] = np.nan
+        bounds = np.sort(np.column_stack((np.zeros_like(h), np.nan_to_num(crit, nan=0.0), h)), axis=1)
+        t_g, t_d = bounds[:,:-1].ravel(), bounds[:,1:].ravel()
+        i = np.repeat(np.arange(len(h)), bounds.shape[1]-1)
+        def piece(i, t):    return(c0[i] + t*(c1[i] + t*(c2[i] + t*c3[i])))
+        def position(i, t): return(np.where(t == h[i], self.x[i+1], self.x[i] + t))
+        f_g, f_d = piece(i, t_g), piece(i, t_d)
+        # Racines exactes aux bornes des sous-intervalles
+        exact  = np.concatenate((position(i[f_g == 0], t_g[f_g == 0]), position(i[f_d == 0], t_d[f_d == 0])))
+        # Bissection vectorisée sur les sous-intervalles présentant un changement de signe strict
+        change = f_g*f_d < 0
+        i, t_g, t_d, f_g = i[change], t_g[change], t_d[change], f_g[change]
+        for _ in range(100):
+            t_c = (t_g+t_d)/2
+            if np.all((t_c == t_g) | (t_c == t_d)): break
+            f_c = piece(i, t_c)
+            left = f_g*f_c <= 0
+            t_d  = np.where(left, t_c, t_d)
+            t_g  = np.where(left, t_g, t_c)
+            f_g  = np.where(left, f_g, f_c)
+        return(np.unique(np.concatenate((exact, position(i, (t_g+t_d)/2)))))
+
+
+
 #%%#######################################
 # Fonctions d'itérations de l'algorithme #
 ##########################################
 
-# Phase de calcul de la spline
+# Résout le système tridiagonal A*z = rhs par scipy.linalg.solve_banded (LAPACK gtsv), en O(n) opérations et O(n) mémoire
+#   sub  contient la sous-diagonale  (sub[i]  = A[i,i-1], sub[0]   ignoré),
+#   diag contient la diagonale       (diag[i] = A[i,i]),
+#   sup  contient la sur-diagonale   (sup[i]  = A[i,i+1], sup[n-1] ignoré).
+# Les trois diagonales sont rangées dans le stockage bande (1,1) attendu par solve_banded : ab[1+i-j,j] = A[i,j].
+def solve_tridiagonal(sub, diag, sup, rhs):
+    ab = np.zeros((3, len(diag)))
+    ab[0,1:]  = sup[:-1]
+    ab[1]     = diag
+    ab[2,:-1] = sub[1:]
+    try:
+        return(scipy.linalg.solve_banded((1,1), ab, rhs))
+    except np.linalg.LinAlgError:
+        raise np.linalg.LinAlgError("Système tridiagonal singulier")
+
+# Phase de calcul de la spline (x et y sont des np.ndarray de flottants)
 def init_algo(x, y, c_g, v_g, c_d, v_d):
     
     def hx(i): return(x[i]-x[i-1])
@@ -84,62 +201,55 @@ def init_algo(x, y, c_g, v_g, c_d, v_d):
     np1 = len(x)
     n = np1-1
     
-    A = np.zeros((np1,np1))
-    b = np.zeros((np1,1))
-    for i in range(1,n):
-        A[i,i-1] = hx(i)   / (hx(i)+hx(i+1))
-        A[i,i]   = 2
-        A[i,i+1] = hx(i+1) / (hx(i)+hx(i+1))
-        b[i]     = 6  *  ( hy(i+1)/hx(i+1) - hy(i)/hx(i) )  /  (hx(i)+hx(i+1))
+    # Assemblage vectorisé des trois diagonales du système A*d2f = b, avec h_x[i-1] = hx(i) et h_y[i-1] = hy(i)
+    h_x  = np.diff(x)
+    h_y  = np.diff(y)
+    sub  = np.zeros(np1)
+    diag = np.full(np1, 2.0)
+    sup  = np.zeros(np1)
+    b    = np.zeros(np1)
+    sub[1:n] = h_x[:-1] / (h_x[:-1]+h_x[1:])
+    sup[1:n] = h_x[1:]  / (h_x[:-1]+h_x[1:])
+    b[1:n]   = 6  *  ( h_y[1:]/h_x[1:] - h_y[:-1]/h_x[:-1] )  /  (h_x[:-1]+h_x[1:])
     
     if c_g == 0:
-        A[0,0] = 1
-        b[0]   = 0
+        diag[0] = 1
+        b[0]    = 0
     elif c_g == 1:
-        A[0,0] = 1
-        b[0]   = v_g
+        diag[0] = 1
+        b[0]    = v_g
     elif c_g == 2:
-        A[0,0] = 1
-        A[0,1] = -1
-        b[0]   = 0
+        diag[0] = 1
+        sup[0]  = -1
+        b[0]    = 0
     elif c_g == 3:
-        A[0,0] = 2
-        A[0,1] = 1
-        b[0]   = 6/hx(1) * (hy(1)/hx(1) - v_g)
+        diag[0] = 2
+        sup[0]  = 1
+        b[0]    = 6/hx(1) * (hy(1)/hx(1) - v_g)
     
     if c_d == 0:
-        A[-1,-1] = 1
+        diag[-1] = 1
         b[-1]    = 0
     elif c_d == 1:
-        A[-1,-1] = 1
+        diag[-1] = 1
         b[-1]    = v_d
     elif c_d == 2:
-        A[-1,-1] = 1
-        A[-1,-2] = -1
+        diag[-1] = 1
+        sub[-1]  = -1
         b[-1]    = 0
     elif c_d == 3:
-        A[-1,-1] = 2
-        A[-1,-2] = 1
+        diag[-1] = 2
+        sub[-1]  = 1
         b[-1]    = 6/hx(n) * (v_d - hy(n)/hx(n))
     
-    d2f = np.linalg.solve(A,b)
+    d2f = solve_tridiagonal(sub, diag, sup, b)
     
-    def interpolation_1_output(xe):
-        i = 1
-        while i < len(x) and xe > x[i]: i += 1
-        if i == len(x): i -= 1
-        coeff_1 = -1 * d2f[i-1] / (6*hx(i))
-        coeff_2 = +1 * d2f[i  ] / (6*hx(i))
-        coeff_3 = d2f[i-1]*hx(i)/6 - y[i-1]/hx(i)
-        coeff_4 = y[i]/hx(i) - d2f[i]*hx(i)/6
-        return(float(coeff_1*(xe-x[i])**3 + coeff_2*(xe-x[i-1])**3  + coeff_3*(xe-x[i]) + coeff_4*(xe-x[i-1])))
-    
-    def interpolation(x_e):
-        if check_type_arguments.check_real(x_e)[0] == True: return(interpolation_1_output(np.array([x_e])))
-        else:
-            result = []
-            for xe in x_e: result.append(interpolation_1_output(xe))
-            return(np.array(result))
+    # Coefficients de chacun des morceaux cubiques dans la base (z-x[i-1])^k, calculés une seule fois
+    coeff_0 = y[:-1]
+    coeff_1 = h_y/h_x - h_x*(2*d2f[:-1]+d2f[1:])/6
+    coeff_2 = d2f[:-1]/2
+    coeff_3 = (d2f[1:]-d2f[:-1]) / (6*h_x)
+    interpolation = Spline(x, coeff_0, coeff_1, coeff_2, coeff_3)
     
     return(interpolation)
 
@@ -149,7 +259,7 @@ def init_algo(x, y, c_g, v_g, c_d, v_d):
 # Définition de la fonction principale #
 ########################################
 
-def spline_cub(x, y, x_e, cond_g=0, val_g=0, cond_d=0, val_d=0, output=""):
+def spline_cub(x, y, x_e, cond_g=0, val_g=0, cond_d=0, val_d=0, sort=False, output=""):
     """Calcul d'une spline cubique d'interpolation de tous les points (x_k,y_k) donnés en paramètres x et y.
     
     Les arguments attendus sont :
@@ -166,6 +276,8 @@ def spline_cub(x, y, x_e, cond_g=0, val_g=0, cond_d=0, val_d=0, output=""):
         - un réel val_g, utilisé dans la détermination de la condition à gauche (ignorée si cond_g = 0 ou 2) (défaut = 0),
         - un entier cond_d dans [0,1,2,3], déterminant la condition à droite (analogue à cond_g),
         - un réel val_d, utilisé dans la détermination de la condition à droite (analogue à val_g),
+        - un booléen sort (défaut = False) : si True, les points (x_k,y_k) sont d'abord triés ensemble par abscisses croissantes (par argsort),
+          au lieu de rejeter un vecteur x non trié,
         - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
             - la sortie standard si output = "pipe",
             - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
@@ -175,32 +287,35 @@ def spline_cub(x, y, x_e, cond_g=0, val_g=0, cond_d=0, val_d=0, output=""):
         - x et y ont même dimension,
         - x, y et x_e contiennent des réels,
         - x ne contient pas deux fois la même abscisse,
-        - les valeurs de x sont dans l'ordre croissant,
+        - les valeurs de x sont dans l'ordre croissant (après tri si sort = True),
         - cond_g et cond_d sont tous les deux dans [0,1,2,3],
         - tous les paramètres reçus ont bien le type attendu.
     
     Les sorties de la méthode sont :
         - y_e, la liste des valeurs du polynôme aux abscisses x_e,
-        - interpolation, une fonction renvoyant les valeurs de la spline en chacun des éléments du vecteur d'abscisses qu'on lui passe en paramètre.
+        - interpolation, un objet Spline (sérialisable par pickle) renvoyant les valeurs de la spline en chacun des éléments du vecteur d'abscisses qu'on lui passe en paramètre,
+          et proposant les méthodes vectorisées derivative(order), integrate(a, b) et roots().
         
     Exemples d'appel :
         - spline_cub([-1,0,1], [0,-1,0], [-2,-1,-0.5,0,0.5,1,2]),
         - spline_cub(np.array([-1,0,1]), np.array([0,-1,0]), np.array([-2,-1,-0.5,0,0.5,1,2])),
-        - y_e, spl = spline_cub([-1,0,1], [0,-1,0], [-2,-1,-0.5,0,0.5,1,2]), puis spl(np.array([3,4,5])).
+        - y_e, spl = spline_cub([-1,0,1], [0,-1,0], [-2,-1,-0.5,0,0.5,1,2]), puis spl(np.array([3,4,5])), spl.derivative(1)(0.5), spl.integrate(-1,1) ou spl.roots().
     """
     
     # Test des paramètres et définition de la destination de sortie des itérations
-    check_parameters_consistency(x, y, x_e, cond_g, val_g, cond_d, val_d, output)
-    write_output, _ = writing_function.define_writing_function(format_output, output)
-    
-    # Initialisation de l'algorithme
-    interpolation = init_algo(x, y, cond_g, val_g, cond_d, val_d)
+    x, y, x_e = check_parameters_consistency(x, y, x_e, cond_g, val_g, cond_d, val_d, sort, output)
+    write_output, _, close = writing_function.define_writing_function(format_output, output)
+    try:
+        # Initialisation de l'algorithme
+        interpolation = init_algo(x, y, cond_g, val_g, cond_d, val_d)
     
-    # Déroulement de l'algorithme
-    y_e = interpolation(x_e)
-    write_output(x, y, x_e, y_e)
+        # Déroulement de l'algorithme
+        y_e = interpolation(x_e)
+        write_output(x, y, x_e, y_e)
     
-    # Renvoi de la liste des images des points x_e par le polynôme d'interpolation, et le polynôme comme une fonction
-    return(y_e, interpolation)
+        # Renvoi de la liste des images des points x_e par le polynôme d'interpolation, et le polynôme comme une fonction
+        return(y_e, interpolation)
+    finally:
+        close()
 
 
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+import numpy as np
+
+
+
+#%%#########################################################
+# Gestion des équations actives dans les versions par lots #
+############################################################
+
+# Les versions par lots des méthodes scalaires résolvent simultanément plusieurs équations indépendantes. Les vecteurs d'état ne contiennent
+# que les équations encore actives, dont les indices sont stockés dans lanes ; à chaque itération, chaque critère d'arrêt atteint par une
+# équation est noté par un code (-1 si l'équation n'est pas arrêtée), et les équations arrêtées sont retirées des vecteurs d'état.
+
+# Enregistre la racine x_k, le nombre d'itérations k et la raison d'arrêt des équations arrêtées, puis les retire des vecteurs d'état
+# state (liste de vecteurs indexés comme lanes). Renvoie les vecteurs d'état et les indices restreints aux équations encore actives.
+def remove_stopped_lanes(k, reason, x_k, state, lanes, roots, nb_iters, reasons):
+    stopped = reason >= 0
+    if not(np.any(stopped)): return(list(state), lanes)
+    roots[lanes[stopped]]    = x_k[stopped]
+    nb_iters[lanes[stopped]] = k
+    reasons[lanes[stopped]]  = reason[stopped]
+    active = ~stopped
+    return([elt[active] for elt in state], lanes[active])
+
+# Crée le message d'arrêt d'une version par lots, résumant le nombre d'équations arrêtées par chacun des critères de stop_reasons
+def format_stopping_batch(reasons, stop_reasons):
+    counts = np.bincount(reasons, minlength=len(stop_reasons))
+    return("\n".join(["{:>9} équation(s) : {}".format(counts[i], stop_reasons[i]) for i in range(len(stop_reasons))]))
@@ -24,4 +24,16 @@ def tol_rel_approx(elt1, elt2):
     den = np.linalg.norm(elt1) + np.spacing(1)
     return(num / den)
 
+# Version par lots de tol_rel_approx pour des suites scalaires : calcule abs(elt1-elt2) / (abs(elt1)+epsilon_machine) composante par composante
+def tol_rel_approx_batch(elt1, elt2):
+    num = np.abs(elt1-elt2)
+    den = np.abs(elt1) + np.spacing(1)
+    return(num / den)
+
+# Définit la fonction tol_mixed_error, qui calcule norm(elt1-elt2) / (tol_abs + tol_rel*norm(elt1)) : l'erreur est jugée acceptable si le résultat est <= 1
+def tol_mixed_error(elt1, elt2, tol_rel, tol_abs):
+    num = np.linalg.norm(elt1-elt2)
+    den = tol_abs + tol_rel*np.linalg.norm(elt1)
+    return(num / den)
+
 
@@ -12,6 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
+from . import jit_kernels
 import types
 import numpy as np
 
@@ -44,8 +45,8 @@ def check_fundamental(arg, expected_type): return(isinstance(arg, expected_type)
 # Définition des fonctions pour chaque type #
 #############################################
 
-# Renvoie un couple (bool, type) où (bool = True si et seulement si arg est une fonction) et (type est le type de arg)
-def check_function(arg): return(check_fundamental(arg, types.FunctionType))
+# Renvoie un couple (bool, type) où (bool = True si et seulement si arg est une fonction, éventuellement compilée par numba) et (type est le type de arg)
+def check_function(arg): return(check_fundamental(arg, types.FunctionType)[0] or jit_kernels.is_jitted(arg), get_type(arg))
 
 # Renvoie un couple (bool, type) où (bool = True si et seulement si arg est une chaîne de caractères) et (type est le type de arg)
 def check_str(arg): return(check_fundamental(arg, str))
@@ -59,20 +60,49 @@ def check_real(arg):
 # Renvoie un couple (bool, type) où (bool = True si et seulement si arg est un int) et (type est le type de arg)
 def check_int(arg): return(check_fundamental(arg, int))
 
+# Renvoie un couple (bool, type) où (bool = True si et seulement si arg est un booléen) et (type est le type de arg)
+def check_bool(arg): return(check_fundamental(arg, (bool, np.bool_)))
+
 # Renvoie un couple (bool, type) où (bool = True si et seulement si arg est un np.ndarray) et (type est le type de arg)
 def check_nparray(arg): return(check_fundamental(arg, np.ndarray))
 
 # Renvoie un couple (bool, type) où (bool = True si et seulement si arg est une liste) et (type est le type de arg)
 def check_list(arg): return(check_fundamental(arg, list))
 
+# Type attendu « vecteur de réels » : une liste ou un np.ndarray dont tous les éléments sont des réels (booléens, entiers ou flottants).
+# Le contrôle des éléments est fait en une seule opération vectorisée, sur le dtype du tableau (la liste étant convertie une seule fois
+# par np.asarray), et non élément par élément.
+class RealVector:
+    pass
+
+# Renvoie un couple (bool, type) où (bool = True si et seulement si arg est un vecteur de réels) et (type est le type de arg)
+def check_real_vector(arg):
+    if not(isinstance(arg, (list, np.ndarray))): return(False, get_type(arg))
+    try:    kind = arg.dtype.kind if isinstance(arg, np.ndarray) else np.asarray(arg).dtype.kind
+    except: kind = "O"
+    if kind in "biuf": return(True, get_type(arg))
+    return(False, get_type(arg)+" contenant des éléments non réels")
+
+# Table des fonctions de vérification associées à chaque type attendu
+CHECKERS = {types.FunctionType: check_function,
+            str:                check_str,
+            float:              check_real,
+            int:                check_int,
+            bool:               check_bool,
+            np.ndarray:         check_nparray,
+            list:               check_list,
+            RealVector:         check_real_vector}
+
+# Noms des types attendus affichés dans les messages d'erreur, lorsqu'ils diffèrent de str(type_attendu)
+TYPE_NAMES = {RealVector: "vecteur de réels (list ou np.ndarray)"}
+
 # Renvoie un couple (bool, type) où (bool = True si et seulement si arg est du type expected_type) et (type est le type de arg)
-def check_generic(arg, expected_type):
-    if expected_type == types.FunctionType: return(check_function(arg))
-    if expected_type == str:                return(check_str(arg))
-    if expected_type == float:              return(check_real(arg))
-    if expected_type == int:                return(check_int(arg))
-    if expected_type == np.ndarray:         return(check_nparray(arg))
-    if expected_type == list:               return(check_list(arg))
+def check_generic(arg, expected_type): return(CHECKERS[expected_type](arg))
+
+# Renvoie le nom du type attendu expected (ou de la liste des types attendus) affiché dans les messages d'erreur
+def type_name(expected):
+    if type(expected) == list: return("["+", ".join([type_name(exp) for exp in expected])+"]")
+    return(TYPE_NAMES.get(expected, str(expected)))
 
 
 
@@ -90,27 +120,19 @@ def check_generic(arg, expected_type):
 #       param_i est le paramètre,
 #       nom_param_i une chaîne de caractères,
 #       type_attendu_param_i est le type que param_i doit avoir, ou une liste des types que param_i peut avoir.
-# La fonction ne renvoie rien mais signale une ValueError si au moins un des paramètres n'est pas du type attendu.
+# Les vecteurs de réels (type attendu RealVector) sont vérifiés en une seule opération, quelle que soit leur taille.
+# La fonction ne renvoie rien mais signale une ValueError si au moins un des paramètres n'est pas du type attendu. Les messages d'erreur
+# (et leur mise en page) ne sont construits qu'en cas d'échec.
 def check_parameters(args_list):
-    len_n = 0
-    len_c = 0
-    for _, name, expected in args_list:
-        len_n = max(len_n, len(name))
-        len_c = max(len_c, len(str(expected)))
-    buffer_errors = []
+    failures = []
     for arg, name, expected in args_list:
-        if type(expected) == list:
-            is_ok, given = check_generic(arg, expected[0])
-            for exp in expected:
-                is_ok_exp, given_exp = check_generic(arg, exp)
-                if is_ok_exp:
-                    is_ok = True
-                    given = given_exp
-        else:
-            is_ok, given = check_generic(arg, expected)
-        if not(is_ok):
-            s = "Paramètre {:{len_n}} : attendu {:<{len_c}} , reçu {}".format(name, str(expected), str(given), len_n=len_n, len_c=len_c)
-            buffer_errors.append(s)
-    if buffer_errors != []:
+        for exp in (expected if type(expected) == list else [expected]):
+            is_ok, given = check_generic(arg, exp)
+            if is_ok: break
+        if not(is_ok): failures.append((name, expected, given))
+    if failures != []:
+        len_n = max([len(name) for _, name, _ in args_list])
+        len_c = max([len(type_name(expected)) for _, _, expected in args_list])
+        buffer_errors = ["Paramètre {:{len_n}} : attendu {:<{len_c}} , reçu {}".format(name, type_name(expected), str(given), len_n=len_n, len_c=len_c) for name, expected, given in failures]
         buffer_errors = "\n".join(["Problèmes de type des paramètres :"]+buffer_errors)
         raise ValueError(buffer_errors)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+import numpy as np
+
+
+
+#%%################################################
+# Définition de l'interpolation d'Hermite cubique #
+###################################################
+
+# Évalue aux instants t_e (vecteur) l'interpolant d'Hermite cubique d'extrémités (t_g,x_g,d_g) et (t_d,x_d,d_d), où d = dx/dt.
+# t_g, x_g, d_g, t_d, x_d, d_d peuvent être des tableaux indexés comme t_e (un intervalle par instant) ou communs à tous les instants.
+# Le résultat est de taille (len(t_e),)+dim(x).
+def hermite_cubic(t_e, t_g, x_g, d_g, t_d, x_d, d_d):
+    h     = t_d - t_g
+    theta = (t_e - t_g) / h
+    h00 = (1 + 2*theta) * (1-theta)**2
+    h10 = theta * (1-theta)**2
+    h01 = theta**2 * (3 - 2*theta)
+    h11 = theta**2 * (theta-1)
+    shape = (len(t_e),) + (1,)*(np.ndim(x_g) - np.ndim(t_g))
+    h00, h10, h01, h11, h = [np.reshape(c, shape) if np.ndim(c) > 0 else c for c in (h00, h10, h01, h11, h)]
+    return(h00*x_g + h10*h*d_g + h01*x_d + h11*h*d_d)
+
+
+
+#%%#####################################################
+# Définition de l'objet de sortie dense d'une solution #
+########################################################
+
+# Sortie dense d'une solution d'équation différentielle : interpolation d'Hermite cubique par morceaux de la trajectoire,
+# construite à partir des points x_k, des instants t_k et des dérivées d_k = f(x_k,t_k) calculées par le schéma.
+class DenseOutput:
+    __slots__ = ("t", "x", "d")
+
+    def __init__(self, t, x, d):
+        t = np.asarray(t, dtype=float)
+        x = np.asarray(x, dtype=float)
+        d = np.asarray(d, dtype=float)
+        if len(t) > 1 and t[-1] < t[0]: t, x, d = t[::-1], x[::-1], d[::-1]
+        self.t = t
+        self.x = x
+        self.d = d
+
+    # Permet la sérialisation par pickle (un objet à __slots__ n'a pas de __dict__)
+    def __reduce__(self):
+        return(DenseOutput, (self.t, self.x, self.d))
+
+    def __repr__(self):
+        return("DenseOutput({} pas sur [{:+.4e},{:+.4e}])".format(len(self.t)-1, self.t[0], self.t[-1]))
+
+    def __call__(self, t_e):
+        """Renvoie les valeurs interpolées de la solution aux instants t_e (réel, ou vecteur : le résultat est alors de taille (len(t_e),)+dim(x))."""
+        scalar = np.ndim(t_e) == 0
+        t_e = np.atleast_1d(np.asarray(t_e, dtype=float))
+        if len(self.t) == 1: return(np.broadcast_to(self.x[0], t_e.shape+self.x.shape[1:]).copy() if not(scalar) else self.x[0])
+        i = np.clip(np.searchsorted(self.t, t_e, side="right"), 1, len(self.t)-1)
+        x_e = hermite_cubic(t_e, self.t[i-1], self.x[i-1], self.d[i-1], self.t[i], self.x[i], self.d[i])
+        return(x_e[0] if scalar else x_e)
+
+
+
+#%%############################################################
+# Enregistrement en cours d'intégration des instants demandés #
+###############################################################
+
+# Vérifie le vecteur t_eval des instants de sortie demandés, et le renvoie sous forme de np.ndarray
+def check_t_eval(t_eval, t0, tm):
+    t_eval = np.asarray(t_eval, dtype=float)
+    if np.ndim(t_eval) != 1:                              raise ValueError("t_eval doit être un vecteur d'instants")
+    direction = 1 if tm >= t0 else -1
+    if np.any(np.diff(direction*t_eval) < 0):             raise ValueError("Les instants de t_eval doivent être rangés de t0 vers tm")
+    if np.any((t_eval-t0)*direction < 0) or np.any((t_eval-tm)*direction > 0):
+                                                          raise ValueError("Les instants de t_eval doivent être compris entre t0 et tm")
+    return(t_eval)
+
+# Évalue et enregistre dans list_x les instants t_eval[i_eval:] situés dans le pas [t_g,t_d] (ou tous les instants restants si last),
+# puis renvoie l'indice du premier instant non encore traité : seuls les instants demandés sont ainsi stockés au cours de l'intégration.
+# last = True n'est à utiliser qu'une fois l'instant final tm atteint (t_d = tm, aux erreurs d'arrondi près), les instants restants
+# étant alors tous égaux à t_d.
+def record_t_eval(t_eval, i_eval, list_x, t_g, x_g, d_g, t_d, x_d, d_d, last=False):
+    if last:
+        j_eval = len(t_eval)
+    elif t_d >= t_g:
+        j_eval = i_eval + np.searchsorted(t_eval[i_eval:], t_d, side="right")
+    else:
+        remaining = t_eval[i_eval:][::-1]
+        j_eval = i_eval + len(remaining) - np.searchsorted(remaining, t_d, side="left")
+    if j_eval > i_eval:
+        if t_d == t_g: list_x.extend([x_d]*(j_eval-i_eval))
+        else:          list_x.extend(hermite_cubic(t_eval[i_eval:j_eval], t_g, x_g, d_g, t_d, x_d, d_d))
+    return(j_eval)
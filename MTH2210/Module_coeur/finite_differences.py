@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+import concurrent.futures
+import numpy as np
+import scipy.sparse
+
+
+
+#%%######################################################
+# Définition des schémas de différences finies acceptés #
+#########################################################
+
+# Schémas d'approximation de la colonne d de la jacobienne, où e_d est le d-ième vecteur de la base canonique :
+#   - "forward"    : (f(x+h*e_d) - f(x)) / h,                                   n   évaluations de f (f(x) étant généralement déjà connue),
+#   - "central"    : (f(x+h*e_d) - f(x-h*e_d)) / (2*h),                         2*n évaluations de f,
+#   - "richardson" : (4*D(h/2) - D(h)) / 3, où D(h) est la différence centrée,  4*n évaluations de f.
+FD_SCHEMES = ("forward", "central", "richardson")
+
+# Renvoie True si et seulement si pool est une destination acceptée pour les évaluations de f : None (évaluations séquentielles),
+# un entier strictement positif (nombre de fils d'exécution d'un ThreadPoolExecutor), ou un concurrent.futures.Executor
+def is_pool(pool):
+    if pool is None: return(True)
+    if isinstance(pool, concurrent.futures.Executor): return(True)
+    return(isinstance(pool, int) and not(isinstance(pool, bool)) and pool >= 1)
+
+# Renvoie True si et seulement si la fonction vectorisée f, appelée sur une matrice dont les colonnes sont des points de même
+# dimension que x, renvoie la matrice dont les colonnes sont les valeurs de f en ces points (f_x = f(x) peut être fournie si déjà connue)
+def is_vectorized(f, x, f_x=None):
+    if f_x is None: f_x = f(x)
+    try:    f_xx = f(np.column_stack([x, x]))
+    except: return(False)
+    return(isinstance(f_xx, np.ndarray) and np.shape(f_xx) == (np.size(f_x), 2) and np.allclose(f_xx[:,0], f_x))
+
+
+
+#%%##########################################
+# Évaluation de f sur un ensemble de points #
+#############################################
+
+# Évalue f sur chacune des colonnes de la matrice points, et renvoie la matrice des valeurs (une colonne par point) :
+#   - si vectorized = True, f est appelée une seule fois sur la matrice points,
+#   - sinon, si pool est un entier, les évaluations sont réparties sur pool fils d'exécution (adapté aux f qui libèrent le GIL,
+#     comme les appels à numpy, scipy ou à un code externe),
+#   - sinon, si pool est un concurrent.futures.Executor (ThreadPoolExecutor ou ProcessPoolExecutor), les évaluations lui sont confiées
+#     (un ProcessPoolExecutor demande une fonction f sérialisable, donc définie au niveau d'un module et non par lambda),
+#   - sinon, les évaluations sont faites séquentiellement.
+def evaluate_points(f, points, vectorized=False, pool=None):
+    if vectorized: return(np.asarray(f(points), dtype=float))
+    columns = [points[:,j] for j in range(np.shape(points)[1])]
+    if pool is None:
+        values = [f(p) for p in columns]
+    elif isinstance(pool, concurrent.futures.Executor):
+        values = list(pool.map(f, columns))
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=pool) as executor:
+            values = list(executor.map(f, columns))
+    return(np.column_stack(values).astype(float))
+
+
+
+#%%##########################################
+# Fonction d'approximation de la jacobienne #
+#############################################
+
+# Renvoie les pas de différences finies de chaque composante de x, selon le schéma :
+#   - "forward"    : h_d = sqrt(eps)  *max(1,abs(x_d)),
+#   - "central"    : h_d = eps^(1/3)  *max(1,abs(x_d)),
+#   - "richardson" : h_d = 1e-6 si min(x) = 0, et 1e-3*min(x) sinon (pas commun à toutes les composantes).
+# Les pas sont ajustés pour être exactement représentables autour de x, i.e. h_d = (x_d+h_d)-x_d.
+def steps(x, scheme):
+    x = np.asarray(x, dtype=float)
+    if scheme == "richardson":
+        h_init = 10**-6 if np.min(x) == 0 else 10**-3*np.min(x)
+        return(np.full(np.size(x), float(h_init)))
+    eps = np.finfo(float).eps
+    h = (np.sqrt(eps) if scheme == "forward" else np.cbrt(eps)) * np.maximum(1, np.abs(x))
+    return((x+h)-x)
+
+# Renvoie la matrice des directions de perturbation, dont la colonne c est la somme des h_d*e_d sur les colonnes d de couleur c
+# (structure = None : une direction h_d*e_d par colonne d)
+def directions(h, structure):
+    if structure is None: return(np.diag(h))
+    _, _, _, colors = structure
+    delta = np.zeros((np.size(h), np.max(colors)+1))
+    delta[np.arange(np.size(h)), colors] = h
+    return(delta)
+
+# Reconstruit la jacobienne à partir de la matrice diff des différences de valeurs de f (une colonne par direction de perturbation),
+# divisées par les pas div (un par colonne de la jacobienne) : dense si structure = None, et sinon restreinte au motif de creux,
+# sous forme du vecteur des termes non nuls
+def expand(diff, div, structure):
+    if structure is None: return(diff / div)
+    _, rows, cols, colors = structure
+    return(diff[rows, colors[cols]] / div[cols])
+
+# Approche la jacobienne de f en x par différences finies selon le schéma scheme (voir FD_SCHEMES). Tous les points perturbés sont
+# construits d'un bloc, sous forme d'une matrice dont la colonne j est x+delta_j, puis évalués par evaluate_points (appel unique d'une f
+# vectorisée, ou répartition des évaluations sur un pool). f_x = f(x) peut être fourni pour épargner une évaluation au schéma "forward".
+# Si structure (renvoyée par jac_structure) est fournie, les colonnes de même couleur sont perturbées ensemble : le nombre d'évaluations
+# de f est proportionnel au nombre de couleurs (de l'ordre de la largeur de bande) au lieu de n, et la jacobienne renvoyée est creuse.
+def app_jac(f, x, f_x=None, scheme="richardson", vectorized=False, pool=None, structure=None):
+    x = np.asarray(x, dtype=float)
+    h = steps(x, scheme)
+    delta = directions(h, structure)
+    m = np.shape(delta)[1]
+    if scheme == "forward":
+        if f_x is None: f_x = f(x)
+        f_p = evaluate_points(f, x[:,None] + delta, vectorized, pool)
+        app = expand(f_p - np.asarray(f_x, dtype=float)[:,None], h, structure)
+    elif scheme == "central":
+        f_p = evaluate_points(f, x[:,None] + np.hstack([delta, -delta]), vectorized, pool)
+        app = expand(f_p[:,:m] - f_p[:,m:], 2*h, structure)
+    else:
+        f_p = evaluate_points(f, x[:,None] + np.hstack([delta, -delta, delta/2, -delta/2]), vectorized, pool)
+        app_0 = expand(f_p[:,:m]      - f_p[:,m:2*m], 2*h,     structure)
+        app_1 = expand(f_p[:,2*m:3*m] - f_p[:,3*m:],  2*(h/2), structure)
+        app = (2**2*app_1 - app_0) / (2**2-1)
+    if structure is None: return(app)
+    shape, rows, cols, _ = structure
+    return(scipy.sparse.csc_matrix((app, (rows, cols)), shape=shape))
+
+
+
+#%%#######################################################
+# Détection du motif de creux et coloration des colonnes #
+##########################################################
+
+# Nombre de colonnes de la jacobienne calculées simultanément lors de la détection de son motif de creux
+DETECTION_BLOCK = 64
+
+# Renvoie True si et seulement si sparsity est un motif de creux accepté pour une jacobienne de taille (n,n) : None (jacobienne dense),
+# "auto" (motif détecté), ou une matrice np.ndarray ou scipy.sparse de taille (n,n) dont les termes non nuls forment le motif
+def is_sparsity(sparsity, n):
+    if sparsity is None: return(True)
+    if isinstance(sparsity, str): return(sparsity == "auto")
+    return((isinstance(sparsity, np.ndarray) or scipy.sparse.issparse(sparsity)) and np.shape(sparsity) == (n, n))
+
+# Détecte le motif de creux de la jacobienne de f par différences centrées en un point x_t proche de x, tiré aléatoirement (de façon
+# reproductible) pour éviter qu'un terme structurellement non nul ne s'annule par accident en x. Les colonnes sont calculées par blocs
+# de DETECTION_BLOCK, ce qui coûte 2*n évaluations de f (une seule fois) et une mémoire O(n*DETECTION_BLOCK + nnz).
+def detect_sparsity(f, x, vectorized=False, pool=None):
+    x = np.asarray(x, dtype=float)
+    n = np.size(x)
+    x_t = x + 10**-3*np.random.default_rng(0).uniform(0.5, 1, n)*np.maximum(1, np.abs(x))
+    h = steps(x_t, "central")
+    list_rows, list_cols = [], []
+    for j in range(0, n, DETECTION_BLOCK):
+        block = np.arange(j, min(j+DETECTION_BLOCK, n))
+        delta = np.zeros((n, np.size(block)))
+        delta[block, np.arange(np.size(block))] = h[block]
+        f_p = evaluate_points(f, x_t[:,None] + np.hstack([delta, -delta]), vectorized, pool)
+        rows, cols = np.nonzero(f_p[:,:np.size(block)] != f_p[:,np.size(block):])
+        list_rows.append(rows)
+        list_cols.append(block[cols])
+    rows, cols = np.concatenate(list_rows), np.concatenate(list_cols)
+    return(scipy.sparse.csc_matrix((np.ones(np.size(rows)), (rows, cols)), shape=(n, n)))
+
+# Colore les colonnes du motif de creux pattern de façon gloutonne : deux colonnes ayant un terme non nul sur une même ligne reçoivent
+# des couleurs différentes, de sorte que les colonnes de même couleur peuvent être perturbées ensemble. Renvoie le vecteur des couleurs
+# (entiers de 0 à nombre de couleurs - 1) ; pour une matrice bande, le nombre de couleurs est au plus la largeur de bande l+u+1.
+# Le graphe des conflits est construit en entiers 64 bits : le nombre de lignes partagées par deux colonnes (jusqu'à n) ne peut donc
+# pas déborder et s'annuler, ce qui rendrait compatibles deux colonnes en conflit.
+def color_columns(pattern):
+    pattern = scipy.sparse.csc_matrix(pattern, dtype=bool).astype(np.int64)
+    conflicts = scipy.sparse.csr_matrix(pattern.T @ pattern)
+    conflicts.eliminate_zeros()
+    n = np.shape(pattern)[1]
+    colors = np.full(n, -1)
+    forbidden = np.full(n+1, -1)
+    for j in range(n):
+        neighbours = colors[conflicts.indices[conflicts.indptr[j]:conflicts.indptr[j+1]]]
+        forbidden[neighbours[neighbours >= 0]] = j
+        c = 0
+        while forbidden[c] == j: c += 1
+        colors[j] = c
+    return(colors)
+
+# Renvoie la structure exploitée par app_jac pour une jacobienne de motif sparsity (voir is_sparsity) : None si sparsity = None,
+# et sinon le quadruplet (taille, indices de ligne, indices de colonne, couleurs des colonnes) des termes non nuls du motif
+def jac_structure(f, x, sparsity, vectorized=False, pool=None):
+    if sparsity is None: return(None)
+    if isinstance(sparsity, str): pattern = detect_sparsity(f, x, vectorized, pool)
+    else:                         pattern = scipy.sparse.csc_matrix(sparsity != 0 if isinstance(sparsity, np.ndarray) else sparsity)
+    pattern = scipy.sparse.coo_matrix(pattern)
+    pattern.eliminate_zeros()
+    return((pattern.shape, pattern.row, pattern.col, color_columns(pattern)))
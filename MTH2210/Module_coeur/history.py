@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%############################################
+# Définition de l'historique de taille bornée #
+###############################################
+
+# Liste ne conservant que ses maxlen derniers éléments. Les critères d'arrêt et les itérations des méthodes n'accèdent qu'aux derniers
+# termes des suites (list_x[-1], list_x[-2], list_x[-2:]) : les versions génératrices des méthodes leur passent de telles listes,
+# ce qui garde une mémoire constante quel que soit le nombre d'itérations.
+#   l = BoundedList([1,2,3], maxlen=2)  donne l = [2,3]
+#   l.append(4)                         donne l = [3,4]
+class BoundedList(list):
+    __slots__ = ("maxlen",)
+
+    def __init__(self, iterable=(), maxlen=2):
+        list.__init__(self, iterable)
+        self.maxlen = maxlen
+        if len(self) > maxlen: del self[:len(self)-maxlen]
+
+    def append(self, elt):
+        list.append(self, elt)
+        if len(self) > self.maxlen: del self[0]
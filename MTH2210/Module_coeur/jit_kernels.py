@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+import numpy as np
+
+# numba est une dépendance optionnelle : sans elle, les noyaux compilés ne sont jamais utilisés et les méthodes gardent leur version Python
+try:
+    import numba
+    import numba.extending
+except ImportError:
+    numba = None
+
+
+
+#%%#############################################
+# Compilation optionnelle des noyaux de calcul #
+################################################
+
+# Epsilon machine utilisé par les critères d'arrêt relatifs (voir check_relative_tolerance.tol_rel_approx)
+EPS = np.spacing(1)
+
+# Compile la fonction func par numba.njit si numba est disponible, et la renvoie inchangée sinon
+def njit(func):
+    if numba is None: return(func)
+    return(numba.njit(func))
+
+# Renvoie True si et seulement si f est une fonction compilée par numba (numba.njit ou numba.jit)
+def is_jitted(f):
+    if numba is None: return(False)
+    return(numba.extending.is_jitted(f))
+
+# Renvoie True si et seulement si la résolution peut être entièrement confiée à un noyau compilé : numba est disponible, toutes les
+# fonctions de funcs sont compilées par numba, et aucune itération n'est à écrire (output = "" ou output = "None")
+def can_compile(output, *funcs):
+    return(all([is_jitted(f) for f in funcs]) and output.lower() in ["none", ""])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+import warnings
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+
+
+
+#%%#####################################################
+# Définition des représentations de matrices acceptées #
+########################################################
+
+# Tolérance relative des résolutions itératives (méthode de Krylov GMRES) utilisées lorsque la matrice est un LinearOperator
+KRYLOV_RTOL = 10**-10
+
+# Une matrice factorisée est considérée comme (numériquement) singulière si l'estimation de l'inverse de son conditionnement est inférieure à RCOND_MIN
+RCOND_MIN = np.finfo(float).eps
+
+# Les matrices (typiquement des jacobiennes) peuvent être données sous l'une des formes suivantes :
+#   - dense   : un np.ndarray ou une np.matrix de taille (n,n),
+#   - creuse  : une matrice ou un tableau scipy.sparse de taille (n,n),
+#   - bande   : un couple ((l,u), ab) au format de scipy.linalg.solve_banded, où l et u sont les nombres de sous- et sur-diagonales
+#               et ab, de taille (l+u+1,n), contient les diagonales (ab[u+i-j,j] = a[i,j]),
+#   - opérateur : un scipy.sparse.linalg.LinearOperator de taille (n,n), dont seul le produit matrice-vecteur est connu.
+
+# Renvoie True si et seulement si d est une matrice bande au format ((l,u), ab)
+def is_banded(d):
+    return(isinstance(d, tuple) and len(d) == 2 and isinstance(d[0], tuple) and len(d[0]) == 2 and isinstance(d[1], np.ndarray) and np.ndim(d[1]) == 2)
+
+# Renvoie True si et seulement si d est une matrice dense
+def is_dense(d):
+    return(isinstance(d, np.ndarray))
+
+# Renvoie un couple (bool, type) où (bool = True si et seulement si d est sous l'une des formes acceptées) et (type est le type de d)
+def check_matrix(d):
+    is_ok = is_dense(d) or scipy.sparse.issparse(d) or isinstance(d, scipy.sparse.linalg.LinearOperator) or is_banded(d)
+    return(is_ok, str(type(d)))
+
+# Renvoie la taille (nombre de lignes, nombre de colonnes) de la matrice d
+def get_shape(d):
+    if is_banded(d): return((np.shape(d[1])[1], np.shape(d[1])[1]))
+    return(tuple(d.shape))
+
+# Convertit la matrice bande d = ((l,u), ab) au format creux
+def banded_to_sparse(d):
+    (l, u), ab = d
+    return(scipy.sparse.dia_matrix((ab, np.arange(u, -l-1, -1)), shape=get_shape(d)))
+
+# Renvoie le produit matrice-vecteur d*v
+def matvec(d, v):
+    if is_banded(d): d = banded_to_sparse(d)
+    if isinstance(d, scipy.sparse.linalg.LinearOperator): return(d.matvec(v))
+    return(np.asarray(d @ v).ravel())
+
+# Renvoie le produit matrice-vecteur d^T*v
+def rmatvec(d, v):
+    if is_banded(d): d = banded_to_sparse(d)
+    if isinstance(d, scipy.sparse.linalg.LinearOperator): return(d.rmatvec(v))
+    return(np.asarray(d.T @ v).ravel())
+
+
+
+#%%##########################################
+# Résolution des systèmes linéaires d*x = b #
+#############################################
+
+# Résout le système linéaire d*x = b en choisissant la méthode selon la forme de d :
+#   - dense     : factorisation LU dense (np.linalg.solve),
+#   - creuse    : factorisation LU creuse (scipy.sparse.linalg.splu), en mémoire O(nnz),
+#   - bande     : factorisation LU bande (scipy.linalg.solve_banded), en mémoire O((l+u+1)*n),
+#   - opérateur : méthode de Krylov GMRES, qui n'utilise que des produits matrice-vecteur (Newton inexact si GMRES n'a pas convergé).
+# Signale une np.linalg.LinAlgError si d est singulière (hors cas opérateur).
+def solve_linear(d, b):
+    if is_dense(d):
+        return(np.linalg.solve(d, b))
+    if scipy.sparse.issparse(d):
+        try:    return(scipy.sparse.linalg.splu(scipy.sparse.csc_matrix(d)).solve(np.asarray(b, dtype=float)))
+        except RuntimeError: raise np.linalg.LinAlgError("Matrice creuse singulière")
+    if is_banded(d):
+        return(scipy.linalg.solve_banded(d[0], d[1], b))
+    x, _ = scipy.sparse.linalg.gmres(d, b, rtol=KRYLOV_RTOL, atol=0.0)
+    return(x)
+
+# Factorise la matrice d une fois pour toutes, afin de résoudre ensuite plusieurs systèmes d*x = b par solve_factorized
+# (réutilisation de la jacobienne dans les méthodes de Newton), et estime l'inverse rcond de son conditionnement à partir de cette
+# même factorisation, sans calcul supplémentaire en O(n^3) :
+#   - dense     : factorisation LU dense (scipy.linalg.lu_factor), chaque résolution coûtant alors O(n^2) au lieu de O(n^3),
+#                 et rcond estimé en norme 1 par LAPACK (gecon) en O(n^2),
+#   - creuse    : factorisation LU creuse (scipy.sparse.linalg.splu), rcond étant estimé par le rapport des pivots extrêmes de U
+#                 (rcond = 0 si la factorisation échoue sur un pivot nul),
+#   - bande     : factorisation LU creuse de la matrice bande convertie au format creux,
+#   - opérateur : aucune factorisation, chaque résolution étant faite par GMRES, et rcond inconnu (np.nan).
+# Renvoie le triplet (forme, factorisation, rcond).
+def factorize(d):
+    if is_dense(d):
+        d = np.asarray(d, dtype=float)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", scipy.linalg.LinAlgWarning)
+            fact = scipy.linalg.lu_factor(d, check_finite=False)
+        if np.any(np.diag(fact[0]) == 0) or not(np.all(np.isfinite(fact[0]))): return(("dense", fact, 0.0))
+        gecon, = scipy.linalg.get_lapack_funcs(("gecon",), (fact[0],))
+        rcond, _ = gecon(fact[0], np.linalg.norm(d, 1), norm="1")
+        return(("dense", fact, rcond))
+    if scipy.sparse.issparse(d) or is_banded(d):
+        if is_banded(d): d = banded_to_sparse(d)
+        try:    fact = scipy.sparse.linalg.splu(scipy.sparse.csc_matrix(d))
+        except RuntimeError: return(("sparse", None, 0.0))
+        pivots = np.abs(fact.U.diagonal())
+        return(("sparse", fact, np.min(pivots)/np.max(pivots) if np.max(pivots) > 0 else 0.0))
+    return(("operator", d, np.nan))
+
+# Renvoie True si la matrice factorisée lu (renvoyée par factorize) est singulière ou numériquement singulière (rcond < RCOND_MIN)
+def is_singular_factorized(lu):
+    return(lu[2] < RCOND_MIN)
+
+# Résout le système linéaire d*x = b à partir de la factorisation lu de d renvoyée par factorize
+def solve_factorized(lu, b):
+    kind, fact, _ = lu
+    if kind == "dense":  return(scipy.linalg.lu_solve(fact, b, check_finite=False))
+    if kind == "sparse": return(fact.solve(np.asarray(b, dtype=float)))
+    return(solve_linear(fact, b))
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+from . import linear_solvers
+import numpy as np
+
+
+
+#%%###########################################
+# Définition des stratégies de globalisation #
+##############################################
+
+# Stratégies de globalisation du pas de Newton p_n = -Jac(f)(x_k)^-1*f(x_k), toutes fondées sur la fonction de mérite phi(x) = norm(f(x))^2 :
+#   - "none"         : pas de Newton complet x_kp1 = x_k + p_n,
+#   - "line_search"  : recherche linéaire par rebroussement, x_kp1 = x_k + alpha*p_n avec alpha = 1, 1/2, 1/4, ... jusqu'à la condition
+#                      d'Armijo phi(x_k + alpha*p_n) <= (1 - 2*ARMIJO*alpha)*phi(x_k),
+#   - "trust_region" : région de confiance de rayon radius, le pas étant choisi sur le chemin « dogleg » reliant le point de Cauchy
+#                      (minimiseur du modèle linéaire dans la direction de plus forte descente) au pas de Newton.
+GLOBALIZATIONS = ("none", "line_search", "trust_region")
+
+# Constante de la condition d'Armijo, et nombre maximal de réductions du pas (ou du rayon de confiance) par itération
+ARMIJO         = 10**-4
+MAX_REDUCTIONS = 30
+
+# Seuils de la région de confiance : le pas est accepté si le rapport rho entre la réduction effective et la réduction prévue de phi
+# dépasse TR_ACCEPT ; le rayon est divisé par 4 si rho < TR_SHRINK, et doublé si rho > TR_EXPAND et que le pas atteint le bord de la région
+TR_ACCEPT = 10**-4
+TR_SHRINK = 0.25
+TR_EXPAND = 0.75
+
+
+
+#%%############################
+# Recherche linéaire d'Armijo #
+###############################
+
+# Renvoie le couple (x_kp1, f(x_kp1)) obtenu par rebroussement le long du pas de Newton p_n. Chaque essai coûte une évaluation de f ;
+# si la condition d'Armijo n'est pas atteinte après MAX_REDUCTIONS réductions, le dernier essai est renvoyé.
+def line_search(f, x_k, f_k, p_n):
+    phi_k = np.dot(f_k, f_k)
+    alpha = 1.0
+    for _ in range(MAX_REDUCTIONS):
+        x_t = x_k + alpha*p_n
+        f_t = f(x_t)
+        if np.dot(f_t, f_t) <= (1 - 2*ARMIJO*alpha)*phi_k: break
+        alpha /= 2
+    return(x_t, f_t)
+
+
+
+#%%###############################
+# Région de confiance « dogleg » #
+##################################
+
+# Renvoie le pas dogleg de norme au plus radius, à partir du pas de Newton p_n, du gradient g = Jac(f)^T*f de phi/2 et de jg = Jac(f)*g
+def dogleg_step(p_n, g, jg, radius):
+    if np.linalg.norm(p_n) <= radius: return(p_n)
+    gg   = np.dot(g, g)
+    jgjg = np.dot(jg, jg)
+    if gg == 0 or jgjg == 0: return(radius*p_n/np.linalg.norm(p_n))
+    p_c = -(gg/jgjg)*g
+    if np.linalg.norm(p_c) >= radius: return(-radius*g/np.sqrt(gg))
+    dp = p_n - p_c
+    a, b, c = np.dot(dp, dp), 2*np.dot(p_c, dp), np.dot(p_c, p_c) - radius**2
+    tau = (-b + np.sqrt(b**2 - 4*a*c)) / (2*a)
+    return(p_c + tau*dp)
+
+# Renvoie le triplet (x_kp1, f(x_kp1), radius) obtenu par la méthode de région de confiance dogleg, où d_k est la jacobienne ayant servi
+# au calcul de p_n. Tant que le pas est rejeté, le rayon est réduit et un nouveau pas est essayé (une évaluation de f par essai) ;
+# si aucun essai n'est accepté après MAX_REDUCTIONS réductions, x_k est conservé (x_kp1 = x_k), phi ne pouvant donc jamais augmenter.
+# Si radius = None, le rayon initial est la norme du pas de Newton.
+def dogleg(f, x_k, f_k, p_n, d_k, radius):
+    phi_k = np.dot(f_k, f_k)
+    g  = linear_solvers.rmatvec(d_k, f_k)
+    jg = linear_solvers.matvec(d_k, g)
+    if radius is None: radius = np.linalg.norm(p_n)
+    for _ in range(MAX_REDUCTIONS):
+        p = dogleg_step(p_n, g, jg, radius)
+        x_t = x_k + p
+        f_t = f(x_t)
+        m_t  = f_k + linear_solvers.matvec(d_k, p)
+        pred = phi_k - np.dot(m_t, m_t)
+        rho  = (phi_k - np.dot(f_t, f_t)) / pred if pred > 0 else -1
+        norm_p = np.linalg.norm(p)
+        if   rho < TR_SHRINK:                            radius = TR_SHRINK*norm_p
+        elif rho > TR_EXPAND and norm_p >= 0.99*radius: radius = 2*radius
+        if rho > TR_ACCEPT: return(x_t, f_t, radius)
+    return(x_k, f_k, radius)
+
+
+
+#%%###################################################
+# Définition de la fonction appelée par les méthodes #
+######################################################
+
+# Renvoie le triplet (x_kp1, f(x_kp1), radius) obtenu à partir du pas de Newton p_n selon la stratégie globalization (voir GLOBALIZATIONS)
+def globalized_step(f, x_k, f_k, p_n, d_k, globalization, radius):
+    if globalization == "line_search":
+        x_kp1, f_kp1 = line_search(f, x_k, f_k, p_n)
+        return(x_kp1, f_kp1, radius)
+    if globalization == "trust_region":
+        return(dogleg(f, x_k, f_k, p_n, d_k, radius))
+    x_kp1 = x_k + p_n
+    return(x_kp1, f(x_kp1), radius)
@@ -8,29 +8,85 @@ Created on Wed Jul 01 12:00:00 2020
 
 
 
+#%%#########################################
+# Définition de l'écriture dans un fichier #
+############################################
+
+# Nombre de lignes écrites entre deux vidages du tampon vers le fichier, et taille (en octets) du tampon d'écriture
+FLUSH_EVERY = 1000
+BUFFER_SIZE = 2**16
+
+# Écrit les itérations d'une méthode dans le fichier output, en gardant un unique descripteur ouvert pour toute la résolution :
+# les lignes sont accumulées dans un tampon de taille buffer_size, vidé vers le fichier toutes les flush_every lignes (si flush_every > 0)
+# et lors de l'écriture du critère d'arrêt, qui ferme le fichier. Le fichier est rouvert (en ajout) si une ligne est écrite après fermeture.
+# L'objet peut aussi être utilisé comme gestionnaire de contexte, le fichier étant alors fermé en sortie du bloc with :
+#   with IterationWriter(format_iter, "Résultats.txt") as writer:
+#       writer.write_iter(k, x_k)
+class IterationWriter:
+    __slots__ = ("format_iter", "output", "flush_every", "buffer_size", "file", "nb_lines")
+
+    def __init__(self, format_iter, output, flush_every=FLUSH_EVERY, buffer_size=BUFFER_SIZE):
+        self.format_iter = format_iter
+        self.output      = output
+        self.flush_every = flush_every
+        self.buffer_size = buffer_size
+        self.file        = None
+        self.nb_lines    = 0
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *exc_infos):
+        self.close()
+
+    def write_line(self, line):
+        if self.file is None: self.file = open(self.output, "a+", buffering=self.buffer_size)
+        self.file.write(line+"\n")
+        self.nb_lines += 1
+        if self.flush_every > 0 and self.nb_lines % self.flush_every == 0: self.file.flush()
+
+    def write_iter(self, *args):
+        self.write_line(self.format_iter(*args))
+
+    def write_stopping(self, reason):
+        self.write_line(reason)
+        self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+
 #%%###################################################
 # Définition de la fonction appelée par les méthodes #
 ######################################################
 
-# Définit la fonction write_iter, qui écrira dans le stdout ou un fichier selon le contenu de output
-def define_writing_function(format_iter, output):
+# Définit la fonction write_iter, qui écrira dans le stdout ou un fichier selon le contenu de output, ainsi que la fonction close qui ferme
+# le fichier éventuellement ouvert. Les méthodes appellent close dans un bloc finally (dans le générateur pour les versions génératrices),
+# de sorte que le fichier est fermé en fin de résolution même sans écriture du critère d'arrêt, si une exception interrompt la résolution,
+# ou si un générateur est abandonné avant la fin.
+def define_writing_function(format_iter, output, flush_every=FLUSH_EVERY, buffer_size=BUFFER_SIZE):
     if output.lower() == "pipe":
         def write_iter(*args):
             print(format_iter(*args))
         def write_stopping(reason):
             print(reason+"\n")
+        def close():
+            pass
     elif output.lower() in ["none", ""]:
         def write_iter(*args):
             pass
         def write_stopping(reason):
             pass
+        def close():
+            pass
     else:
-        def write_iter(*args):
-            with open(output, "a+") as file:
-                file.write(format_iter(*args)+"\n")
-        def write_stopping(reason):
-            with open(output, "a+") as file:
-                file.write(reason+"\n")
-    return(write_iter, write_stopping)
+        writer = IterationWriter(format_iter, output, flush_every, buffer_size)
+        write_iter     = writer.write_iter
+        write_stopping = writer.write_stopping
+        close          = writer.close
+    return(write_iter, write_stopping, close)
 
 
@@ -12,7 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
-from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, history, batch_lanes, jit_kernels
 import types
 import numpy as np
 
@@ -22,7 +22,8 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie les évaluations de f faites pour cette vérification (réutilisées par init_algo)
 def check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output):
     # Vérification des types des paramètres reçus
     params_array = [[f,       "f",       types.FunctionType],
@@ -34,16 +35,54 @@ def check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output):
                     [output,  "output",  str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
-    try:    f(x0)
+    try:    f_0 = f(x0)
     except: raise ValueError("Fonction f non définie en x0")
-    try:    f(x1)
+    try:    f_1 = f(x1)
     except: raise ValueError("Fonction f non définie en x1")
-    if not(check_type_arguments.check_generic(f(x0), float)[0]): raise ValueError("f(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f(x0))+")")
-    if not(check_type_arguments.check_generic(f(x1), float)[0]): raise ValueError("f(x1) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f(x1))+")")
-    if not(f(x0)*f(x1) < 0): raise ValueError("Condition initiale f(x0)*f(x1) < 0 non respectée")
+    if not(check_type_arguments.check_generic(f_0, float)[0]): raise ValueError("f(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f_0)+")")
+    if not(check_type_arguments.check_generic(f_1, float)[0]): raise ValueError("f(x1) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f_1)+")")
+    if not(f_0*f_1 < 0):     raise ValueError("Condition initiale f(x0)*f(x1) < 0 non respectée")
     if nb_iter < 0:          raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
     if tol_rel < 0:          raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
     if tol_abs < 0:          raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    return(f_0, f_1)
+
+# Met en forme les bornes reçues par la version par lots de la méthode : x0 et x1 sont convertis en vecteurs de flottants de même taille
+# (celle de params si params est fourni)
+def broadcast_batch(x0, x1, params):
+    shape_p = (1,) if params is None else (len(params),)
+    x0, x1, _ = np.broadcast_arrays(np.atleast_1d(np.asarray(x0, dtype=float)), np.atleast_1d(np.asarray(x1, dtype=float)), np.empty(shape_p))
+    return(x0, x1)
+
+# Vérifie le jeu de paramètres reçu par la version par lots de la méthode, et renvoie les bornes x0 et x1 sous forme de vecteurs de même taille
+def check_parameters_consistency_batch(f, x0, x1, params, nb_iter, tol_rel, tol_abs, output):
+    # Vérification des types des paramètres reçus
+    params_array = [[f,       "f",       types.FunctionType],
+                    [x0,      "x0",      [np.ndarray, float]],
+                    [x1,      "x1",      [np.ndarray, float]],
+                    [nb_iter, "nb_iter", int],
+                    [tol_rel, "tol_rel", float],
+                    [tol_abs, "tol_abs", float],
+                    [output,  "output",  str]]
+    if params is not None: params_array.append([params, "params", np.ndarray])
+    check_type_arguments.check_parameters(params_array)
+    # Vérification de la cohérence des paramètres
+    if np.ndim(x0) > 1 or np.ndim(x1) > 1: raise ValueError("x0 et x1 doivent être des vecteurs de bornes (dimensions reçues : "+str(np.shape(x0))+" et "+str(np.shape(x1))+")")
+    if params is not None and np.ndim(params) == 0: raise ValueError("params doit contenir une valeur par équation (taille reçue : "+str(np.shape(params))+")")
+    try:    x0, x1 = broadcast_batch(x0, x1, params)
+    except: raise ValueError("Les dimensions de x0 (= "+str(np.shape(x0))+"), de x1 (= "+str(np.shape(x1))+") et de params (= "+str(np.shape(params))+") ne concordent pas")
+    try:    f_0 = f(x0) if params is None else f(x0, params)
+    except: raise ValueError("Fonction f non définie en x0")
+    try:    f_1 = f(x1) if params is None else f(x1, params)
+    except: raise ValueError("Fonction f non définie en x1")
+    if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]) or np.shape(f_0) != np.shape(x0): raise ValueError("f(x0) n'est pas un vecteur de même taille que x0 (taille reçue : "+str(np.shape(f_0))+", attendue : "+str(np.shape(x0))+")")
+    if not(check_type_arguments.check_generic(f_1, np.ndarray)[0]) or np.shape(f_1) != np.shape(x1): raise ValueError("f(x1) n'est pas un vecteur de même taille que x1 (taille reçue : "+str(np.shape(f_1))+", attendue : "+str(np.shape(x1))+")")
+    nb_wrong = np.count_nonzero(~(f_0*f_1 < 0))
+    if nb_wrong > 0:         raise ValueError("Condition initiale f(x0)*f(x1) < 0 non respectée pour "+str(nb_wrong)+" équation(s) (première : indice "+str(np.argmax(~(f_0*f_1 < 0)))+")")
+    if nb_iter < 0:          raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
+    if tol_rel < 0:          raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
+    if tol_abs < 0:          raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    return(x0, x1, f_0, f_1)
 
 
 
@@ -65,6 +104,20 @@ def format_iter(k, x_g, x_d, f_g, f_d, x_c, f_c):
     iter_infos = iter_infos.format(k, x_g, x_d, f_g, f_d, x_c, f_c)
     return(header+iter_infos)
 
+# Crée la chaîne de caractères qui sera renvoyée pour chaque itération de la version par lots
+def format_iter_batch(k, nb_active, f_c):
+    if k == 0:
+        header  = "{:>4} || {:^9} | {:^11}"
+        header  = header.format("k", "actives", "max|f_c|")
+        header += "\n"
+        header += "-"*(4+9+11 + 4+3)
+        header += "\n"
+    else:
+        header  = ""
+    iter_infos = "{:>4} || {:>9} | {:>+11.4e}"
+    iter_infos = iter_infos.format(k, nb_active, np.max(np.abs(f_c)) if nb_active > 0 else 0.0)
+    return(header+iter_infos)
+
 
 
 #%%########################################
@@ -80,20 +133,36 @@ def stopping_criteria(k, list_x, list_f, nb_iter, tol_abs, tol_rel):
         if err_rel_x < tol_rel:   return(True, "Convergence achevée à {:7.1e} près : x = {:+14.7e} et erreur relative sur x = {:10.4e}".format(tol_rel, list_x[-1], err_rel_x))
     return(False, "convergence inachevée")
 
+# Raisons d'arrêt renvoyées par la version par lots, indexées par les codes STOP_NB_ITER, STOP_TOL_ABS et STOP_TOL_REL
+STOP_NB_ITER, STOP_TOL_ABS, STOP_TOL_REL = 0, 1, 2
+STOP_REASONS = ("Nombre maximal d'itérations autorisé dépassé", "Racine localisée à tol_abs près", "Convergence achevée à tol_rel près")
+
+# Teste les critères d'arrêt de bissection sur chacune des équations actives, et renvoie le code de la raison d'arrêt de chacune (-1 si non arrêtée)
+def stopping_criteria_batch(k, x_c, x_p, f_c, nb_iter, tol_abs, tol_rel):
+    reason = np.full(len(x_c), -1, dtype=np.int8)
+    if k >= nb_iter:
+        reason[:] = STOP_NB_ITER
+        return(reason)
+    reason[np.abs(f_c) < tol_abs] = STOP_TOL_ABS
+    if k >= 1:
+        err_rel_x = check_relative_tolerance.tol_rel_approx_batch(x_c, x_p)
+        reason[(reason == -1) & (err_rel_x < tol_rel)] = STOP_TOL_REL
+    return(reason)
+
 
 
 #%%#######################################
 # Fonctions d'itérations de l'algorithme #
 ##########################################
 
-# Phase d'initialisation de toutes les suites exploitées par la méthode
-def init_algo(f, x0, x1):
+# Phase d'initialisation de toutes les suites exploitées par la méthode (probe contient f(x0) et f(x1) si elles sont déjà connues)
+def init_algo(f, x0, x1, probe):
     k = 0
     x_g = min(x0, x1)
     x_d = max(x0, x1)
     x_c = (x_g+x_d)/2
-    f_g = f(x_g)
-    f_d = f(x_d)
+    if probe is None: f_g, f_d = f(x_g), f(x_d)
+    else:             f_g, f_d = probe if x0 <= x1 else probe[::-1]
     f_c = f(x_c)
     list_x = [x_c]
     list_f = [f_c]
@@ -116,13 +185,80 @@ def iter_algo(f, k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f):
     list_f.append(f_c)
     return(k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f)
 
+# Phase d'initialisation de la version par lots : les bornes et points centraux de toutes les équations sont stockés dans des vecteurs,
+# et lanes contient les indices des équations encore actives (voir Module_coeur/batch_lanes) ; f_0 = f(x0) et f_1 = f(x1) sont
+# les évaluations déjà calculées lors de la vérification des paramètres (None si validate = False)
+def init_algo_batch(f, x0, x1, f_0, f_1):
+    k = 0
+    x_g = np.minimum(x0, x1)
+    x_d = np.maximum(x0, x1)
+    x_c = (x_g+x_d)/2
+    f_g = f(x_g, None) if f_0 is None else np.where(x0 <= x1, f_0, f_1)
+    f_d = f(x_d, None) if f_1 is None else np.where(x0 <= x1, f_1, f_0)
+    f_c = f(x_c, None)
+    x_p = x_c.copy()
+    lanes = np.arange(len(x_c))
+    return(k, x_g, x_d, x_c, f_g, f_d, f_c, x_p, lanes)
+
+# Exécute une itération de la version par lots sur les équations actives, avec un seul appel vectorisé de f
+def iter_algo_batch(f, k, x_g, x_d, x_c, f_g, f_d, f_c, lanes):
+    k += 1
+    x_p = x_c
+    left  = f_g*f_c < 0
+    right = ~left & (f_c*f_d < 0)
+    x_d = np.where(left,  x_c, x_d)
+    f_d = np.where(left,  f_c, f_d)
+    x_g = np.where(right, x_c, x_g)
+    f_g = np.where(right, f_c, f_g)
+    x_c = (x_g+x_d)/2
+    f_c = f(x_c, lanes)
+    return(k, x_g, x_d, x_c, f_g, f_d, f_c, x_p)
+
+
+
+#%%################################################
+# Noyau compilé de l'algorithme (numba optionnel) #
+###################################################
+
+# Version compilée de stopping_criteria, sans construction du message d'arrêt (list_x et list_f sont remplis jusqu'à l'indice k)
+@jit_kernels.njit
+def stopping_criteria_jit(k, list_x, list_f, nb_iter, tol_abs, tol_rel):
+    if k >= nb_iter:             return(True)
+    if abs(list_f[k]) < tol_abs: return(True)
+    if k >= 1 and abs(list_x[k]-list_x[k-1]) / (abs(list_x[k])+jit_kernels.EPS) < tol_rel: return(True)
+    return(False)
+
+# Déroule toute la méthode à partir de l'état renvoyé par init_algo, en une seule boucle compilée (f doit être compilée par numba) :
+# les itérés sont stockés dans des tableaux préalloués, et les itérations sont identiques à celles de iter_algo
+@jit_kernels.njit
+def solve_jit(f, k, x_g, x_d, x_c, f_g, f_d, f_c, nb_iter, tol_rel, tol_abs):
+    list_x = np.empty(max(nb_iter, k)+1)
+    list_f = np.empty(max(nb_iter, k)+1)
+    list_x[k] = x_c
+    list_f[k] = f_c
+    while not(stopping_criteria_jit(k, list_x, list_f, nb_iter, tol_abs, tol_rel)):
+        k += 1
+        if f_g*f_c < 0:
+            x_d = x_c
+            x_c = (x_g+x_d)/2
+            f_d = f_c
+            f_c = f(x_c)
+        elif f_c*f_d < 0:
+            x_g = x_c
+            x_c = (x_g+x_d)/2
+            f_g = f_c
+            f_c = f(x_c)
+        list_x[k] = x_c
+        list_f[k] = f_c
+    return(k, list_x[:k+1], list_f[:k+1])
+
 
 
 #%%#####################################
 # Définition de la fonction principale #
 ########################################
 
-def bissection(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
+def bissection(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
     """Méthode de recherche d'une racine de la fonction f via la méthode de la bissection :
         - x_g et x_d donnés, vérifiant f(x_g)*f(x_d) < 0, et x_c = (x_g+x_d)/2 et f(x_c),
         - si f(x_c) = 0, on a trouvé la racine,
@@ -138,12 +274,18 @@ def bissection(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""
         - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à l'algorithme,
         - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel,
         - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
         - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
             - la sortie standard si output = "pipe",
             - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
             - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
 
-    La méthode vérifie les conditions suivantes :
+    Si numba est installé, que f est compilée par numba.njit et que output = "" (aucune itération écrite), toute la boucle de la méthode
+    (itérations et critères d'arrêt) est exécutée par un noyau compilé, aux itérés identiques ; sinon, la version Python est utilisée.
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
         - les bornes initiales doivent satisfaire f(x0)*f(x1) < 0 pour garantir l'existence d'une racine dans [x0,x1],
         - f est définie en x0 et x1, et renvoie en chacun de ces points un scalaire,
         - nb_iter, tol_rel et tol_abs sont positifs,
@@ -160,18 +302,139 @@ def bissection(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""
     """
 
     # Test des paramètres et définition de la destination de sortie des itérations
-    check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output)
-    write_iter, write_stopping = writing_function.define_writing_function(format_iter, output)
+    probe = check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        # Initialisation de l'algorithme
+        k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f = init_algo(f, x0, x1, probe)
+        write_iter(k, x_g, x_d, f_g, f_d, x_c, f_c)
 
-    # Initialisation de l'algorithme
-    k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f = init_algo(f, x0, x1)
-    write_iter(k, x_g, x_d, f_g, f_d, x_c, f_c)
+        # Déroulement de l'algorithme, par le noyau compilé si f est compilée par numba et qu'aucune itération n'est à écrire
+        if jit_kernels.can_compile(output, f):
+            k, list_x, list_f = solve_jit(f, k, float(x_g), float(x_d), float(x_c), float(f_g), float(f_d), float(f_c), nb_iter, tol_rel, tol_abs)
+            list_x, list_f = list_x.tolist(), list_f.tolist()
+        else:
+            while not(stopping_criteria(k, list_x, list_f, nb_iter, tol_abs, tol_rel)[0]):
+                k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f = iter_algo(f, k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f)
+                write_iter(k, x_g, x_d, f_g, f_d, x_c, f_c)
 
-    # Déroulement de l'algorithme
-    while not(stopping_criteria(k, list_x, list_f, nb_iter, tol_abs, tol_rel)[0]):
-        k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f = iter_algo(f, k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f)
-        write_iter(k, x_g, x_d, f_g, f_d, x_c, f_c)
+        write_stopping(stopping_criteria(k, list_x, list_f, nb_iter, tol_abs, tol_rel)[1])
+        # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
+        return(list_x, list_f)
+    finally:
+        close()
+
+
+def bissection_iter(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
+    """Version génératrice de bissection : les approximations de la racine sont produites une à une au fil des itérations, au lieu d'être
+    toutes stockées puis renvoyées en fin d'algorithme. Seuls les derniers termes des suites sont conservés, la mémoire utilisée est donc
+    constante, et l'appelant peut interrompre l'algorithme à tout moment (en sortant de la boucle qui parcourt le générateur).
+
+    Les arguments, les arguments optionnels et les conditions vérifiées sont ceux de bissection (vérifiées dès l'appel de bissection_iter).
 
-    write_stopping(stopping_criteria(k, list_x, list_f, nb_iter, tol_abs, tol_rel)[1])
-    # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
-    return(list_x, list_f)
+    La sortie de la méthode est un générateur produisant, pour k = 0, 1, ..., le couple (x_k, f(x_k)), où x_k est le point central de
+    l'intervalle de recherche à l'itération k. Le générateur s'arrête lorsqu'un critère d'arrêt de bissection est atteint.
+
+    Exemples d'appel :
+        - for x_k, f_k in bissection_iter(lambda x : np.sin(x), -0.5, 1/3): print(x_k),
+        - list_x, list_f = zip(*bissection_iter(lambda x : np.sin(x), -0.5, 1/3)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    probe = check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que les deux derniers termes des suites
+            k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f = init_algo(f, x0, x1, probe)
+            list_x, list_f = history.BoundedList(list_x), history.BoundedList(list_f)
+            write_iter(k, x_g, x_d, f_g, f_d, x_c, f_c)
+            yield(x_c, f_c)
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, list_x, list_f, nb_iter, tol_abs, tol_rel)[0]):
+                k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f = iter_algo(f, k, x_g, x_d, x_c, f_g, f_d, f_c, list_x, list_f)
+                write_iter(k, x_g, x_d, f_g, f_d, x_c, f_c)
+                yield(x_c, f_c)
+
+            write_stopping(stopping_criteria(k, list_x, list_f, nb_iter, tol_abs, tol_rel)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des approximations de la racine et des valeurs de f associées
+    return(iterates())
+
+
+def bissection_batch(f, x0, x1, params=None, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
+    """Version par lots de bissection : recherche simultanément une racine de chacune des équations scalaires f(x) = 0 (ou f(x,params_i) = 0)
+    par la méthode de la bissection, à partir d'un vecteur de bornes inférieures et d'un vecteur de bornes supérieures.
+
+    À chaque itération, f est appelée une seule fois, de manière vectorisée, sur l'ensemble des équations encore actives ; les équations
+    ayant atteint un critère d'arrêt sont retirées des vecteurs de calcul.
+
+    Les arguments attendus sont :
+        - une fonction f vectorisée, admettant en entrée un vecteur x et renvoyant le vecteur f(x) de même taille
+          (ou f(x,params) si params est fourni, params étant alors restreint aux équations actives),
+        - deux vecteurs x0 et x1 de même taille (l'un d'eux peut être un réel, commun à toutes les équations), les bornes des intervalles de recherche.
+
+    Les arguments optionnels sont :
+        - un np.ndarray params (défaut = None), contenant un paramètre (ou une ligne de paramètres) par équation, transmis à f en second argument,
+        - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à l'algorithme,
+        - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel, pour chaque équation,
+        - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs, pour chaque équation,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
+        - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
+            - la sortie standard si output = "pipe",
+            - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
+            - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
+        - les bornes initiales satisfont f(x0)*f(x1) < 0 pour chaque équation,
+        - f est définie en x0 et x1, et renvoie en chacun de ces vecteurs un vecteur de même taille,
+        - params contient une valeur par équation,
+        - nb_iter, tol_rel et tol_abs sont positifs,
+        - tous les paramètres reçus ont bien le type attendu.
+
+    Les sorties de la méthode sont :
+        - roots, le vecteur des approximations des racines (point central du dernier intervalle de recherche de chaque équation),
+        - nb_iters, le vecteur des nombres d'itérations effectuées pour chaque équation,
+        - reasons, le vecteur des codes de raison d'arrêt de chaque équation, dont le message est STOP_REASONS[code] :
+            - STOP_NB_ITER (= 0) si le nombre maximal d'itérations est atteint,
+            - STOP_TOL_ABS (= 1) si abs(f(x_k)) <= tol_abs,
+            - STOP_TOL_REL (= 2) si abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel.
+
+    Exemples d'appel :
+        - bissection_batch(lambda x : np.sin(x), -0.5*np.ones(1000), np.linspace(0.1,1,1000)),
+        - bissection_batch(lambda x,a : x**2-a, 0, 10, params=np.linspace(1,2,10**6)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    if validate: x0, x1, f_0, f_1 = check_parameters_consistency_batch(f, x0, x1, params, nb_iter, tol_rel, tol_abs, output)
+    else:        x0, x1, f_0, f_1 = *broadcast_batch(x0, x1, params), None, None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter_batch, output)
+    try:
+        g = (lambda x, lanes: f(x)) if params is None else (lambda x, lanes: f(x, params if lanes is None else params[lanes]))
+
+        # Initialisation de l'algorithme
+        k, x_g, x_d, x_c, f_g, f_d, f_c, x_p, lanes = init_algo_batch(g, x0, x1, f_0, f_1)
+        roots    = np.empty(len(x0))
+        nb_iters = np.zeros(len(x0), dtype=int)
+        reasons  = np.empty(len(x0), dtype=np.int8)
+        write_iter(k, len(lanes), f_c)
+
+        # Déroulement de l'algorithme, jusqu'à l'arrêt de toutes les équations
+        while True:
+            reason = stopping_criteria_batch(k, x_c, x_p, f_c, nb_iter, tol_abs, tol_rel)
+            (x_g, x_d, x_c, f_g, f_d, f_c), lanes = batch_lanes.remove_stopped_lanes(k, reason, x_c, (x_g, x_d, x_c, f_g, f_d, f_c), lanes, roots, nb_iters, reasons)
+            if len(lanes) == 0: break
+            k, x_g, x_d, x_c, f_g, f_d, f_c, x_p = iter_algo_batch(g, k, x_g, x_d, x_c, f_g, f_d, f_c, lanes)
+            write_iter(k, len(lanes), f_c)
+
+        write_stopping(batch_lanes.format_stopping_batch(reasons, STOP_REASONS))
+        # Renvoi des racines, des nombres d'itérations et des raisons d'arrêt de chaque équation
+        return(roots, nb_iters, reasons)
+    finally:
+        close()
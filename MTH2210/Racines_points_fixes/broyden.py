@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Jul 01 12:00:00 2020
+
+@author: Pierre-Yves Bouchet
+"""
+
+
+
+#%%##################################
+# Import des bibliothèques requises #
+#####################################
+
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, history, finite_differences, linear_solvers
+import types
+import numpy as np
+import scipy.linalg
+
+
+
+#%%########################################
+# Fonction de vérification des paramètres #
+###########################################
+
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie f(x0), évaluée pour cette vérification (réutilisées par init_algo)
+def check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, variant, memory, jac_scheme, vectorized, pool, output):
+    # Vérification des types des paramètres reçus
+    params_array = [[f,          "f",          types.FunctionType],
+                    [x0,         "x0",         np.ndarray],
+                    [nb_iter,    "nb_iter",    int],
+                    [tol_rel,    "tol_rel",    float],
+                    [tol_abs,    "tol_abs",    float],
+                    [variant,    "variant",    str],
+                    [jac_scheme, "jac_scheme", str],
+                    [vectorized, "vectorized", bool],
+                    [output,     "output",     str]]
+    if memory is not None: params_array.append([memory, "memory", int])
+    check_type_arguments.check_parameters(params_array)
+    # Vérification de la cohérence des paramètres
+    try:    f_0 = f(x0)
+    except: raise ValueError("Fonction f non définie en x0")
+    if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]): raise ValueError("f(x0) n'est pas un vecteur (type reçu :"+check_type_arguments.get_type(f_0)+")")
+    if not(np.size(f_0) == np.size(x0)): raise ValueError("f(x0) n'a pas la même dimension que x0 (dimension reçue : "+str(np.size(f_0))+" et attendue : "+str(np.size(x0))+")")
+    if variant not in ["good", "bad"]: raise ValueError("Variante variant inconnue (reçue : \""+variant+"\", attendue : \"good\" ou \"bad\")")
+    if memory is not None and memory < 1: raise ValueError("Nombre de mises à jour mémorisées memory défini à une valeur inférieure à 1")
+    if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
+    if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
+    if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    if jac_scheme not in finite_differences.FD_SCHEMES: raise ValueError("Schéma de différences finies jac_scheme inconnu (reçu : \""+jac_scheme+"\", attendu : "+", ".join(["\""+sc+"\"" for sc in finite_differences.FD_SCHEMES])+")")
+    if not(finite_differences.is_pool(pool)): raise ValueError("Paramètre pool invalide (attendu : None, un entier supérieur ou égal à 1 ou un concurrent.futures.Executor, reçu : "+check_type_arguments.get_type(pool)+")")
+    if vectorized and not(finite_differences.is_vectorized(f, x0, f_0)): raise ValueError("Fonction f non vectorisée : f appelée sur une matrice de points (un point par colonne) doit renvoyer la matrice des valeurs (une valeur par colonne)")
+    return(f_0)
+
+
+
+#%%########################################
+# Fonctions de mise en page des résultats #
+###########################################
+
+# Crée la chaîne de caractères qui sera renvoyée pour chaque itération
+def format_iter(k, list_x, list_f):
+    x_k = list_x[-1]
+    f_k = list_f[-1]
+    if k == 0:
+        n = len(x_k)
+        len_str_xk = 2+11*n+2*(n-1)
+        header  = "{:>4} || " + "{:^"+str(len_str_xk)+"}" + " | " + "{:^"+str(len_str_xk)+"}"
+        header  = header.format("k", "x_k", "f(x_k)")
+        header += "\n"
+        header += "-"*(4+len_str_xk+len_str_xk + 4+3)
+        header += "\n"
+    else:
+        header  = ""
+    iter_infos  = "{:>4} || ".format(k)
+    iter_infos += "["+", ".join(["{:>+11.4e}".format(xi) for xi in x_k])+"] | "
+    iter_infos += "["+", ".join(["{:>+11.4e}".format(xi) for xi in f_k])+"]"
+    return(header+iter_infos)
+
+
+
+#%%#####################################
+# Fonctions de test du critère d'arrêt #
+########################################
+
+# Définit l'ensemble des critères d'arrêt possible, et les teste à chaque itération
+# (la singularité de la jacobienne initiale est estimée à partir de sa factorisation LU lu_0)
+def stopping_criteria(k, list_x, list_f, lu_0, nb_iter, tol_rel, tol_abs):
+    if k >= nb_iter:                                           return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé".format(nb_iter))
+    if np.max(np.abs(list_f[-1])) < tol_abs:                   return(True, "Racine localisée à {:7.1e} près : x = ".format(tol_abs)+ "["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]" +" et f(x) = "+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_f[-1]])+"]")
+    if k == 0 and linear_solvers.is_singular_factorized(lu_0): return(True, "Jacobienne initiale singulière (rcond = {:7.1e}) au point x_0 = ".format(lu_0[2])+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]")
+    if k > 1:
+        err_rel = check_relative_tolerance.tol_rel_approx(list_x[-1], list_x[-2])
+        if err_rel < tol_rel:                                  return(True, "Convergence de la méthode achevée à {:7.1e} près : erreur relative sur x = {:10.4e}".format(tol_rel, err_rel))
+    return(False, "convergence inachevée")
+
+
+
+#%%################################################################
+# Fonctions d'application de l'inverse de la jacobienne approchée #
+###################################################################
+
+# L'inverse de la jacobienne approchée est stocké sous la forme H_k = J_0^-1 + somme(i)(u_i*v_i^T), où J_0 = app_jac(f,x_0) n'est
+# factorisée qu'une fois (lu_0), et où chaque mise à jour de rang un de Broyden ajoute un couple (u_i,v_i) : appliquer H_k coûte
+# O(n^2 + m*n) pour m couples mémorisés, sans jamais former ni refactoriser de matrice n*n.
+
+# Calcule H_k*b
+def apply_inverse(lu_0, list_u, list_v, b):
+    hb = scipy.linalg.lu_solve(lu_0[1], b, check_finite=False)
+    for u, v in zip(list_u, list_v): hb += u*np.dot(v, b)
+    return(hb)
+
+# Calcule H_k^T*b
+def apply_inverse_transpose(lu_0, list_u, list_v, b):
+    hb = scipy.linalg.lu_solve(lu_0[1], b, trans=1, check_finite=False)
+    for u, v in zip(list_u, list_v): hb += v*np.dot(u, b)
+    return(hb)
+
+
+
+#%%#######################################
+# Fonctions d'itérations de l'algorithme #
+##########################################
+
+# Phase d'initialisation de toutes les suites exploitées par la méthode : la jacobienne n'est approchée par différences finies qu'en x_0.
+# Si memory est fourni, seuls les memory derniers couples (u_i,v_i) sont conservés (Broyden à mémoire limitée).
+# probe contient f(x0) si elle est déjà connue.
+def init_algo(f, x0, memory, jac_scheme, vectorized, pool, probe):
+    k = 0
+    x_k = x0
+    f_k = f(x_k) if probe is None else probe
+    lu_0 = linear_solvers.factorize(finite_differences.app_jac(f, x_k, f_k, jac_scheme, vectorized, pool))
+    list_u = [] if memory is None else history.BoundedList(maxlen=memory)
+    list_v = [] if memory is None else history.BoundedList(maxlen=memory)
+    list_x = [x_k]
+    list_f = [f_k]
+    return(k, list_x, list_f, lu_0, list_u, list_v)
+
+# Exécute une itération de la méthode, avec une seule évaluation de f, puis met à jour H_k par une formule de rang un (Sherman-Morrison) :
+#   - s = x_kp1-x_k, y = f(x_kp1)-f(x_k),
+#   - "good" : J_kp1 = J_k + (y-J_k*s)*s^T/(s^T*s),  soit H_kp1 = H_k + (s-H_k*y)*(s^T*H_k)/(s^T*H_k*y),
+#   - "bad"  : H_kp1 = H_k + (s-H_k*y)*y^T/(y^T*y).
+# La mise à jour est ignorée si son dénominateur est nul.
+def iter_algo(f, k, list_x, list_f, lu_0, list_u, list_v, variant):
+    x_k = list_x[-1]
+    f_k = list_f[-1]
+    k += 1
+    s = -apply_inverse(lu_0, list_u, list_v, f_k)
+    x_kp1 = x_k + s
+    f_kp1 = f(x_kp1)
+    y = f_kp1 - f_k
+    hy = apply_inverse(lu_0, list_u, list_v, y)
+    if variant == "good":
+        v = apply_inverse_transpose(lu_0, list_u, list_v, s)
+        den = np.dot(s, hy)
+    else:
+        v = y
+        den = np.dot(y, y)
+    if den != 0:
+        list_u.append((s-hy)/den)
+        list_v.append(v)
+    list_x.append(x_kp1)
+    list_f.append(f_kp1)
+    return(k, list_x, list_f, list_u, list_v)
+
+
+
+#%%#####################################
+# Définition de la fonction principale #
+########################################
+
+def broyden(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, variant="good", memory=None, jac_scheme="richardson", vectorized=False, pool=None, validate=True, output=""):
+    """Méthode de recherche d'une racine de la fonction vectorielle f via la méthode de quasi-Newton de Broyden :
+        - x_0 donné, J_0 = Jac(f)(x_0) approchée par différences finies (seule approximation de la jacobienne de la méthode),
+        - x_kp1 = x_k - J_k^-1*f(x_k),
+        - J_kp1 obtenue par une mise à jour de rang un de J_k, à partir de s = x_kp1-x_k et y = f(x_kp1)-f(x_k), de sorte que J_kp1*s = y.
+    Chaque itération ne demande donc qu'une seule évaluation de f, au lieu des 4*dim(x0) évaluations de l'approximation de la jacobienne de newton_nd.
+
+    Les arguments attendus sont :
+        - une fonction f, admettant en entrée un vecteur x et renvoyant un vecteur f(x),
+        - un vecteur  x0, point de départ de la méthode itérative.
+
+    Les arguments optionnels sont :
+        - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
+        - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel,
+        - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs,
+        - une chaîne de caractères variant (défaut = "good") choisissant la mise à jour de rang un :
+            - "good" : J_kp1 = J_k + (y-J_k*s)*s^T/(s^T*s) (« bonne » méthode de Broyden),
+            - "bad"  : J_kp1^-1 = J_k^-1 + (s-J_k^-1*y)*y^T/(y^T*y) (« mauvaise » méthode de Broyden),
+        - un entier memory (défaut = None) : si fourni, seules les memory dernières mises à jour de rang un sont conservées (mémoire O(memory*n)),
+          sinon toutes les mises à jour sont conservées,
+        - une chaîne de caractères jac_scheme (défaut = "richardson"), un booléen vectorized (défaut = False) et un paramètre pool (défaut = None)
+          définissant le calcul par différences finies de J_0, comme pour newton_nd,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
+        - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
+            - la sortie standard si output = "pipe",
+            - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
+            - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
+         - f est définie en x0, et renvoie un vecteur de même dimension que x0,
+         - variant vaut "good" ou "bad", et memory est supérieur ou égal à 1,
+         - jac_scheme est un schéma connu, pool est valide, et f est bien vectorisée si vectorized = True,
+         - tous les paramètres reçus ont bien le type attendu.
+
+    Les sorties de la méthode sont :
+        - list_x, la liste des points x_k,
+        - list_f, les valeurs par f des éléments de list_x.
+
+    Exemples d'appel :
+        - broyden(lambda x:x**2-1, np.array([2,2,2])),
+        - def f(x):
+              return(np.array([x[0]**2-2, x[1]**3-x[0]]))
+          x0 = np.array([1,1])
+          broyden(f, x0, variant="bad", memory=10).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    probe = check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, variant, memory, jac_scheme, vectorized, pool, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        # Initialisation de l'algorithme
+        k, list_x, list_f, lu_0, list_u, list_v = init_algo(f, x0, memory, jac_scheme, vectorized, pool, probe)
+        write_iter(k, list_x, list_f)
+
+        # Déroulement de l'algorithme
+        while not(stopping_criteria(k, list_x, list_f, lu_0, nb_iter, tol_rel, tol_abs)[0]):
+            k, list_x, list_f, list_u, list_v = iter_algo(f, k, list_x, list_f, lu_0, list_u, list_v, variant)
+            write_iter(k, list_x, list_f)
+
+        write_stopping(stopping_criteria(k, list_x, list_f, lu_0, nb_iter, tol_rel, tol_abs)[1])
+        # Renvoi de la liste des approximations de la racine et des valeurs de f associées
+        return(list_x, list_f)
+    finally:
+        close()
+
+
+def broyden_iter(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, variant="good", memory=None, jac_scheme="richardson", vectorized=False, pool=None, validate=True, output=""):
+    """Version génératrice de broyden : les itérés sont produits un à un au fil des itérations, au lieu d'être tous stockés puis renvoyés
+    en fin d'algorithme. Seuls les derniers termes des suites sont conservés ; la mémoire utilisée est donc constante si memory est fourni.
+
+    Les arguments, les arguments optionnels et les conditions vérifiées sont ceux de broyden (vérifiées dès l'appel de broyden_iter).
+
+    La sortie de la méthode est un générateur produisant, pour k = 0, 1, ..., le couple (x_k, f(x_k)).
+    Le générateur s'arrête lorsqu'un critère d'arrêt de broyden est atteint.
+
+    Exemples d'appel :
+        - for x_k, f_k in broyden_iter(lambda x:x**2-1, np.array([2,2,2])): print(np.linalg.norm(f_k)),
+        - x_k = collections.deque(broyden_iter(f, x0, memory=10), maxlen=1)[0][0] pour ne garder que le dernier itéré.
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    probe = check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, variant, memory, jac_scheme, vectorized, pool, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que les deux derniers termes des suites
+            k, list_x, list_f, lu_0, list_u, list_v = init_algo(f, x0, memory, jac_scheme, vectorized, pool, probe)
+            list_x, list_f = history.BoundedList(list_x), history.BoundedList(list_f)
+            write_iter(k, list_x, list_f)
+            yield(list_x[-1], list_f[-1])
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, list_x, list_f, lu_0, nb_iter, tol_rel, tol_abs)[0]):
+                k, list_x, list_f, list_u, list_v = iter_algo(f, k, list_x, list_f, lu_0, list_u, list_v, variant)
+                write_iter(k, list_x, list_f)
+                yield(list_x[-1], list_f[-1])
+
+            write_stopping(stopping_criteria(k, list_x, list_f, lu_0, nb_iter, tol_rel, tol_abs)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des itérés
+    return(iterates())
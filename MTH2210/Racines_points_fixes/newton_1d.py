@@ -12,7 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
-from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, history, batch_lanes, jit_kernels
 import types
 import numpy as np
 
@@ -22,7 +22,8 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie les évaluations de f et df faites pour cette vérification (réutilisées par init_algo)
 def check_parameters_consistency(f, df, x0, nb_iter, tol_rel, tol_abs, output):
     # Vérification des types des paramètres reçus
     params_array = [[f,       "f",       types.FunctionType],
@@ -34,15 +35,51 @@ def check_parameters_consistency(f, df, x0, nb_iter, tol_rel, tol_abs, output):
                     [output,  "output",  str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
-    try:    f(x0)
+    try:    f_0 = f(x0)
     except: raise ValueError("Fonction f non définie en x0")
-    try:    df(x0)
+    try:    d_0 = df(x0)
     except: raise ValueError("Fonction df non définie en x0")
-    if not(check_type_arguments.check_generic(f(x0),  float)[0]):  raise ValueError("f(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f(x0))+")")
-    if not(check_type_arguments.check_generic(df(x0), float)[0]): raise ValueError("df(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(df(x0))+")")
+    if not(check_type_arguments.check_generic(f_0, float)[0]): raise ValueError("f(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f_0)+")")
+    if not(check_type_arguments.check_generic(d_0, float)[0]): raise ValueError("df(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(d_0)+")")
     if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
     if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
     if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    return(f_0, d_0)
+
+# Met en forme les points de départ reçus par la version par lots de la méthode : x0 est copié dans un vecteur de flottants (de la taille
+# de params si params est fourni)
+def broadcast_batch(x0, params):
+    shape_p = (1,) if params is None else (len(params),)
+    x0, _ = np.broadcast_arrays(np.atleast_1d(np.asarray(x0, dtype=float)), np.empty(shape_p))
+    return(x0.copy())
+
+# Vérifie le jeu de paramètres reçu par la version par lots de la méthode, et renvoie x0 sous forme de vecteur
+def check_parameters_consistency_batch(f, df, x0, params, nb_iter, tol_rel, tol_abs, output):
+    # Vérification des types des paramètres reçus
+    params_array = [[f,       "f",       types.FunctionType],
+                    [df,      "df",      types.FunctionType],
+                    [x0,      "x0",      [np.ndarray, float]],
+                    [nb_iter, "nb_iter", int],
+                    [tol_rel, "tol_rel", float],
+                    [tol_abs, "tol_abs", float],
+                    [output,  "output",  str]]
+    if params is not None: params_array.append([params, "params", np.ndarray])
+    check_type_arguments.check_parameters(params_array)
+    # Vérification de la cohérence des paramètres
+    if np.ndim(x0) > 1: raise ValueError("x0 doit être un vecteur de points de départ (dimension reçue : "+str(np.shape(x0))+")")
+    if params is not None and np.ndim(params) == 0: raise ValueError("params doit contenir une valeur par équation (taille reçue : "+str(np.shape(params))+")")
+    try:    x0 = broadcast_batch(x0, params)
+    except: raise ValueError("Les dimensions de x0 (= "+str(np.shape(x0))+") et de params (= "+str(np.shape(params))+") ne concordent pas")
+    try:    f_0 = f(x0) if params is None else f(x0, params)
+    except: raise ValueError("Fonction f non définie en x0")
+    try:    d_0 = df(x0) if params is None else df(x0, params)
+    except: raise ValueError("Fonction df non définie en x0")
+    if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]) or np.shape(f_0) != np.shape(x0): raise ValueError("f(x0) n'est pas un vecteur de même taille que x0 (taille reçue : "+str(np.shape(f_0))+", attendue : "+str(np.shape(x0))+")")
+    if not(check_type_arguments.check_generic(d_0, np.ndarray)[0]) or np.shape(d_0) != np.shape(x0): raise ValueError("df(x0) n'est pas un vecteur de même taille que x0 (taille reçue : "+str(np.shape(d_0))+", attendue : "+str(np.shape(x0))+")")
+    if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
+    if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
+    if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    return(x0, f_0, d_0)
 
 
 
@@ -64,6 +101,20 @@ def format_iter(k, list_x, list_f, list_d):
     iter_infos = iter_infos.format(k, list_x[-1], list_f[-1], list_d[-1])
     return(header+iter_infos)
 
+# Crée la chaîne de caractères qui sera renvoyée pour chaque itération de la version par lots
+def format_iter_batch(k, nb_active, f_k):
+    if k == 0:
+        header  = "{:>4} || {:^9} | {:^11}"
+        header  = header.format("k", "actives", "max|f_k|")
+        header += "\n"
+        header += "-"*(4+9+11 + 4+3)
+        header += "\n"
+    else:
+        header  = ""
+    iter_infos = "{:>4} || {:>9} | {:>+11.4e}"
+    iter_infos = iter_infos.format(k, nb_active, np.max(np.abs(f_k)) if nb_active > 0 else 0.0)
+    return(header+iter_infos)
+
 
 
 #%%#####################################
@@ -80,18 +131,35 @@ def stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
         if err_rel < tol_rel:     return(True, "Convergence de la méthode achevée à {:7.1e} près : df/dx(x_k) = {:+11.4e}".format(tol_rel, err_rel))
     return(False, "convergence inachevée")
 
+# Raisons d'arrêt renvoyées par la version par lots, indexées par les codes STOP_NB_ITER, STOP_TOL_ABS, STOP_DER_NULLE et STOP_TOL_REL
+STOP_NB_ITER, STOP_TOL_ABS, STOP_DER_NULLE, STOP_TOL_REL = 0, 1, 2, 3
+STOP_REASONS = ("Nombre maximal d'itérations autorisé dépassé", "Racine localisée à tol_abs près", "Dérivée exactement nulle au point courant", "Convergence achevée à tol_rel près")
+
+# Teste les critères d'arrêt de newton_1d sur chacune des équations actives, et renvoie le code de la raison d'arrêt de chacune (-1 si non arrêtée)
+def stopping_criteria_batch(k, x_k, x_p, f_k, d_k, nb_iter, tol_rel, tol_abs):
+    reason = np.full(len(x_k), -1, dtype=np.int8)
+    if k >= nb_iter:
+        reason[:] = STOP_NB_ITER
+        return(reason)
+    reason[np.abs(f_k) < tol_abs] = STOP_TOL_ABS
+    reason[(reason == -1) & (d_k == 0)] = STOP_DER_NULLE
+    if k > 1:
+        err_rel = check_relative_tolerance.tol_rel_approx_batch(x_k, x_p)
+        reason[(reason == -1) & (err_rel < tol_rel)] = STOP_TOL_REL
+    return(reason)
+
 
 
 #%%#######################################
 # Fonctions d'itérations de l'algorithme #
 ##########################################
 
-# Phase d'initialisation de toutes les suites exploitées par la méthode
-def init_algo(f, df, x0):
+# Phase d'initialisation de toutes les suites exploitées par la méthode (probe contient f(x0) et df(x0) si elles sont déjà connues)
+def init_algo(f, df, x0, probe):
     k = 0
     x_k = x0
-    f_k = f(x_k)
-    d_k = df(x_k)
+    if probe is None: f_k, d_k = f(x_k), df(x_k)
+    else:             f_k, d_k = probe
     list_x = [x_k]
     list_f = [f_k]
     list_d = [d_k]
@@ -109,13 +177,64 @@ def iter_algo(f, df, k, list_x, list_f, list_d):
     list_d.append(df(x_k))
     return(k, list_x, list_f, list_d)
 
+# Phase d'initialisation de la version par lots : les itérés de toutes les équations sont stockés dans des vecteurs,
+# et lanes contient les indices des équations encore actives (voir Module_coeur/batch_lanes) ; f_0 = f(x0) et d_0 = df(x0) sont
+# les évaluations déjà calculées lors de la vérification des paramètres (None si validate = False)
+def init_algo_batch(f, df, x0, f_0, d_0):
+    k = 0
+    x_k = x0
+    f_k = f(x_k, None) if f_0 is None else f_0
+    d_k = df(x_k, None) if d_0 is None else d_0
+    x_p = x_k.copy()
+    lanes = np.arange(len(x_k))
+    return(k, x_k, f_k, d_k, x_p, lanes)
+
+# Exécute une itération de la version par lots sur les équations actives, avec un seul appel vectorisé de f et de df
+def iter_algo_batch(f, df, k, x_k, f_k, d_k, lanes):
+    k += 1
+    x_p = x_k
+    x_k = x_k - f_k/d_k
+    f_k = f(x_k, lanes)
+    d_k = df(x_k, lanes)
+    return(k, x_k, f_k, d_k, x_p)
+
+
+
+#%%################################################
+# Noyau compilé de l'algorithme (numba optionnel) #
+###################################################
+
+# Version compilée de stopping_criteria, sans construction du message d'arrêt (list_x, list_f et list_d sont remplis jusqu'à l'indice k)
+@jit_kernels.njit
+def stopping_criteria_jit(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
+    if k >= nb_iter:             return(True)
+    if abs(list_f[k]) < tol_abs: return(True)
+    if list_d[k] == 0:           return(True)
+    if k > 1 and abs(list_x[k]-list_x[k-1]) / (abs(list_x[k])+jit_kernels.EPS) < tol_rel: return(True)
+    return(False)
+
+# Déroule toute la méthode à partir de l'état renvoyé par init_algo, en une seule boucle compilée (f et df doivent être compilées par numba) :
+# les itérés sont stockés dans des tableaux préalloués, et les itérations sont identiques à celles de iter_algo
+@jit_kernels.njit
+def solve_jit(f, df, k, x_k, f_k, d_k, nb_iter, tol_rel, tol_abs):
+    list_x = np.empty(max(nb_iter, k)+1)
+    list_f = np.empty(max(nb_iter, k)+1)
+    list_d = np.empty(max(nb_iter, k)+1)
+    list_x[k], list_f[k], list_d[k] = x_k, f_k, d_k
+    while not(stopping_criteria_jit(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)):
+        k += 1
+        list_x[k] = list_x[k-1] - list_f[k-1]/list_d[k-1]
+        list_f[k] = f(list_x[k])
+        list_d[k] = df(list_x[k])
+    return(k, list_x[:k+1], list_f[:k+1], list_d[:k+1])
+
 
 
 #%%#####################################
 # Définition de la fonction principale #
 ########################################
 
-def newton_1d(f, df, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
+def newton_1d(f, df, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
     """Méthode de recherche d'une racine de la fonction scalaire f via la méthode de Newton :
         - x_0 donné,
         - x_kp1 = xk - f(xk)/f'(xk).
@@ -129,12 +248,18 @@ def newton_1d(f, df, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output="")
         - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
         - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel,
         - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
         - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
             - la sortie standard si output = "pipe",
             - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
             - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
 
-    La méthode vérifie les conditions suivantes :
+    Si numba est installé, que f et df sont compilées par numba.njit et que output = "" (aucune itération écrite), toute la boucle de la méthode
+    (itérations et critères d'arrêt) est exécutée par un noyau compilé, aux itérés identiques ; sinon, la version Python est utilisée.
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
          - f est définie en x0, et renvoie un scalaire,
         - df est définie en x0, et renvoie un scalaire,
         - tous les paramètres reçus ont bien le type attendu.
@@ -150,18 +275,140 @@ def newton_1d(f, df, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output="")
     """
 
     # Test des paramètres et définition de la destination de sortie des itérations
-    check_parameters_consistency(f, df, x0, nb_iter, tol_rel, tol_abs, output)
-    write_iter, write_stopping = writing_function.define_writing_function(format_iter, output)
+    probe = check_parameters_consistency(f, df, x0, nb_iter, tol_rel, tol_abs, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        # Initialisation de l'algorithme
+        k, list_x, list_f, list_d = init_algo(f, df, x0, probe)
+        write_iter(k, list_x, list_f, list_d)
 
-    # Initialisation de l'algorithme
-    k, list_x, list_f, list_d = init_algo(f, df, x0)
-    write_iter(k, list_x, list_f, list_d)
+        # Déroulement de l'algorithme, par le noyau compilé si f et df sont compilées par numba et qu'aucune itération n'est à écrire
+        if jit_kernels.can_compile(output, f, df):
+            k, list_x, list_f, list_d = solve_jit(f, df, k, float(list_x[0]), float(list_f[0]), float(list_d[0]), nb_iter, tol_rel, tol_abs)
+            list_x, list_f, list_d = list_x.tolist(), list_f.tolist(), list_d.tolist()
+        else:
+            while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
+                k, list_x, list_f, list_d = iter_algo(f, df, k, list_x, list_f, list_d)
+                write_iter(k, list_x, list_f, list_d)
+
+        write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
+        # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
+        return(list_x, list_f, list_d)
+    finally:
+        close()
 
-    # Déroulement de l'algorithme
-    while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
-        k, list_x, list_f, list_d = iter_algo(f, df, k, list_x, list_f, list_d)
-        write_iter(k, list_x, list_f, list_d)
 
-    write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
-    # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
-    return(list_x, list_f, list_d)
+def newton_1d_iter(f, df, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
+    """Version génératrice de newton_1d : les itérés sont produits un à un au fil des itérations, au lieu d'être tous stockés puis renvoyés
+    en fin d'algorithme. Seuls les derniers termes des suites sont conservés, la mémoire utilisée est donc constante, et l'appelant peut
+    interrompre l'algorithme à tout moment (en sortant de la boucle qui parcourt le générateur).
+
+    Les arguments, les arguments optionnels et les conditions vérifiées sont ceux de newton_1d (vérifiées dès l'appel de newton_1d_iter).
+
+    La sortie de la méthode est un générateur produisant, pour k = 0, 1, ..., le triplet (x_k, f(x_k), df(x_k)).
+    Le générateur s'arrête lorsqu'un critère d'arrêt de newton_1d est atteint.
+
+    Exemples d'appel :
+        - for x_k, f_k, d_k in newton_1d_iter(lambda x : np.sin(x), lambda x:np.cos(x), 1): print(x_k),
+        - list_x, list_f, list_d = zip(*newton_1d_iter(lambda x :x**2, lambda x:2*x, 1)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    probe = check_parameters_consistency(f, df, x0, nb_iter, tol_rel, tol_abs, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que les deux derniers termes des suites
+            k, list_x, list_f, list_d = init_algo(f, df, x0, probe)
+            list_x, list_f, list_d = history.BoundedList(list_x), history.BoundedList(list_f), history.BoundedList(list_d)
+            write_iter(k, list_x, list_f, list_d)
+            yield(list_x[-1], list_f[-1], list_d[-1])
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
+                k, list_x, list_f, list_d = iter_algo(f, df, k, list_x, list_f, list_d)
+                write_iter(k, list_x, list_f, list_d)
+                yield(list_x[-1], list_f[-1], list_d[-1])
+
+            write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des itérés
+    return(iterates())
+
+
+def newton_1d_batch(f, df, x0, params=None, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
+    """Version par lots de newton_1d : recherche simultanément une racine de chacune des équations scalaires f(x) = 0 (ou f(x,params_i) = 0)
+    par la méthode de Newton, à partir d'un vecteur de points de départ.
+
+    À chaque itération, f et df sont appelées une seule fois, de manière vectorisée, sur l'ensemble des équations encore actives ; les équations
+    ayant atteint un critère d'arrêt (convergence ou dérivée nulle) sont gelées et retirées des vecteurs de calcul.
+
+    Les arguments attendus sont :
+        - une fonction  f vectorisée, admettant en entrée un vecteur x et renvoyant le vecteur  f(x) de même taille (ou  f(x,params)),
+        - une fonction df vectorisée, admettant en entrée un vecteur x et renvoyant le vecteur f'(x) de même taille (ou df(x,params)),
+        - un vecteur  x0 des points de départ de chaque équation (ou un réel, commun à toutes les équations si params est fourni).
+
+    Les arguments optionnels sont :
+        - un np.ndarray params (défaut = None), contenant un paramètre (ou une ligne de paramètres) par équation, transmis à f et df en second
+          argument (restreint aux équations actives),
+        - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
+        - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel, pour chaque équation,
+        - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs, pour chaque équation,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
+        - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
+            - la sortie standard si output = "pipe",
+            - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
+            - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
+        - f et df sont définies en x0, et renvoient chacune un vecteur de même taille que x0,
+        - params contient une valeur par équation,
+        - tous les paramètres reçus ont bien le type attendu.
+
+    Les sorties de la méthode sont :
+        - roots, le vecteur des derniers itérés x_k de chaque équation,
+        - nb_iters, le vecteur des nombres d'itérations effectuées pour chaque équation,
+        - reasons, le vecteur des codes de raison d'arrêt de chaque équation, dont le message est STOP_REASONS[code] :
+            - STOP_NB_ITER   (= 0) si le nombre maximal d'itérations est atteint,
+            - STOP_TOL_ABS   (= 1) si abs(f(x_k)) <= tol_abs,
+            - STOP_DER_NULLE (= 2) si la dérivée df(x_k) est exactement nulle (l'équation est alors gelée en x_k),
+            - STOP_TOL_REL   (= 3) si abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel.
+
+    Exemples d'appel :
+        - newton_1d_batch(lambda x : np.sin(x), lambda x : np.cos(x), np.linspace(-1,1,1000)),
+        - newton_1d_batch(lambda x,a : x**2-a, lambda x,a : 2*x, 1, params=np.linspace(1,2,10**6)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    if validate: x0, f_0, d_0 = check_parameters_consistency_batch(f, df, x0, params, nb_iter, tol_rel, tol_abs, output)
+    else:        x0, f_0, d_0 = broadcast_batch(x0, params), None, None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter_batch, output)
+    try:
+        g  = (lambda x, lanes:  f(x)) if params is None else (lambda x, lanes:  f(x, params if lanes is None else params[lanes]))
+        dg = (lambda x, lanes: df(x)) if params is None else (lambda x, lanes: df(x, params if lanes is None else params[lanes]))
+
+        # Initialisation de l'algorithme
+        k, x_k, f_k, d_k, x_p, lanes = init_algo_batch(g, dg, x0, f_0, d_0)
+        roots    = np.empty(len(x0))
+        nb_iters = np.zeros(len(x0), dtype=int)
+        reasons  = np.empty(len(x0), dtype=np.int8)
+        write_iter(k, len(lanes), f_k)
+
+        # Déroulement de l'algorithme, jusqu'à l'arrêt de toutes les équations
+        while True:
+            reason = stopping_criteria_batch(k, x_k, x_p, f_k, d_k, nb_iter, tol_rel, tol_abs)
+            (x_k, f_k, d_k), lanes = batch_lanes.remove_stopped_lanes(k, reason, x_k, (x_k, f_k, d_k), lanes, roots, nb_iters, reasons)
+            if len(lanes) == 0: break
+            k, x_k, f_k, d_k, x_p = iter_algo_batch(g, dg, k, x_k, f_k, d_k, lanes)
+            write_iter(k, len(lanes), f_k)
+
+        write_stopping(batch_lanes.format_stopping_batch(reasons, STOP_REASONS))
+        # Renvoi des racines, des nombres d'itérations et des raisons d'arrêt de chaque équation
+        return(roots, nb_iters, reasons)
+    finally:
+        close()
@@ -12,7 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
-from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, history, linear_solvers, newton_globalization, finite_differences
 import types
 import numpy as np
 
@@ -22,24 +22,38 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
-def check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, output):
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie f(x0), évaluée pour cette vérification (réutilisées par init_algo)
+def check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, jac_update, stall_ratio, jac_scheme, vectorized, pool, sparsity, globalization, output):
     # Vérification des types des paramètres reçus
-    params_array = [[f,       "f",       types.FunctionType],
-                    [x0,      "x0",      np.ndarray],
-                    [nb_iter, "nb_iter", int],
-                    [tol_rel, "tol_rel", float],
-                    [tol_abs, "tol_abs", float],
-                    [output,  "output",  str]]
+    params_array = [[f,             "f",             types.FunctionType],
+                    [x0,            "x0",            np.ndarray],
+                    [nb_iter,       "nb_iter",       int],
+                    [tol_rel,       "tol_rel",       float],
+                    [tol_abs,       "tol_abs",       float],
+                    [jac_update,    "jac_update",    int],
+                    [stall_ratio,   "stall_ratio",   float],
+                    [jac_scheme,    "jac_scheme",    str],
+                    [vectorized,    "vectorized",    bool],
+                    [globalization, "globalization", str],
+                    [output,        "output",        str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
-    try:    f(x0)
+    try:    f_0 = f(x0)
     except: raise ValueError("Fonction f non définie en x0")
-    if not(check_type_arguments.check_generic(f(x0), np.ndarray)[0]): raise ValueError("f(x0) n'est pas un vecteur (type reçu :"+check_type_arguments.get_type(f(x0))+")")
-    if not(np.size(f(x0)) == np.size(x0)): raise ValueError("f(x0) n'a pas la même dimension que x0 (dimension reçue : "+str(np.size(f(x0)))+" et attendue : "+str(np.size(x0))+")")
+    if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]): raise ValueError("f(x0) n'est pas un vecteur (type reçu :"+check_type_arguments.get_type(f_0)+")")
+    if not(np.size(f_0) == np.size(x0)): raise ValueError("f(x0) n'a pas la même dimension que x0 (dimension reçue : "+str(np.size(f_0))+" et attendue : "+str(np.size(x0))+")")
     if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
     if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
     if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    if jac_update < 1: raise ValueError("Période de mise à jour de la jacobienne jac_update définie à une valeur inférieure à 1")
+    if stall_ratio <= 0: raise ValueError("Seuil de stagnation stall_ratio défini à une valeur négative ou nulle")
+    if globalization not in newton_globalization.GLOBALIZATIONS: raise ValueError("Stratégie de globalisation inconnue (reçue : \""+globalization+"\", attendue : "+", ".join(["\""+gl+"\"" for gl in newton_globalization.GLOBALIZATIONS])+")")
+    if jac_scheme not in finite_differences.FD_SCHEMES: raise ValueError("Schéma de différences finies jac_scheme inconnu (reçu : \""+jac_scheme+"\", attendu : "+", ".join(["\""+sc+"\"" for sc in finite_differences.FD_SCHEMES])+")")
+    if not(finite_differences.is_pool(pool)): raise ValueError("Paramètre pool invalide (attendu : None, un entier supérieur ou égal à 1 ou un concurrent.futures.Executor, reçu : "+check_type_arguments.get_type(pool)+")")
+    if not(finite_differences.is_sparsity(sparsity, np.size(x0))): raise ValueError("Motif de creux sparsity invalide (attendu : None, \"auto\" ou une matrice np.ndarray ou scipy.sparse de taille ("+str(np.size(x0))+","+str(np.size(x0))+"), reçu : "+check_type_arguments.get_type(sparsity)+")")
+    if vectorized and not(finite_differences.is_vectorized(f, x0, f_0)): raise ValueError("Fonction f non vectorisée : f appelée sur une matrice de points (un point par colonne) doit renvoyer la matrice des valeurs (une valeur par colonne)")
+    return(f_0)
 
 
 
@@ -73,13 +87,15 @@ def format_iter(k, list_x, list_f):
 ########################################
 
 # Définit l'ensemble des critères d'arrêt possible, et les teste à chaque itération
-def stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
-    if k >= nb_iter:                         return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé".format(nb_iter))
-    if np.max(np.abs(list_f[-1])) < tol_abs: return(True, "Racine localisée à {:7.1e} près : x = ".format(tol_abs)+ "["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]" +" et f(x) = "+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_f[-1]])+"]")
-    if np.linalg.det(list_d[-1]) == 0:       return(True, "Jacobienne singulière au point courant x_k = "+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]")
+# (la singularité de la jacobienne n'est testée que lorsqu'elle vient d'être recalculée, soit age = 0, à partir de l'estimation du
+# conditionnement fournie par sa factorisation lu_k, qui sert aussi au calcul du pas de Newton)
+def stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs):
+    if k >= nb_iter:                                             return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé".format(nb_iter))
+    if np.max(np.abs(list_f[-1])) < tol_abs:                     return(True, "Racine localisée à {:7.1e} près : x = ".format(tol_abs)+ "["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]" +" et f(x) = "+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_f[-1]])+"]")
+    if age == 0 and linear_solvers.is_singular_factorized(lu_k): return(True, "Jacobienne singulière (rcond = {:7.1e}) au point courant x_k = ".format(lu_k[2])+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]")
     if k > 1:
         err_rel = check_relative_tolerance.tol_rel_approx(list_x[-1], list_x[-2])
-        if err_rel < tol_rel:                return(True, "Convergence de la méthode achevée à {:7.1e} près : df/dx(x_k) = {:+11.4e}".format(tol_rel, err_rel))
+        if err_rel < tol_rel:                                    return(True, "Convergence de la méthode achevée à {:7.1e} près : df/dx(x_k) = {:+11.4e}".format(tol_rel, err_rel))
     return(False, "convergence inachevée")
 
 
@@ -88,20 +104,9 @@ def stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
 # Fonction d'approximation de la Jacobienne #
 #############################################
 
-def app_jac(f,x):
-    n = np.size(x)
-    h_init = 10**-6 if np.min(x) == 0 else 10**-3*np.min(x)
-    app_list = [np.zeros((n,n)), np.zeros((n,n))]
-
-    for i in range(len(app_list)):
-        h = h_init / 2**i
-        for d in range(n):
-            delta_h = np.zeros(n)
-            delta_h[d] = h
-            app_list[i][:,d] = (f(x+delta_h) - f(x-delta_h)) / (2*h)
-
-    app = (2**2*app_list[1] - app_list[0]) / (2**2-1)
-    return(app)
+# Nom conservé pour compatibilité : l'approximation de la jacobienne est désormais définie dans Module_coeur/finite_differences, et ses
+# paramètres par défaut (schéma de Richardson, évaluations séquentielles, jacobienne pleine) reproduisent l'ancienne newton_nd.app_jac
+app_jac = finite_differences.app_jac
 
 
 
@@ -110,27 +115,41 @@ def app_jac(f,x):
 ##########################################
 
 # Phase d'initialisation de toutes les suites exploitées par la méthode
-def init_algo(f, x0):
+# La jacobienne d_k est factorisée une fois (lu_k), age compte le nombre d'itérations effectuées depuis son dernier calcul, et radius est
+# le rayon de la région de confiance (None tant qu'il n'est pas initialisé par le premier pas). probe contient f(x0) si elle est déjà connue.
+def init_algo(f, x0, jac_scheme, vectorized, pool, structure, probe):
     k = 0
     x_k = x0
-    f_k = f(x_k)
-    d_k = app_jac(f,x_k)
+    f_k = f(x_k) if probe is None else probe
+    d_k = finite_differences.app_jac(f, x_k, f_k, jac_scheme, vectorized, pool, structure)
+    lu_k = linear_solvers.factorize(d_k)
+    age = 0
+    radius = None
     list_x = [x_k]
     list_f = [f_k]
     list_d = [d_k]
-    return(k, list_x, list_f, list_d)
+    return(k, list_x, list_f, list_d, lu_k, age, radius)
 
-# Exécute une itération de la méthode
-def iter_algo(f, k, list_x, list_f, list_d):
+# Exécute une itération de la méthode, en réutilisant la factorisation lu_k de la jacobienne (chaque résolution coûte alors O(n^2)) :
+# la jacobienne est recalculée et refactorisée toutes les jac_update itérations, ou dès que la réduction du résidu stagne,
+# c'est-à-dire si norm(f(x_kp1)) > stall_ratio*norm(f(x_k)). Avec jac_update = 1, c'est la méthode de Newton classique.
+# Le pas de Newton p_n est globalisé (recherche linéaire ou région de confiance) selon globalization, voir newton_globalization.
+def iter_algo(f, k, list_x, list_f, list_d, lu_k, age, radius, jac_update, stall_ratio, globalization, jac_scheme, vectorized, pool, structure):
     x_k = list_x[-1]
     f_k = list_f[-1]
     d_k = list_d[-1]
     k += 1
-    x_k = x_k - np.linalg.solve(d_k,f_k)
+    p_n = -linear_solvers.solve_factorized(lu_k, f_k)
+    x_k, f_kp1, radius = newton_globalization.globalized_step(f, x_k, f_k, p_n, d_k, globalization, radius)
+    age += 1
+    if age >= jac_update or np.linalg.norm(f_kp1) > stall_ratio*np.linalg.norm(f_k):
+        d_k = finite_differences.app_jac(f, x_k, f_kp1, jac_scheme, vectorized, pool, structure)
+        lu_k = linear_solvers.factorize(d_k)
+        age = 0
     list_x.append(x_k)
-    list_f.append(f(x_k))
-    list_d.append(app_jac(f,x_k))
-    return(k, list_x, list_f, list_d)
+    list_f.append(f_kp1)
+    list_d.append(d_k)
+    return(k, list_x, list_f, list_d, lu_k, age, radius)
 
 
 
@@ -138,7 +157,7 @@ def iter_algo(f, k, list_x, list_f, list_d):
 # Définition de la fonction principale #
 ########################################
 
-def newton_nd(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
+def newton_nd(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, jac_update=1, stall_ratio=0.5, jac_scheme="richardson", vectorized=False, pool=None, sparsity=None, globalization="none", validate=True, output=""):
     """Méthode de recherche d'une racine de la fonction vectorielle f via la méthode de Newton avec approximation de la jacobienne :
         - x_0 donné,
         - x_kp1 = xk - Jac(f)(x_k)^-1*f(x_k).
@@ -151,41 +170,120 @@ def newton_nd(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
         - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
         - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel,
         - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs,
+        - un entier jac_update (défaut = 1) : la jacobienne est recalculée et factorisée (LU) toutes les jac_update itérations, sa factorisation
+          étant réutilisée entre-temps (méthode de Shamanskii, ou méthode de la corde si jac_update >= nb_iter ; Newton classique si jac_update = 1),
+        - un réel   stall_ratio (défaut = 0.5) : la jacobienne est aussi recalculée dès que norm(f(x_kp1)) > stall_ratio*norm(f(x_k)),
+        - une chaîne de caractères jac_scheme (défaut = "richardson") choisissant le schéma de différences finies de la jacobienne :
+            - "forward"    : différences avant, dim(x0) évaluations de f par jacobienne,
+            - "central"    : différences centrées, 2*dim(x0) évaluations de f par jacobienne,
+            - "richardson" : différences centrées extrapolées par Richardson, 4*dim(x0) évaluations de f par jacobienne,
+        - un booléen vectorized (défaut = False) : si True, f accepte une matrice de points (un point par colonne) et renvoie la matrice
+          des valeurs (une valeur par colonne), et tous les points de la jacobienne sont évalués en un seul appel de f,
+        - un paramètre pool (défaut = None) répartissant les évaluations de f de la jacobienne (si vectorized = False) sur :
+            - pool fils d'exécution si pool est un entier,
+            - l'exécuteur pool s'il s'agit d'un concurrent.futures.Executor (un ProcessPoolExecutor demande une fonction f définie au niveau
+              d'un module),
+        - un motif de creux sparsity (défaut = None) de la jacobienne :
+            - None : la jacobienne est dense, et chaque colonne est perturbée séparément,
+            - une matrice np.ndarray ou scipy.sparse de taille (dim(x0),dim(x0)), dont les termes non nuls forment le motif,
+            - "auto" : le motif est détecté une fois en début d'algorithme (2*dim(x0) évaluations de f),
+          les colonnes structurellement indépendantes (sans terme non nul sur une même ligne) sont alors perturbées ensemble (coloration
+          de graphe), le nombre d'évaluations de f par jacobienne est proportionnel au nombre de couleurs (de l'ordre de la largeur de bande)
+          et la jacobienne creuse est factorisée par LU creuse,
+        - une chaîne de caractères globalization (défaut = "none") choisissant la globalisation du pas de Newton, fondée sur la fonction
+          de mérite norm(f(x))^2, afin de converger depuis un point de départ éloigné de la racine :
+            - "none"         : pas de Newton complet,
+            - "line_search"  : recherche linéaire par rebroussement (pas divisé par 2 jusqu'à la condition d'Armijo),
+            - "trust_region" : région de confiance « dogleg », le rayon de confiance étant adapté à chaque itération,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
         - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
             - la sortie standard si output = "pipe",
             - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
             - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
 
-    La méthode vérifie les conditions suivantes :
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
          - f est définie en x0, et renvoie un vecteur de même dimension que x0,
+         - jac_update est supérieur ou égal à 1, stall_ratio est strictement positif, et globalization est une stratégie connue,
+         - jac_scheme est un schéma connu, pool et sparsity sont valides, et f est bien vectorisée si vectorized = True,
          - tous les paramètres reçus ont bien le type attendu.
 
     Les sorties de la méthode sont :
         - list_x, la liste des points x_k,
         - list_f, les valeurs par     f  des éléments de list_x,
-        - list_d, les valeurs par Jac(f) des éléments de list_x.
+        - list_d, les valeurs par Jac(f) des éléments de list_x (la dernière jacobienne calculée, si elle est réutilisée).
 
     Exemples d'appel :
         - newton_nd(lambda x:x**2, np.array([1,1,1])),
         - def f(x):
               return(np.array([x[0]**2, x[1]/2, np.sin(x[2])]))
           x0 = np.array([1,1,1])
-          newton_nd(f, x0).
+          newton_nd(f, x0),
+          newton_nd(f, x0, jac_update=5),
+          newton_nd(f, x0, jac_scheme="forward", vectorized=True),
+          newton_nd(f, x0, sparsity="auto").
     """
 
     # Test des paramètres et définition de la destination de sortie des itérations
-    check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, output)
-    write_iter, write_stopping = writing_function.define_writing_function(format_iter, output)
+    probe = check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, jac_update, stall_ratio, jac_scheme, vectorized, pool, sparsity, globalization, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        structure = finite_differences.jac_structure(f, x0, sparsity, vectorized, pool)
 
-    # Initialisation de l'algorithme
-    k, list_x, list_f, list_d = init_algo(f, x0)
-    write_iter(k, list_x, list_f)
-
-    # Déroulement de l'algorithme
-    while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
-        k, list_x, list_f, list_d = iter_algo(f, k, list_x, list_f, list_d)
+        # Initialisation de l'algorithme
+        k, list_x, list_f, list_d, lu_k, age, radius = init_algo(f, x0, jac_scheme, vectorized, pool, structure, probe)
         write_iter(k, list_x, list_f)
 
-    write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
-    # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
-    return(list_x, list_f, list_d)
+        # Déroulement de l'algorithme
+        while not(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[0]):
+            k, list_x, list_f, list_d, lu_k, age, radius = iter_algo(f, k, list_x, list_f, list_d, lu_k, age, radius, jac_update, stall_ratio, globalization, jac_scheme, vectorized, pool, structure)
+            write_iter(k, list_x, list_f)
+
+        write_stopping(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[1])
+        # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
+        return(list_x, list_f, list_d)
+    finally:
+        close()
+
+
+def newton_nd_iter(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, jac_update=1, stall_ratio=0.5, jac_scheme="richardson", vectorized=False, pool=None, sparsity=None, globalization="none", validate=True, output=""):
+    """Version génératrice de newton_nd : les itérés sont produits un à un au fil des itérations, au lieu d'être tous stockés puis renvoyés
+    en fin d'algorithme. Seuls les derniers termes des suites sont conservés, la mémoire utilisée est donc constante, et l'appelant peut
+    interrompre l'algorithme à tout moment (en sortant de la boucle qui parcourt le générateur).
+
+    Les arguments, les arguments optionnels et les conditions vérifiées sont ceux de newton_nd (vérifiées dès l'appel de newton_nd_iter).
+
+    La sortie de la méthode est un générateur produisant, pour k = 0, 1, ..., le triplet (x_k, f(x_k), Jac(f)(x_k)).
+    Le générateur s'arrête lorsqu'un critère d'arrêt de newton_nd est atteint.
+
+    Exemples d'appel :
+        - for x_k, f_k, d_k in newton_nd_iter(lambda x:x**2, np.array([1,1,1])): print(np.linalg.norm(f_k)),
+        - x_k = collections.deque(newton_nd_iter(f, x0), maxlen=1)[0][0] pour ne garder que le dernier itéré.
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    probe = check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, jac_update, stall_ratio, jac_scheme, vectorized, pool, sparsity, globalization, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    structure = finite_differences.jac_structure(f, x0, sparsity, vectorized, pool)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que les deux derniers termes des suites
+            k, list_x, list_f, list_d, lu_k, age, radius = init_algo(f, x0, jac_scheme, vectorized, pool, structure, probe)
+            list_x, list_f, list_d = history.BoundedList(list_x), history.BoundedList(list_f), history.BoundedList(list_d)
+            write_iter(k, list_x, list_f)
+            yield(list_x[-1], list_f[-1], list_d[-1])
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[0]):
+                k, list_x, list_f, list_d, lu_k, age, radius = iter_algo(f, k, list_x, list_f, list_d, lu_k, age, radius, jac_update, stall_ratio, globalization, jac_scheme, vectorized, pool, structure)
+                write_iter(k, list_x, list_f)
+                yield(list_x[-1], list_f[-1], list_d[-1])
+
+            write_stopping(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des itérés
+    return(iterates())
@@ -12,7 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
-from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, history, linear_solvers, newton_globalization
 import types
 import numpy as np
 
@@ -22,29 +22,37 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
-def check_parameters_consistency(f, jac, x0, nb_iter, tol_rel, tol_abs, output):
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie les évaluations de f et Jac(f) en x0 faites pour cette vérification (réutilisées par init_algo)
+def check_parameters_consistency(f, jac, x0, nb_iter, tol_rel, tol_abs, jac_update, stall_ratio, globalization, output):
     # Vérification des types des paramètres reçus
-    params_array = [[f,       "f",       types.FunctionType],
-                    [jac,     "jac",     types.FunctionType],
-                    [x0,      "x0",      np.ndarray],
-                    [nb_iter, "nb_iter", int],
-                    [tol_rel, "tol_rel", float],
-                    [tol_abs, "tol_abs", float],
-                    [output,  "output",  str]]
+    params_array = [[f,             "f",             types.FunctionType],
+                    [jac,           "jac",           types.FunctionType],
+                    [x0,            "x0",            np.ndarray],
+                    [nb_iter,       "nb_iter",       int],
+                    [tol_rel,       "tol_rel",       float],
+                    [tol_abs,       "tol_abs",       float],
+                    [jac_update,    "jac_update",    int],
+                    [stall_ratio,   "stall_ratio",   float],
+                    [globalization, "globalization", str],
+                    [output,        "output",        str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
-    try:    f(x0)
+    try:    f_0 = f(x0)
     except: raise ValueError("Fonction f non définie en x0")
-    try:    jac(x0)
+    try:    d_0 = jac(x0)
     except: raise ValueError("Fonction Jac(f) non définie en x0")
-    if not(check_type_arguments.check_generic(f(x0), np.ndarray)[0]): raise ValueError("f(x0) n'est pas un vecteur (type reçu :"+check_type_arguments.get_type(f(x0))+")")
-    if not(check_type_arguments.check_generic(jac(x0), np.ndarray)[0] or check_type_arguments.check_generic(jac(x0), np.matrix)[0]): raise ValueError("Jac(f)(x0) n'est pas une matrice (type reçu :"+check_type_arguments.get_type(jac(x0))+")")
-    if not(np.size(f(x0)) == np.size(x0)):                  raise ValueError("f(x0) n'a pas la même dimension que x0 (dimension reçue : "+str(np.size(f(x0)))+" et attendue : "+str(np.size(x0))+")")
-    if not(np.shape(jac(x0)) == (np.size(x0),np.size(x0))): raise ValueError("Jac(f)(x0) n'a pas la même dimension que x0*x0 (dimension reçue : "+str(np.shape(jac(x0)))+" et attendue : "+str((np.size(x0),np.size(x0)))+")")
+    if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]):    raise ValueError("f(x0) n'est pas un vecteur (type reçu :"+check_type_arguments.get_type(f_0)+")")
+    if not(linear_solvers.check_matrix(d_0)[0]):                       raise ValueError("Jac(f)(x0) n'est pas une matrice dense, creuse, bande ou un LinearOperator (type reçu :"+check_type_arguments.get_type(d_0)+")")
+    if not(np.size(f_0) == np.size(x0)):                               raise ValueError("f(x0) n'a pas la même dimension que x0 (dimension reçue : "+str(np.size(f_0))+" et attendue : "+str(np.size(x0))+")")
+    if not(linear_solvers.get_shape(d_0) == (np.size(x0),np.size(x0))): raise ValueError("Jac(f)(x0) n'a pas la même dimension que x0*x0 (dimension reçue : "+str(linear_solvers.get_shape(d_0))+" et attendue : "+str((np.size(x0),np.size(x0)))+")")
     if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
     if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
     if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    if jac_update < 1: raise ValueError("Période de mise à jour de la jacobienne jac_update définie à une valeur inférieure à 1")
+    if stall_ratio <= 0: raise ValueError("Seuil de stagnation stall_ratio défini à une valeur négative ou nulle")
+    if globalization not in newton_globalization.GLOBALIZATIONS: raise ValueError("Stratégie de globalisation inconnue (reçue : \""+globalization+"\", attendue : "+", ".join(["\""+gl+"\"" for gl in newton_globalization.GLOBALIZATIONS])+")")
+    return(f_0, d_0)
 
 
 
@@ -78,13 +86,15 @@ def format_iter(k, list_x, list_f):
 ########################################
 
 # Définit l'ensemble des critères d'arrêt possible, et les teste à chaque itération
-def stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
-    if k >= nb_iter:                         return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé".format(nb_iter))
-    if np.max(np.abs(list_f[-1])) < tol_abs: return(True, "Racine localisée à {:7.1e} près : x = ".format(tol_abs)+ "["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]" +" et f(x) = "+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_f[-1]])+"]")
-    if np.linalg.det(list_d[-1]) == 0:       return(True, "Jacobienne singulière au point courant x_k = "+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]")
+# (la singularité de la jacobienne n'est testée que lorsqu'elle vient d'être recalculée, soit age = 0, à partir de l'estimation du
+# conditionnement fournie par sa factorisation lu_k, qui sert aussi au calcul du pas de Newton)
+def stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs):
+    if k >= nb_iter:                                             return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé".format(nb_iter))
+    if np.max(np.abs(list_f[-1])) < tol_abs:                     return(True, "Racine localisée à {:7.1e} près : x = ".format(tol_abs)+ "["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]" +" et f(x) = "+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_f[-1]])+"]")
+    if age == 0 and linear_solvers.is_singular_factorized(lu_k): return(True, "Jacobienne singulière (rcond = {:7.1e}) au point courant x_k = ".format(lu_k[2])+"["+", ".join(["{:>+11.4e}".format(xi) for xi in list_x[-1]])+"]")
     if k > 1:
         err_rel = check_relative_tolerance.tol_rel_approx(list_x[-1], list_x[-2])
-        if err_rel < tol_rel:                return(True, "Convergence de la méthode achevée à {:7.1e} près : df/dx(x_k) = {:+11.4e}".format(tol_rel, err_rel))
+        if err_rel < tol_rel:                                    return(True, "Convergence de la méthode achevée à {:7.1e} près : df/dx(x_k) = {:+11.4e}".format(tol_rel, err_rel))
     return(False, "convergence inachevée")
 
 
@@ -94,27 +104,42 @@ def stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
 ##########################################
 
 # Phase d'initialisation de toutes les suites exploitées par la méthode
-def init_algo(f, jac, x0):
+# La jacobienne d_k est factorisée une fois (lu_k), age compte le nombre d'itérations effectuées depuis son dernier calcul, et radius est
+# le rayon de la région de confiance (None tant qu'il n'est pas initialisé par le premier pas). probe contient f(x0) et Jac(f)(x0) si elles
+# sont déjà connues.
+def init_algo(f, jac, x0, probe):
     k = 0
     x_k = x0
-    f_k = f(x_k)
-    d_k = jac(x_k)
+    if probe is None: f_k, d_k = f(x_k), jac(x_k)
+    else:             f_k, d_k = probe
+    lu_k = linear_solvers.factorize(d_k)
+    age = 0
+    radius = None
     list_x = [x_k]
     list_f = [f_k]
     list_d = [d_k]
-    return(k, list_x, list_f, list_d)
+    return(k, list_x, list_f, list_d, lu_k, age, radius)
 
-# Exécute une itération de la méthode
-def iter_algo(f, jac, k, list_x, list_f, list_d):
+# Exécute une itération de la méthode, en réutilisant la factorisation lu_k de la jacobienne (chaque résolution coûte alors O(n^2)) :
+# la jacobienne est recalculée et refactorisée toutes les jac_update itérations, ou dès que la réduction du résidu stagne,
+# c'est-à-dire si norm(f(x_kp1)) > stall_ratio*norm(f(x_k)). Avec jac_update = 1, c'est la méthode de Newton classique.
+# Le pas de Newton p_n est globalisé (recherche linéaire ou région de confiance) selon globalization, voir newton_globalization.
+def iter_algo(f, jac, k, list_x, list_f, list_d, lu_k, age, radius, jac_update, stall_ratio, globalization):
     x_k = list_x[-1]
     f_k = list_f[-1]
     d_k = list_d[-1]
     k += 1
-    x_k = x_k - np.linalg.solve(d_k,f_k)
+    p_n = -linear_solvers.solve_factorized(lu_k, f_k)
+    x_k, f_kp1, radius = newton_globalization.globalized_step(f, x_k, f_k, p_n, d_k, globalization, radius)
+    age += 1
+    if age >= jac_update or np.linalg.norm(f_kp1) > stall_ratio*np.linalg.norm(f_k):
+        d_k = jac(x_k)
+        lu_k = linear_solvers.factorize(d_k)
+        age = 0
     list_x.append(x_k)
-    list_f.append(f(x_k))
-    list_d.append(jac(x_k))
-    return(k, list_x, list_f, list_d)
+    list_f.append(f_kp1)
+    list_d.append(d_k)
+    return(k, list_x, list_f, list_d, lu_k, age, radius)
 
 
 
@@ -122,34 +147,50 @@ def iter_algo(f, jac, k, list_x, list_f, list_d):
 # Définition de la fonction principale #
 ########################################
 
-def newton_nd_avec_der(f, jac, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
+def newton_nd_avec_der(f, jac, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, jac_update=1, stall_ratio=0.5, globalization="none", validate=True, output=""):
     """Méthode de recherche d'une racine de la fonction vectorielle f via la méthode de Newton avec approximation de la jacobienne :
         - x_0 donné,
         - x_kp1 = xk - Jac(f)(x_k)^-1*f(x_k).
 
     Les arguments attendus sont :
         - une fonction   f, admettant en entrée un vecteur x et renvoyant un  vecteur f(x),
-        - une fonction jac, admettant en entrée un vecteur x et renvoyant une matrice Jac(f)(x),
+        - une fonction jac, admettant en entrée un vecteur x et renvoyant une matrice Jac(f)(x), sous l'une des formes suivantes :
+            - dense   : un np.ndarray ou une np.matrix (système résolu par factorisation LU dense),
+            - creuse  : une matrice scipy.sparse (système résolu par factorisation LU creuse, en mémoire O(nnz)),
+            - bande   : un couple ((l,u), ab) au format de scipy.linalg.solve_banded (système résolu par factorisation LU bande),
+            - opérateur : un scipy.sparse.linalg.LinearOperator (système résolu par la méthode de Krylov GMRES, seul le produit Jac(f)(x)*v étant requis),
         - un scalaire   x0 (de type int ou float), point de départ de la méthode itérative.
 
     Les arguments optionnels sont :
         - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
         - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel,
         - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs,
+        - un entier jac_update (défaut = 1) : la jacobienne est recalculée et factorisée (LU) toutes les jac_update itérations, sa factorisation
+          étant réutilisée entre-temps (méthode de Shamanskii, ou méthode de la corde si jac_update >= nb_iter ; Newton classique si jac_update = 1),
+        - un réel   stall_ratio (défaut = 0.5) : la jacobienne est aussi recalculée dès que norm(f(x_kp1)) > stall_ratio*norm(f(x_k)),
+        - une chaîne de caractères globalization (défaut = "none") choisissant la globalisation du pas de Newton, fondée sur la fonction
+          de mérite norm(f(x))^2, afin de converger depuis un point de départ éloigné de la racine :
+            - "none"         : pas de Newton complet,
+            - "line_search"  : recherche linéaire par rebroussement (pas divisé par 2 jusqu'à la condition d'Armijo),
+            - "trust_region" : région de confiance « dogleg », le rayon de confiance étant adapté à chaque itération,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
         - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
             - la sortie standard si output = "pipe",
             - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
             - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
 
-    La méthode vérifie les conditions suivantes :
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
          -   f est définie en x0, et renvoie un  vecteur de même dimension que x0,
-         - jac est définie en x0, et renvoie une matrice carrée de dimension dim(x0)*dim(x0),
+         - jac est définie en x0, et renvoie une matrice carrée de dimension dim(x0)*dim(x0) sous l'une des formes acceptées,
+         - jac_update est supérieur ou égal à 1, stall_ratio est strictement positif, et globalization est une stratégie connue,
          - tous les paramètres reçus ont bien le type attendu.
 
     Les sorties de la méthode sont :
         - list_x, la liste des points x_k,
         - list_f, les valeurs par     f  des éléments de list_x,
-        - list_d, les valeurs par Jac(f) des éléments de list_x.
+        - list_d, les valeurs par Jac(f) des éléments de list_x (la dernière jacobienne calculée, si elle est réutilisée).
 
     Exemples d'appel :
         - newton_nd(lambda x:x**2, lambda x: np.array([2*x]), np.array([1,1,1])),
@@ -158,22 +199,67 @@ def newton_nd_avec_der(f, jac, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8,
           def jac(x):
               return(np.array( [ [2*(x[0]), 0, 0], [0, 1/2, 0], [0, 0, np.cos(x[2])] ] ))
           x0 = np.array([1,1,1])
-          newton_nd_avec_der(f, jac, x0).
+          newton_nd_avec_der(f, jac, x0),
+        - newton_nd_avec_der(lambda x:x**3-1, lambda x:scipy.sparse.diags(3*x**2), np.full(10**5,2.)),
+        - newton_nd_avec_der(lambda x:x**3-1, lambda x:((0,0), np.array([3*x**2])), np.full(10**5,2.)),
+        - newton_nd_avec_der(f, jac, x0, jac_update=10**3) pour la méthode de la corde.
     """
 
     # Test des paramètres et définition de la destination de sortie des itérations
-    check_parameters_consistency(f, jac, x0, nb_iter, tol_rel, tol_abs, output)
-    write_iter, write_stopping = writing_function.define_writing_function(format_iter, output)
+    probe = check_parameters_consistency(f, jac, x0, nb_iter, tol_rel, tol_abs, jac_update, stall_ratio, globalization, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        # Initialisation de l'algorithme
+        k, list_x, list_f, list_d, lu_k, age, radius = init_algo(f, jac, x0, probe)
+        write_iter(k, list_x, list_f)
 
-    # Initialisation de l'algorithme
-    k, list_x, list_f, list_d = init_algo(f, jac, x0)
-    write_iter(k, list_x, list_f)
+        # Déroulement de l'algorithme
+        while not(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[0]):
+            k, list_x, list_f, list_d, lu_k, age, radius = iter_algo(f, jac, k, list_x, list_f, list_d, lu_k, age, radius, jac_update, stall_ratio, globalization)
+            write_iter(k, list_x, list_f)
 
-    # Déroulement de l'algorithme
-    while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
-        k, list_x, list_f, list_d = iter_algo(f, jac, k, list_x, list_f, list_d)
-        write_iter(k, list_x, list_f)
+        write_stopping(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[1])
+        # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
+        return(list_x, list_f, list_d)
+    finally:
+        close()
+
+
+def newton_nd_avec_der_iter(f, jac, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, jac_update=1, stall_ratio=0.5, globalization="none", validate=True, output=""):
+    """Version génératrice de newton_nd_avec_der : les itérés sont produits un à un au fil des itérations, au lieu d'être tous stockés puis renvoyés
+    en fin d'algorithme. Seuls les derniers termes des suites sont conservés, la mémoire utilisée est donc constante, et l'appelant peut
+    interrompre l'algorithme à tout moment (en sortant de la boucle qui parcourt le générateur).
+
+    Les arguments, les arguments optionnels et les conditions vérifiées sont ceux de newton_nd_avec_der (vérifiées dès l'appel de newton_nd_avec_der_iter).
 
-    write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
-    # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
-    return(list_x, list_f, list_d)
+    La sortie de la méthode est un générateur produisant, pour k = 0, 1, ..., le triplet (x_k, f(x_k), jac(x_k)).
+    Le générateur s'arrête lorsqu'un critère d'arrêt de newton_nd_avec_der est atteint.
+
+    Exemples d'appel :
+        - for x_k, f_k, d_k in newton_nd_avec_der_iter(lambda x:x**2, lambda x:np.diag(2*x), np.array([1,1,1])): print(np.linalg.norm(f_k)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    probe = check_parameters_consistency(f, jac, x0, nb_iter, tol_rel, tol_abs, jac_update, stall_ratio, globalization, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que les deux derniers termes des suites
+            k, list_x, list_f, list_d, lu_k, age, radius = init_algo(f, jac, x0, probe)
+            list_x, list_f, list_d = history.BoundedList(list_x), history.BoundedList(list_f), history.BoundedList(list_d)
+            write_iter(k, list_x, list_f)
+            yield(list_x[-1], list_f[-1], list_d[-1])
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[0]):
+                k, list_x, list_f, list_d, lu_k, age, radius = iter_algo(f, jac, k, list_x, list_f, list_d, lu_k, age, radius, jac_update, stall_ratio, globalization)
+                write_iter(k, list_x, list_f)
+                yield(list_x[-1], list_f[-1], list_d[-1])
+
+            write_stopping(stopping_criteria(k, list_x, list_f, lu_k, age, nb_iter, tol_rel, tol_abs)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des itérés
+    return(iterates())
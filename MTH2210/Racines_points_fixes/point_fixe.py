@@ -12,7 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
-from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, history
 import types
 import numpy as np
 
@@ -22,23 +22,28 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
-def check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, output):
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie f(x0), évaluée pour cette vérification (réutilisées par init_algo)
+def check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, acceleration, memory, return_nb_eval, output):
     # Vérification des types des paramètres reçus
-    params_array = [[f,       "f",       types.FunctionType],
-                    [x0,      "x0",      [np.ndarray, float]],
-                    [nb_iter, "nb_iter", int],
-                    [tol_rel, "tol_rel", float],
-                    [tol_abs, "tol_abs", float],
-                    [output,  "output",  str]]
+    params_array = [[f,              "f",              types.FunctionType],
+                    [x0,             "x0",             [np.ndarray, float]],
+                    [nb_iter,        "nb_iter",        int],
+                    [tol_rel,        "tol_rel",        float],
+                    [tol_abs,        "tol_abs",        float],
+                    [acceleration,   "acceleration",   str],
+                    [memory,         "memory",         int],
+                    [return_nb_eval, "return_nb_eval", bool],
+                    [output,         "output",         str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
-    try:    f(x0)
+    try:    f_0 = f(x0)
     except: raise ValueError("Fonction f non définie en x0")
-    if type(x0) == float and not(check_type_arguments.check_generic(f(x0), float)[0]): raise ValueError("f(x0) n'est pas un float (type reçu :"+check_type_arguments.get_type(f(x0))+")")
+    if type(x0) == float:
+        if not(check_type_arguments.check_generic(f_0, float)[0]): raise ValueError("f(x0) n'est pas un float (type reçu :"+check_type_arguments.get_type(f_0)+")")
     else:
-        if not(check_type_arguments.check_generic(f(x0), np.ndarray)[0]): raise ValueError("f(x0) n'est pas un np.ndarray (type reçu :"+check_type_arguments.get_type(f(x0))+")")
-        if len(f(x0)) != len(x0): raise ValueError("Les dimensions de f(x0) (= "+str(len(f(x0)))+") et x0 (= "+str(len(x0))+") diffèrent")
+        if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]): raise ValueError("f(x0) n'est pas un np.ndarray (type reçu :"+check_type_arguments.get_type(f_0)+")")
+        if len(f_0) != len(x0): raise ValueError("Les dimensions de f(x0) (= "+str(len(f_0))+") et x0 (= "+str(len(x0))+") diffèrent")
 #    norme_iter_0 = np.linalg.norm(f(x0)-x0)
 #    norme_iter_1 = np.linalg.norm(f(f(x0))-f(x0))
 #    if norme_iter_0 < norme_iter_1:
@@ -46,6 +51,10 @@ def check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, output):
     if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
     if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
     if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    if acceleration not in ACCELERATIONS: raise ValueError("Accélération inconnue (reçue : \""+acceleration+"\", attendue : "+", ".join(["\""+acc+"\"" for acc in ACCELERATIONS])+")")
+    if acceleration == "aitken" and type(x0) != float: raise ValueError("L'accélération d'Aitken (méthode de Steffensen) n'est disponible que pour un point de départ x0 scalaire")
+    if memory < 1: raise ValueError("Profondeur de mémoire memory de l'accélération d'Anderson définie à une valeur inférieure à 1")
+    return(f_0)
 
 
 
@@ -56,7 +65,7 @@ def check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, output):
 # Crée la chaîne de caractères qui sera renvoyée pour chaque itération
 def format_iter(k, x_k, f_k):
 
-    if type(x_k) == float:
+    if np.ndim(x_k) == 0:
         if k == 0:
             header  = "{:>4} || {:^11} | {:^11} | {:^11}"
             header  = header.format("k", "|f_k-x_k|", "x_k", "f_k")
@@ -93,36 +102,85 @@ def format_iter(k, x_k, f_k):
 ###########################################
 
 # Définit l'ensemble des critères d'arrêt possible, et les teste à chaque itération
-def stopping_criteria(f, k, list_x, nb_iter, tol_rel, tol_abs):
-    norm = np.linalg.norm(f(list_x[-1])-list_x[-1])
-    if k > nb_iter:           return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé".format(nb_iter))
-    if norm < tol_abs:        return(True, "Point fixe localisé à {:7.1e} près : norme(f(x_k)-x_k) = {:10.4e}".format(tol_abs, norm))
+# (fx = f(x_k) est celle calculée par l'itération, f n'est donc jamais évaluée par les critères d'arrêt)
+def stopping_criteria(k, x, fx, list_x, nb_eval, nb_iter, tol_rel, tol_abs):
+    norm = np.linalg.norm(fx-x)
+    if k > nb_iter:           return(True, "Nombre maximal d'itérations k_max={} autorisé dépassé ({} évaluations de f)".format(nb_iter, nb_eval))
+    if norm < tol_abs:        return(True, "Point fixe localisé à {:7.1e} près : norme(f(x_k)-x_k) = {:10.4e} ({} évaluations de f)".format(tol_abs, norm, nb_eval))
     if k > 1:
         err_rel = check_relative_tolerance.tol_rel_approx(list_x[-1], list_x[-2])
-        if err_rel < tol_rel: return(True, "Convergence de la méthode achevée à {:7.1e} près : erreur relative sur x = {:10.4e}".format(tol_rel, err_rel))
+        if err_rel < tol_rel: return(True, "Convergence de la méthode achevée à {:7.1e} près : erreur relative sur x = {:10.4e} ({} évaluations de f)".format(tol_rel, err_rel, nb_eval))
     return(False, "convergence inachevée")
 
 
 
+#%%#######################################
+# Fonctions d'accélération de la méthode #
+##########################################
+
+# Accélérations disponibles pour la suite x_kp1 = f(x_k) :
+#   - "none"     : itération de Picard x_kp1 = f(x_k), de convergence linéaire,
+#   - "anderson" : accélération d'Anderson, combinant les memory dernières valeurs de f par moindres carrés sur les résidus g = f(x)-x,
+#   - "aitken"   : accélération d'Aitken (méthode de Steffensen), pour x scalaire, de convergence quadratique.
+ACCELERATIONS = ("none", "anderson", "aitken")
+
+# Calcule le pas d'Anderson x_kp1 = f(x_k) - dF*gamma, où gamma minimise norm(g_k - dG*gamma) et où les colonnes de dG et dF sont les
+# différences successives des résidus g et des valeurs de f mémorisées dans list_dg et list_df (au plus memory colonnes)
+def anderson_step(x, fx, list_dg, list_df):
+    if len(list_dg) == 0: return(fx)
+    g = np.atleast_1d(fx - x)
+    gamma = np.linalg.lstsq(np.column_stack(list_dg), g, rcond=None)[0]
+    x_kp1 = np.atleast_1d(fx) - np.column_stack(list_df) @ gamma
+    return(float(x_kp1[0]) if np.ndim(x) == 0 else x_kp1)
+
+# Calcule le pas de Steffensen x_kp1 = x_k - (f(x_k)-x_k)^2 / (f(f(x_k)) - 2*f(x_k) + x_k), obtenu par extrapolation d'Aitken de la
+# suite x_k, f(x_k), f(f(x_k)) ; si le dénominateur est nul, le pas de Picard x_kp1 = f(x_k) est renvoyé
+def aitken_step(f, x, fx):
+    ffx = f(fx)
+    den = ffx - 2*fx + x
+    if den == 0: return(fx)
+    return(x - (fx-x)**2/den)
+
+
+
 #%%#######################################
 # Fonctions d'itérations de l'algorithme #
 ##########################################
 
 # Phase d'initialisation de toutes les suites exploitées par la méthode
-def init_algo(f, x0):
+# (nb_eval compte les évaluations de f, et list_dg et list_df mémorisent les memory dernières différences de résidus et de valeurs de f
+# de l'accélération d'Anderson, et probe contient f(x0) si elle est déjà connue)
+def init_algo(f, x0, memory, probe):
     k = 0
     x = x0
-    fx = f(x)
+    fx = f(x) if probe is None else probe
+    nb_eval = 1
     list_x = [x]
-    return(k, x, fx, list_x)
+    list_dg = history.BoundedList(maxlen=memory)
+    list_df = history.BoundedList(maxlen=memory)
+    return(k, x, fx, nb_eval, list_x, list_dg, list_df)
 
-# Exécute une itération de la méthode
-def iter_algo(f, k, x, list_x):
+# Exécute une itération de la méthode, selon l'accélération choisie. La valeur fx = f(x_k) est reportée d'une itération à l'autre :
+# le pas de Picard x_kp1 = f(x_k) ne demande aucune évaluation, et seule f(x_kp1) est calculée (deux évaluations pour Aitken).
+def iter_algo(f, k, x, fx, nb_eval, list_x, acceleration, list_dg, list_df):
     k += 1
-    x = f(x)
-    fx = f(x)
+    if acceleration == "anderson":
+        x_kp1 = anderson_step(x, fx, list_dg, list_df)
+        fx_kp1 = f(x_kp1)
+        list_dg.append(np.atleast_1d((fx_kp1-x_kp1) - (fx-x)))
+        list_df.append(np.atleast_1d(fx_kp1 - fx))
+        x, fx = x_kp1, fx_kp1
+        nb_eval += 1
+    elif acceleration == "aitken":
+        x = aitken_step(f, x, fx)
+        fx = f(x)
+        nb_eval += 2
+    else:
+        x = fx
+        fx = f(x)
+        nb_eval += 1
     list_x.append(x)
-    return(k, x, fx, list_x)
+    return(k, x, fx, nb_eval, list_x, list_dg, list_df)
 
 
 
@@ -130,10 +188,10 @@ def iter_algo(f, k, x, list_x):
 # Définition de la fonction principale #
 ########################################
 
-def point_fixe(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
+def point_fixe(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, acceleration="none", memory=5, return_nb_eval=False, validate=True, output=""):
     """Méthode de calcul d'un point fixe x=f(x) par méthode itérative :
         - x_0 donné,
-        - x_kp1 = f(x_k).
+        - x_kp1 = f(x_k), éventuellement accéléré (Anderson, ou Aitken/Steffensen si x est scalaire).
 
     Les arguments attendus sont :
         - une fonction f, admettant en entrée un vecteur x, renvoyant un vecteur f(x) de même dimension que x,
@@ -143,14 +201,26 @@ def point_fixe(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
         - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
         - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel,
         - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs,
+        - une chaîne de caractères acceleration (défaut = "none") choisissant l'accélération de la suite :
+            - "none"     : itération de Picard x_kp1 = f(x_k), de convergence linéaire,
+            - "anderson" : accélération d'Anderson, x_kp1 = f(x_k) - somme(i)(gamma_i*(f(x_km(i-1))-f(x_km(i)))), où les coefficients gamma_i
+                           minimisent par moindres carrés la combinaison des memory derniers résidus f(x)-x (une évaluation de f par itération),
+            - "aitken"   : accélération d'Aitken (méthode de Steffensen) pour x0 scalaire, de convergence quadratique (deux évaluations de f
+                           par itération),
+        - un entier memory (défaut = 5) définissant le nombre de résidus mémorisés par l'accélération d'Anderson,
+        - un booléen return_nb_eval (défaut = False) : si True, le nombre total d'évaluations de f réalisées par la méthode est aussi renvoyé,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
         - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
             - la sortie standard si output = "pipe",
             - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
             - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
 
-    La méthode vérifie les conditions suivantes :
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
         - la fonction f est définie en x0,
-        - f(x0) renvoie un vecteur de la même dimension que x0.
+        - f(x0) renvoie un vecteur de la même dimension que x0,
+        - acceleration est une accélération connue ("aitken" demandant x0 scalaire), et memory est supérieur ou égal à 1.
 
     À noter que si x est un vecteur de dim 1, f doit être implémentée avec parcimonie pour ne pas renvoyer un mauvais type. Par exemple, en définissant :
         - x = np.array(1) est un np.ndarray, y = np.array([1]) est également un np.ndarray,
@@ -169,28 +239,80 @@ def point_fixe(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
 
     Les sorties de la méthode sont :
         - list_x,  la liste des points x_k,
-        - err_rel, la liste des approximations de l'erreur relative à chaque itération (prenant pour référence le dernier élément de list_x).
+        - err_rel, la liste des approximations de l'erreur relative à chaque itération (prenant pour référence le dernier élément de list_x),
+        - nb_eval, uniquement si return_nb_eval = True, le nombre total d'évaluations de f (y compris celle de f(x0), et les deux évaluations
+          par itération de l'accélération d'Aitken).
 
     Exemples d'appel :
         - point_fixe(lambda x : x**2, 0.5),
-        - point_fixe(lambda x : x**2, np.array([0.1,0.1])).
+        - point_fixe(lambda x : x**2, np.array([0.1,0.1])),
+        - point_fixe(lambda x : np.cos(x), 0.5, acceleration="aitken"),
+        - point_fixe(lambda x : np.cos(x)/2, np.array([0.1,0.2]), acceleration="anderson", memory=3),
+        - point_fixe(lambda x : np.cos(x), 0.5, acceleration="aitken", return_nb_eval=True).
     """
 
     # Test des paramètres et définition de la destination de sortie des itérations
     if check_type_arguments.check_real(x0)[0]: x0 = float(x0)
-    check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, output)
-    write_iter, write_stopping = writing_function.define_writing_function(format_iter, output)
+    probe = check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, acceleration, memory, return_nb_eval, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        # Initialisation de l'algorithme
+        k, x, fx, nb_eval, list_x, list_dg, list_df = init_algo(f, x0, memory, probe)
+        write_iter(k, x, fx)
 
-    # Initialisation de l'algorithme
-    k, x, fx, list_x = init_algo(f, x0)
-    write_iter(k, x, fx)
+        # Déroulement de l'algorithme
+        while not(stopping_criteria(k, x, fx, list_x, nb_eval, nb_iter, tol_rel, tol_abs)[0]):
+            k, x, fx, nb_eval, list_x, list_dg, list_df = iter_algo(f, k, x, fx, nb_eval, list_x, acceleration, list_dg, list_df)
+            write_iter(k, x, fx)
+        err_rel = np.array( [abs(xi-list_x[-1]) for xi in list_x] )
 
-    # Déroulement de l'algorithme
-    while not(stopping_criteria(f, k, list_x, nb_iter, tol_rel, tol_abs)[0]):
-        k, x, fx, list_x = iter_algo(f, k, x, list_x)
-        write_iter(k, x, fx)
-    err_rel = np.array( [abs(xi-list_x[-1]) for xi in list_x] )
+        write_stopping(stopping_criteria(k, x, fx, list_x, nb_eval, nb_iter, tol_rel, tol_abs)[1])
+        # Renvoi de la liste des approximations du point fixe, des erreurs relatives, et du nombre d'évaluations de f si demandé
+        if return_nb_eval: return(list_x, err_rel, nb_eval)
+        return(list_x, err_rel)
+    finally:
+        close()
+
+
+def point_fixe_iter(f, x0, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, acceleration="none", memory=5, return_nb_eval=False, validate=True, output=""):
+    """Version génératrice de point_fixe : les itérés sont produits un à un au fil des itérations, au lieu d'être tous stockés puis renvoyés
+    en fin d'algorithme. Seuls les derniers termes de la suite sont conservés, la mémoire utilisée est donc constante, et l'appelant peut
+    interrompre l'algorithme à tout moment (en sortant de la boucle qui parcourt le générateur).
+
+    Les arguments, les arguments optionnels et les conditions vérifiées sont ceux de point_fixe (vérifiées dès l'appel de point_fixe_iter).
+
+    La sortie de la méthode est un générateur produisant, pour k = 0, 1, ..., le point x_k (ou, si return_nb_eval = True, le couple
+    (x_k, nb_eval) où nb_eval est le nombre d'évaluations de f réalisées jusqu'au calcul de f(x_k) inclus).
+    Le générateur s'arrête lorsqu'un critère d'arrêt de point_fixe est atteint.
 
-    write_stopping(stopping_criteria(f, k, list_x, nb_iter, tol_rel, tol_abs)[1])
-    # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
-    return(list_x, err_rel)
+    Exemples d'appel :
+        - for x_k in point_fixe_iter(lambda x : x**2, np.array([0.1,0.1])): print(x_k),
+        - list_x = list(point_fixe_iter(lambda x : x**2, np.array([0.1,0.1]))),
+        - for x_k, nb_eval in point_fixe_iter(lambda x : np.cos(x), 0.5, acceleration="aitken", return_nb_eval=True): print(x_k, nb_eval).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    if check_type_arguments.check_real(x0)[0]: x0 = float(x0)
+    probe = check_parameters_consistency(f, x0, nb_iter, tol_rel, tol_abs, acceleration, memory, return_nb_eval, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que les deux derniers termes de la suite
+            k, x, fx, nb_eval, list_x, list_dg, list_df = init_algo(f, x0, memory, probe)
+            list_x = history.BoundedList(list_x)
+            write_iter(k, x, fx)
+            yield((x, nb_eval) if return_nb_eval else x)
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, x, fx, list_x, nb_eval, nb_iter, tol_rel, tol_abs)[0]):
+                k, x, fx, nb_eval, list_x, list_dg, list_df = iter_algo(f, k, x, fx, nb_eval, list_x, acceleration, list_dg, list_df)
+                write_iter(k, x, fx)
+                yield((x, nb_eval) if return_nb_eval else x)
+
+            write_stopping(stopping_criteria(k, x, fx, list_x, nb_eval, nb_iter, tol_rel, tol_abs)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des itérés
+    return(iterates())
@@ -12,7 +12,7 @@ Created on Wed Jul 01 12:00:00 2020
 # Import des bibliothèques requises #
 #####################################
 
-from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function
+from ..Module_coeur import check_type_arguments, check_relative_tolerance, writing_function, history, batch_lanes, jit_kernels
 import types
 import numpy as np
 
@@ -22,7 +22,8 @@ import numpy as np
 # Fonction de vérification des paramètres #
 ###########################################
 
-# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques
+# Vérifie que le jeu de paramètres reçu par la méthode respecte les types attendus et les hypothèses mathématiques,
+# et renvoie les évaluations de f faites pour cette vérification (réutilisées par init_algo)
 def check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output):
     # Vérification des types des paramètres reçus
     params_array = [[f,       "f",       types.FunctionType],
@@ -34,15 +35,52 @@ def check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output):
                     [output,  "output",  str]]
     check_type_arguments.check_parameters(params_array)
     # Vérification de la cohérence des paramètres
-    try:    f(x0)
+    try:    f_0 = f(x0)
     except: raise ValueError("Fonction f non définie en x0")
-    try:    f(x1)
+    try:    f_1 = f(x1)
     except: raise ValueError("Fonction f non définie en x1")
-    if not(check_type_arguments.check_generic(f(x0), float)[0]): raise ValueError("f(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f(x0))+")")
-    if not(check_type_arguments.check_generic(f(x1), float)[0]): raise ValueError("f(x1) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f(x1))+")")
+    if not(check_type_arguments.check_generic(f_0, float)[0]): raise ValueError("f(x0) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f_0)+")")
+    if not(check_type_arguments.check_generic(f_1, float)[0]): raise ValueError("f(x1) n'est pas un scalaire (type reçu :"+check_type_arguments.get_type(f_1)+")")
     if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
     if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
     if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    return(f_0, f_1)
+
+# Met en forme les points de départ reçus par la version par lots de la méthode : x0 et x1 sont copiés dans des vecteurs de flottants de
+# même taille (celle de params si params est fourni)
+def broadcast_batch(x0, x1, params):
+    shape_p = (1,) if params is None else (len(params),)
+    x0, x1, _ = np.broadcast_arrays(np.atleast_1d(np.asarray(x0, dtype=float)), np.atleast_1d(np.asarray(x1, dtype=float)), np.empty(shape_p))
+    return(x0.copy(), x1.copy())
+
+# Vérifie le jeu de paramètres reçu par la version par lots de la méthode, et renvoie x0 et x1 sous forme de vecteurs de même taille
+def check_parameters_consistency_batch(f, x0, x1, params, nb_iter, tol_rel, tol_abs, output):
+    # Vérification des types des paramètres reçus
+    params_array = [[f,       "f",       types.FunctionType],
+                    [x0,      "x0",      [np.ndarray, float]],
+                    [x1,      "x1",      [np.ndarray, float]],
+                    [nb_iter, "nb_iter", int],
+                    [tol_rel, "tol_rel", float],
+                    [tol_abs, "tol_abs", float],
+                    [output,  "output",  str]]
+    if params is not None: params_array.append([params, "params", np.ndarray])
+    check_type_arguments.check_parameters(params_array)
+    # Vérification de la cohérence des paramètres
+    if np.ndim(x0) > 1 or np.ndim(x1) > 1: raise ValueError("x0 et x1 doivent être des vecteurs de points de départ (dimensions reçues : "+str(np.shape(x0))+" et "+str(np.shape(x1))+")")
+    if params is not None and np.ndim(params) == 0: raise ValueError("params doit contenir une valeur par équation (taille reçue : "+str(np.shape(params))+")")
+    try:    x0, x1 = broadcast_batch(x0, x1, params)
+    except: raise ValueError("Les dimensions de x0 (= "+str(np.shape(x0))+"), de x1 (= "+str(np.shape(x1))+") et de params (= "+str(np.shape(params))+") ne concordent pas")
+    try:    f_0 = f(x0) if params is None else f(x0, params)
+    except: raise ValueError("Fonction f non définie en x0")
+    try:    f_1 = f(x1) if params is None else f(x1, params)
+    except: raise ValueError("Fonction f non définie en x1")
+    if not(check_type_arguments.check_generic(f_0, np.ndarray)[0]) or np.shape(f_0) != np.shape(x0): raise ValueError("f(x0) n'est pas un vecteur de même taille que x0 (taille reçue : "+str(np.shape(f_0))+", attendue : "+str(np.shape(x0))+")")
+    if not(check_type_arguments.check_generic(f_1, np.ndarray)[0]) or np.shape(f_1) != np.shape(x1): raise ValueError("f(x1) n'est pas un vecteur de même taille que x1 (taille reçue : "+str(np.shape(f_1))+", attendue : "+str(np.shape(x1))+")")
+    if np.any(x0 == x1): raise ValueError("Les points de départ x0 et x1 doivent être distincts pour chaque équation")
+    if nb_iter < 0: raise ValueError("Condition d'arrêt nb_iter définie à une valeur négative")
+    if tol_rel < 0: raise ValueError("Condition d'arrêt tol_rel définie à une valeur négative")
+    if tol_abs < 0: raise ValueError("Condition d'arrêt tol_abs définie à une valeur négative")
+    return(x0, x1, f_0, f_1)
 
 
 
@@ -67,6 +105,20 @@ def format_iter(k, list_x, list_f, list_d):
     iter_infos = "{:>4} || {:>+11.4e} | {:>+11.4e} | {:>+11.4e}".format(k, list_x[-1], list_f[-1], list_d[-1])
     return(header+iter_infos)
 
+# Crée la chaîne de caractères qui sera renvoyée pour chaque itération de la version par lots
+def format_iter_batch(k, nb_active, f_k):
+    if k == 1:
+        header  = "{:>4} || {:^9} | {:^11}"
+        header  = header.format("k", "actives", "max|f_k|")
+        header += "\n"
+        header += "-"*(4+9+11 + 4+3)
+        header += "\n"
+    else:
+        header  = ""
+    iter_infos = "{:>4} || {:>9} | {:>+11.4e}"
+    iter_infos = iter_infos.format(k, nb_active, np.max(np.abs(f_k)) if nb_active > 0 else 0.0)
+    return(header+iter_infos)
+
 
 
 #%%#####################################
@@ -83,19 +135,36 @@ def stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
         if err_rel < tol_rel:     return(True, "Convergence de la méthode achevée à {:7.1e} près : df/dx(x_k) = {:+11.4e}".format(tol_rel, err_rel))
     return(False, "convergence inachevée")
 
+# Raisons d'arrêt renvoyées par la version par lots, indexées par les codes STOP_NB_ITER, STOP_TOL_ABS, STOP_DER_NULLE et STOP_TOL_REL
+STOP_NB_ITER, STOP_TOL_ABS, STOP_DER_NULLE, STOP_TOL_REL = 0, 1, 2, 3
+STOP_REASONS = ("Nombre maximal d'itérations autorisé dépassé", "Racine localisée à tol_abs près", "Dérivée exactement nulle au point courant", "Convergence achevée à tol_rel près")
+
+# Teste les critères d'arrêt de secante sur chacune des équations actives, et renvoie le code de la raison d'arrêt de chacune (-1 si non arrêtée)
+def stopping_criteria_batch(k, x_k, x_p, f_k, d_k, nb_iter, tol_rel, tol_abs):
+    reason = np.full(len(x_k), -1, dtype=np.int8)
+    if k >= nb_iter:
+        reason[:] = STOP_NB_ITER
+        return(reason)
+    reason[np.abs(f_k) < tol_abs] = STOP_TOL_ABS
+    reason[(reason == -1) & (d_k == 0)] = STOP_DER_NULLE
+    if k > 1:
+        err_rel = check_relative_tolerance.tol_rel_approx_batch(x_k, x_p)
+        reason[(reason == -1) & (err_rel < tol_rel)] = STOP_TOL_REL
+    return(reason)
+
 
 
 #%%#######################################
 # Fonctions d'itérations de l'algorithme #
 ##########################################
 
-# Phase d'initialisation de toutes les suites exploitées par la méthode
-def init_algo(f, x0, x1):
+# Phase d'initialisation de toutes les suites exploitées par la méthode (probe contient f(x0) et f(x1) si elles sont déjà connues)
+def init_algo(f, x0, x1, probe):
     k = 1
     x_km1 = x0
     x_k = x1
-    f_km1 = f(x_km1)
-    f_k = f(x_k)
+    if probe is None: f_km1, f_k = f(x_km1), f(x_k)
+    else:             f_km1, f_k = probe
     d_k = (f_k-f_km1)/(x_k-x_km1)
     list_x = [x_km1, x_k]
     list_f = [f_km1, f_k]
@@ -114,13 +183,69 @@ def iter_algo(f, k, list_x, list_f, list_d):
     list_d.append(d_k)
     return(k, list_x, list_f, list_d)
 
+# Phase d'initialisation de la version par lots : les itérés de toutes les équations sont stockés dans des vecteurs,
+# et lanes contient les indices des équations encore actives (voir Module_coeur/batch_lanes) ; f_0 = f(x0) et f_1 = f(x1) sont
+# les évaluations déjà calculées lors de la vérification des paramètres (None si validate = False)
+def init_algo_batch(f, x0, x1, f_0, f_1):
+    k = 1
+    x_km1 = x0
+    x_k = x1
+    f_km1 = f(x_km1, None) if f_0 is None else f_0
+    f_k = f(x_k, None) if f_1 is None else f_1
+    d_k = (f_k-f_km1)/(x_k-x_km1)
+    lanes = np.arange(len(x_k))
+    return(k, x_km1, x_k, f_km1, f_k, d_k, lanes)
+
+# Exécute une itération de la version par lots sur les équations actives, avec un seul appel vectorisé de f
+def iter_algo_batch(f, k, x_km1, x_k, f_km1, f_k, lanes):
+    d_k = (f_k-f_km1)/(x_k-x_km1)
+    k += 1
+    x_km1, f_km1 = x_k, f_k
+    x_k = x_k - f_k/d_k
+    f_k = f(x_k, lanes)
+    return(k, x_km1, x_k, f_km1, f_k, d_k)
+
+
+
+#%%################################################
+# Noyau compilé de l'algorithme (numba optionnel) #
+###################################################
+
+# Version compilée de stopping_criteria, sans construction du message d'arrêt (list_x et list_f sont remplis jusqu'à l'indice k,
+# et list_d jusqu'à l'indice k-1)
+@jit_kernels.njit
+def stopping_criteria_jit(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs):
+    if k >= nb_iter:             return(True)
+    if abs(list_f[k]) < tol_abs: return(True)
+    if list_d[k-1] == 0:         return(True)
+    if k > 1 and abs(list_x[k]-list_x[k-1]) / (abs(list_x[k])+jit_kernels.EPS) < tol_rel: return(True)
+    return(False)
+
+# Déroule toute la méthode à partir de l'état renvoyé par init_algo, en une seule boucle compilée (f doit être compilée par numba) :
+# les itérés sont stockés dans des tableaux préalloués, et les itérations sont identiques à celles de iter_algo
+@jit_kernels.njit
+def solve_jit(f, k, x_km1, x_k, f_km1, f_k, d_k, nb_iter, tol_rel, tol_abs):
+    list_x = np.empty(max(nb_iter, k)+1)
+    list_f = np.empty(max(nb_iter, k)+1)
+    list_d = np.empty(max(nb_iter, k))
+    list_x[k-1], list_x[k] = x_km1, x_k
+    list_f[k-1], list_f[k] = f_km1, f_k
+    list_d[k-1] = d_k
+    while not(stopping_criteria_jit(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)):
+        d_k = (list_f[k]-list_f[k-1])/(list_x[k]-list_x[k-1])
+        k += 1
+        list_x[k] = list_x[k-1] - list_f[k-1]/d_k
+        list_f[k] = f(list_x[k])
+        list_d[k-1] = d_k
+    return(k, list_x[:k+1], list_f[:k+1], list_d[:k])
+
 
 
 #%%#####################################
 # Définition de la fonction principale #
 ########################################
 
-def secante(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
+def secante(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
     """Méthode de recherche d'une racine de la fonction scalaire f via la méthode de la sécante :
         - x_0 et x_1 donnés,
         - d_k = (f(x_k)-f(x_km1)) / (x_k-x_km1),
@@ -134,12 +259,18 @@ def secante(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
         - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
         - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel,
         - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
         - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
             - la sortie standard si output = "pipe",
             - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
             - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
 
-    La méthode vérifie les conditions suivantes :
+    Si numba est installé, que f est compilée par numba.njit et que output = "" (aucune itération écrite), toute la boucle de la méthode
+    (itérations et critères d'arrêt) est exécutée par un noyau compilé, aux itérés identiques ; sinon, la version Python est utilisée.
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
         - f est définie en x0 et x1, et renvoie un scalaire,
         - tous les paramètres reçus ont bien le type attendu.
 
@@ -154,18 +285,139 @@ def secante(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, output=""):
     """
 
     # Test des paramètres et définition de la destination de sortie des itérations
-    check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output)
-    write_iter, write_stopping = writing_function.define_writing_function(format_iter, output)
+    probe = check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+    try:
+        # Initialisation de l'algorithme
+        k, list_x, list_f, list_d = init_algo(f, x0, x1, probe)
+        write_iter(k, list_x, list_f, list_d)
 
-    # Initialisation de l'algorithme
-    k, list_x, list_f, list_d = init_algo(f, x0, x1)
-    write_iter(k, list_x, list_f, list_d)
+        # Déroulement de l'algorithme, par le noyau compilé si f est compilée par numba et qu'aucune itération n'est à écrire
+        if jit_kernels.can_compile(output, f):
+            k, list_x, list_f, list_d = solve_jit(f, k, float(list_x[0]), float(list_x[1]), float(list_f[0]), float(list_f[1]), float(list_d[0]), nb_iter, tol_rel, tol_abs)
+            list_x, list_f, list_d = list_x.tolist(), list_f.tolist(), list_d.tolist()
+        else:
+            while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
+                k, list_x, list_f, list_d = iter_algo(f, k, list_x, list_f, list_d)
+                write_iter(k, list_x, list_f, list_d)
 
-    # Déroulement de l'algorithme
-    while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
-        k, list_x, list_f, list_d = iter_algo(f, k, list_x, list_f, list_d)
-        write_iter(k, list_x, list_f, list_d)
+        write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
+        # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
+        return(list_x, list_f, list_d)
+    finally:
+        close()
 
-    write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
-    # Renvoi de la liste des approximations de la racine, des valeurs de f associées, et des erreurs relatives
-    return(list_x, list_f, list_d)
+
+def secante_iter(f, x0, x1, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
+    """Version génératrice de secante : les itérés sont produits un à un au fil des itérations, au lieu d'être tous stockés puis renvoyés
+    en fin d'algorithme. Seuls les derniers termes des suites sont conservés, la mémoire utilisée est donc constante, et l'appelant peut
+    interrompre l'algorithme à tout moment (en sortant de la boucle qui parcourt le générateur).
+
+    Les arguments, les arguments optionnels et les conditions vérifiées sont ceux de secante (vérifiées dès l'appel de secante_iter).
+
+    La sortie de la méthode est un générateur produisant, pour k = 1, 2, ..., le triplet (x_k, f(x_k), d_k), où d_k est la dernière pente
+    de sécante calculée (le point de départ x0 n'est pas produit, x1 étant le premier itéré).
+    Le générateur s'arrête lorsqu'un critère d'arrêt de secante est atteint.
+
+    Exemples d'appel :
+        - for x_k, f_k, d_k in secante_iter(lambda x : np.sin(x), 1, 0.5): print(x_k),
+        - list_x, list_f, list_d = zip(*secante_iter(lambda x :x**2, 2, 1)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    probe = check_parameters_consistency(f, x0, x1, nb_iter, tol_rel, tol_abs, output) if validate else None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter, output)
+
+    def iterates():
+        try:
+            # Initialisation de l'algorithme, en ne conservant que les deux derniers termes des suites
+            k, list_x, list_f, list_d = init_algo(f, x0, x1, probe)
+            list_x, list_f, list_d = history.BoundedList(list_x), history.BoundedList(list_f), history.BoundedList(list_d)
+            write_iter(k, list_x, list_f, list_d)
+            yield(list_x[-1], list_f[-1], list_d[-1])
+
+            # Déroulement de l'algorithme
+            while not(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[0]):
+                k, list_x, list_f, list_d = iter_algo(f, k, list_x, list_f, list_d)
+                write_iter(k, list_x, list_f, list_d)
+                yield(list_x[-1], list_f[-1], list_d[-1])
+
+            write_stopping(stopping_criteria(k, list_x, list_f, list_d, nb_iter, tol_rel, tol_abs)[1])
+        finally:
+            close()
+
+    # Renvoi du générateur des itérés
+    return(iterates())
+
+
+def secante_batch(f, x0, x1, params=None, nb_iter=100, tol_rel=10**-8, tol_abs=10**-8, validate=True, output=""):
+    """Version par lots de secante : recherche simultanément une racine de chacune des équations scalaires f(x) = 0 (ou f(x,params_i) = 0)
+    par la méthode de la sécante, à partir de deux vecteurs de points de départ.
+
+    À chaque itération, f est appelée une seule fois, de manière vectorisée, sur l'ensemble des équations encore actives ; les équations
+    ayant atteint un critère d'arrêt (convergence ou pente nulle) sont gelées et retirées des vecteurs de calcul.
+
+    Les arguments attendus sont :
+        - une fonction f vectorisée, admettant en entrée un vecteur x et renvoyant le vecteur f(x) de même taille (ou f(x,params)),
+        - deux vecteurs x0 et x1 de même taille (l'un d'eux peut être un réel, commun à toutes les équations), les points de départ de chaque équation.
+
+    Les arguments optionnels sont :
+        - un np.ndarray params (défaut = None), contenant un paramètre (ou une ligne de paramètres) par équation, transmis à f en second argument
+          (restreint aux équations actives),
+        - un entier nb_iter (défaut = 100 ) définissant le nombre maximal d'itérations allouées à la méthode,
+        - un réel   tol_rel (défaut = 1e-8) définissant la condition d'arrêt abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel, pour chaque équation,
+        - un réel   tol_abs (défaut = 1e-8) définissant la condition d'arrêt abs(f(x_k)) <= tol_abs, pour chaque équation,
+        - un booléen validate (défaut = True) : si True, les paramètres sont vérifiés, en n'évaluant qu'une fois chaque fonction reçue en
+          chaque point de départ, ces évaluations étant ensuite réutilisées par l'algorithme ; si False, les vérifications (et les évaluations
+          qu'elles demandent) sont omises, pour des appels répétés avec des paramètres sûrs,
+        - une chaîne de caractères output (défaut = "") qui renvoie les affichages de la fonction vers :
+            - la sortie standard si output = "pipe",
+            - un fichier ayant output comme nom+extension (le paramètre doit donc contenir l'extension voulue, et le chemin d'accès doit exister),
+            - nulle part (aucune information écrite ni sauvegardée) si output = "" ou output = "None".
+
+    La méthode vérifie les conditions suivantes (sauf si validate = False) :
+        - f est définie en x0 et x1, et renvoie en chacun de ces vecteurs un vecteur de même taille,
+        - x0 et x1 sont distincts pour chaque équation, et params contient une valeur par équation,
+        - tous les paramètres reçus ont bien le type attendu.
+
+    Les sorties de la méthode sont :
+        - roots, le vecteur des derniers itérés x_k de chaque équation,
+        - nb_iters, le vecteur des nombres d'itérations effectuées pour chaque équation (k valant 1 au départ, comme dans secante),
+        - reasons, le vecteur des codes de raison d'arrêt de chaque équation, dont le message est STOP_REASONS[code] :
+            - STOP_NB_ITER   (= 0) si le nombre maximal d'itérations est atteint,
+            - STOP_TOL_ABS   (= 1) si abs(f(x_k)) <= tol_abs,
+            - STOP_DER_NULLE (= 2) si la dérivée approchée d_k est exactement nulle (l'équation est alors gelée en x_k),
+            - STOP_TOL_REL   (= 3) si abs(x_k-x_km1) / (abs(x_k)+eps) <= tol_rel.
+
+    Exemples d'appel :
+        - secante_batch(lambda x : np.sin(x), np.linspace(-1,1,1000), 0.5),
+        - secante_batch(lambda x,a : x**2-a, 1, 2, params=np.linspace(1,2,10**6)).
+    """
+
+    # Test des paramètres et définition de la destination de sortie des itérations
+    if validate: x0, x1, f_0, f_1 = check_parameters_consistency_batch(f, x0, x1, params, nb_iter, tol_rel, tol_abs, output)
+    else:        x0, x1, f_0, f_1 = *broadcast_batch(x0, x1, params), None, None
+    write_iter, write_stopping, close = writing_function.define_writing_function(format_iter_batch, output)
+    try:
+        g = (lambda x, lanes: f(x)) if params is None else (lambda x, lanes: f(x, params if lanes is None else params[lanes]))
+
+        # Initialisation de l'algorithme
+        k, x_km1, x_k, f_km1, f_k, d_k, lanes = init_algo_batch(g, x0, x1, f_0, f_1)
+        roots    = np.empty(len(x0))
+        nb_iters = np.zeros(len(x0), dtype=int)
+        reasons  = np.empty(len(x0), dtype=np.int8)
+        write_iter(k, len(lanes), f_k)
+
+        # Déroulement de l'algorithme, jusqu'à l'arrêt de toutes les équations
+        while True:
+            reason = stopping_criteria_batch(k, x_k, x_km1, f_k, d_k, nb_iter, tol_rel, tol_abs)
+            (x_km1, x_k, f_km1, f_k), lanes = batch_lanes.remove_stopped_lanes(k, reason, x_k, (x_km1, x_k, f_km1, f_k), lanes, roots, nb_iters, reasons)
+            if len(lanes) == 0: break
+            k, x_km1, x_k, f_km1, f_k, d_k = iter_algo_batch(g, k, x_km1, x_k, f_km1, f_k, lanes)
+            write_iter(k, len(lanes), f_k)
+
+        write_stopping(batch_lanes.format_stopping_batch(reasons, STOP_REASONS))
+        # Renvoi des racines, des nombres d'itérations et des raisons d'arrêt de chaque équation
+        return(roots, nb_iters, reasons)
+    finally:
+        close()
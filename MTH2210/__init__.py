@@ -1,12 +1,14 @@
-from MTH2210.Racines_points_fixes.bissection          import bissection
-from MTH2210.Racines_points_fixes.newton_1d           import newton_1d
-from MTH2210.Racines_points_fixes.newton_nd           import newton_nd
-from MTH2210.Racines_points_fixes.newton_nd_avec_der  import newton_nd_avec_der
-from MTH2210.Racines_points_fixes.point_fixe          import point_fixe
-from MTH2210.Racines_points_fixes.secante             import secante
+from MTH2210.Racines_points_fixes.bissection          import bissection, bissection_iter, bissection_batch
+from MTH2210.Racines_points_fixes.broyden             import broyden, broyden_iter
+from MTH2210.Racines_points_fixes.newton_1d           import newton_1d, newton_1d_iter, newton_1d_batch
+from MTH2210.Racines_points_fixes.newton_nd           import newton_nd, newton_nd_iter
+from MTH2210.Racines_points_fixes.newton_nd_avec_der  import newton_nd_avec_der, newton_nd_avec_der_iter
+from MTH2210.Racines_points_fixes.point_fixe          import point_fixe, point_fixe_iter
+from MTH2210.Racines_points_fixes.secante             import secante, secante_iter, secante_batch
 
 from MTH2210.Interpolations.lagrange   import lagrange
 from MTH2210.Interpolations.spline_cub import spline_cub
 
-from MTH2210.EDO.euler import euler
-from MTH2210.EDO.rk4   import rk4
+from MTH2210.EDO.euler import euler, euler_batch, euler_iter
+from MTH2210.EDO.rk4   import rk4, rk4_batch, rk4_iter
+from MTH2210.EDO.rk45  import rk45, rk45_iter